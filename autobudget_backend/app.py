@@ -3,22 +3,34 @@
 Endpoints:
 - POST /ingest/bills (UploadFile CSV) -> {"ingested_rows": >= 1}
 - GET /payperiods/{pp_id}/summary -> budget summary skeleton with required keys
-- GET /debts/snowball -> [{name,balance,apr,payoff_eta_days}]
+- GET /debts/snowball -> [{name,balance,apr,min_payment,months,payoff_date,payoff_eta_days,interest_paid}]
+- GET /debts/plan -> {debts, months, payoff_date, total_interest}
+  (months/payoff_date/payoff_eta_days are null for debts never paid off)
+- POST /debts/sweep -> {start, payments, strategies, months, total_interest}
+- GET /debts/optimize -> /debts/plan shape + {strategy, remaining_balance, schedule, compare}
+- GET /debts/memo-stats -> {hits, misses, evictions, loads, size}
 - GET /unlocks -> [{action,impact_score,prereqs}]
-- POST /reconcile -> {"matched": [], "unmatched": payload.transactions}
+- POST /reconcile -> {matched: [{...txn, bill_id, bill_name}], unmatched, matched_count, unmatched_count}
 """
 from __future__ import annotations
 
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, BackgroundTasks, Query, Request, Response
+from sqlalchemy import delete, insert, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Any, Dict, List, Optional
 import os
-import io, csv
 import sys
+import asyncio
+import heapq
+import re
 from pathlib import Path as _Path
 import json
-from datetime import date, timedelta, datetime
+from datetime import date
 
 # Ensure repository root is on sys.path so absolute imports work regardless of cwd
 _ROOT = _Path(__file__).resolve().parents[1]
@@ -28,10 +40,39 @@ if str(_ROOT) not in sys.path:
 from autobudget_backend.services.snowball import compute as compute_snowball
 from autobudget_backend.services.unlocks import suggest as suggest_unlocks
 from autobudget_backend.services.reconcile import run as run_reconcile
-from autobudget_backend.services.pots import summarize_payperiod
+from autobudget_backend.services import reconcile as reconcile_service
+from autobudget_backend.services import totals as totals_service
+from autobudget_backend.services import pay_calendar
 from autobudget_backend.services import reminders as reminders_service
+from autobudget_backend.services import ingest as ingest_service
+from autobudget_backend.services import ingest_jobs
+from autobudget_backend.services import batch as batch_service
+from autobudget_backend.services import columnar
+from autobudget_backend.services import debt_memo
+from autobudget_backend.services import debt_optimizer
+from autobudget_backend.services import debt_sweep
+from autobudget_backend.services import due_schedule
+from autobudget_backend.services import leases
+from autobudget_backend.services import paging
+from autobudget_backend.services import response_cache
+from autobudget_backend.services import snowball as snowball_service
 from autobudget_backend import models
-from autobudget_backend.db import SessionLocal, engine, init_db
+from autobudget_backend.db import SessionLocal, AsyncSessionLocal, async_engine, init_db
+
+# orjson serializes lists of plain dicts (dates included) several times faster
+# than the stdlib encoder; without it, fall back to FastAPI's generic path.
+try:
+    import orjson  # noqa: F401
+    from fastapi.responses import ORJSONResponse
+except ImportError:
+    ORJSONResponse = None
+
+
+def _json(content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """Serialize plain rows directly, skipping response_model validation."""
+    if ORJSONResponse is not None:
+        return ORJSONResponse(content, status_code=status_code, headers=headers)
+    return JSONResponse(jsonable_encoder(content), status_code=status_code, headers=headers)
 
 try:
     init_db()
@@ -51,7 +92,56 @@ def get_db():
         db.close()
 
 
-# allow CRA dev host
+async def get_async_db():
+    """Async session for read endpoints; no threadpool hop per request."""
+    if AsyncSessionLocal is None:
+        raise HTTPException(status_code=503, detail="Async database driver not installed")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# GET routes served from services/response_cache.py, with the data scopes
+# they read; writers call response_cache.bump(scope) after committing.
+CACHED_ROUTES = [
+    (re.compile(r"/bills"), ("bills",)),
+    (re.compile(r"/calendar"), ("bills",)),
+    (re.compile(r"/debts/(snowball|plan)"), ("bills",)),
+    (re.compile(r"/unlocks"), ("bills",)),
+    (re.compile(r"/payperiods/\d+/summary"), ("bills", "paychecks")),
+    (re.compile(r"/debts/optimize"), ("bills", "paychecks")),
+]
+_CACHED_HEADERS = ("content-type", paging.NEXT_HEADER.lower())
+
+
+@app.middleware("http")
+async def _response_cache(request: Request, call_next):
+    """Serve cached GET bodies with an ETag; 304 when If-None-Match matches."""
+    if request.method != "GET":
+        return await call_next(request)
+    scopes = next((sc for pattern, sc in CACHED_ROUTES if pattern.fullmatch(request.url.path)), None)
+    if scopes is None:
+        return await call_next(request)
+
+    key = f"{request.url.path}?{request.url.query}"
+    entry = response_cache.get(key, scopes)
+    state = "HIT"
+    if entry is None:
+        state = "MISS"
+        seen = response_cache.versions(scopes)
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        headers = {k: v for k, v in response.headers.items() if k in _CACHED_HEADERS}
+        entry = response_cache.put(key, scopes, body, headers, seen)
+
+    cache_headers = {"ETag": entry.etag, "Cache-Control": "no-cache", "X-Cache": state}
+    if response_cache.etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers=cache_headers)
+    return Response(content=entry.body, headers={**entry.headers, **cache_headers})
+
+
+# allow CRA dev host (added after the cache middleware so it wraps cached responses too)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
@@ -67,58 +157,89 @@ def root():
 
 
 @app.post("/ingest/bills")
-async def ingest_bills(file: UploadFile = File(...), db: Session = Depends(get_db)) -> Dict[str, int]:
-    """Parse CSV data and store it in the database.
-
-    Returns ingested_rows >= 1 if at least one data row exists.
+async def ingest_bills(
+    file: UploadFile = File(...),
+    mode: str = "append",
+    db: Session = Depends(get_db),
+) -> Dict[str, Any]:
+    """Stream CSV data into the database.
+
+    The upload is read in fixed-size chunks and rows are bulk-inserted from a
+    worker thread. Returns ingested_rows alongside rows_per_second throughput.
+
+    mode=upsert makes re-ingest idempotent: an already-seen file is skipped and
+    a changed file only applies its row delta (inserted/updated/unchanged/rejected).
     """
+    if mode not in ("append", "upsert"):
+        raise HTTPException(status_code=400, detail="mode must be 'append' or 'upsert'")
     try:
-        raw = await file.read()
-        text = raw.decode("utf-8", errors="replace")
-        sample = text[:2048]
-        try:
-            dialect = csv.Sniffer().sniff(sample)
-            has_header = csv.Sniffer().has_header(sample)
-        except Exception:
-            dialect, has_header = csv.excel, True
-        reader = csv.reader(io.StringIO(text), dialect)
-        rows = list(reader)
-        if has_header:
-            header = rows[0]
-            data_rows = rows[1:]
-            # Map CSV headers to model fields
-            header_map = {h.strip().lower(): h.strip() for h in header}
-            name_col = header_map.get("name")
-            amount_col = header_map.get("amount")
-            dueday_col = header_map.get("dueday")
-            class_col = header_map.get("class")
-            pp_col = header_map.get("pp")
+        if mode == "upsert":
+            result = await ingest_service.ingest_bills_upsert(file, db)
         else:
-            # Assume fixed order if no header
-            data_rows = rows
-            name_col, amount_col, dueday_col, class_col, pp_col = "Name", "Amount", "DueDay", "Class", "PP"
-
-        ingested_count = 0
-        for row_data in data_rows:
-            if any(cell.strip() for cell in row_data):
-                try:
-                    bill_data = {
-                        "name": row_data[header.index(name_col)],
-                        "amount": float(row_data[header.index(amount_col)]),
-                        "due_day": int(row_data[header.index(dueday_col)]),
-                        "bill_class": row_data[header.index(class_col)],
-                        "pp": int(row_data[header.index(pp_col)]),
-                    }
-                    db_bill = models.Bill(**bill_data)
-                    db.add(db_bill)
-                    ingested_count += 1
-                except (ValueError, IndexError) as e:
-                    print(f"Skipping row due to parsing error: {e}")
-        db.commit()
-        return {"ingested_rows": ingested_count}
+            result = await ingest_service.ingest_bills_stream(file, db)
     except Exception as e:
+        # Both paths commit once at the end, so a failed upload wrote nothing.
         db.rollback()
         raise HTTPException(status_code=400, detail=f"Invalid CSV or database error: {e}")
+    response_cache.bump("bills")
+    due_schedule.schedule.invalidate()
+    return result
+
+
+@app.post("/ingest/jobs", status_code=202)
+async def create_ingest_job(background_tasks: BackgroundTasks, file: UploadFile = File(...)) -> Dict[str, Any]:
+    """Accept a bills CSV and process it in the background.
+
+    Returns the job id straight away; poll GET /ingest/jobs/{job_id}.
+    """
+    job = await ingest_jobs.create_job(file)
+    background_tasks.add_task(ingest_jobs.run_job, job["job_id"])
+    return job
+
+
+@app.get("/ingest/jobs/{job_id}")
+def get_ingest_job(job_id: str) -> Dict[str, Any]:
+    """Return job status: rows_done, rows_rejected, rows_per_second, errors."""
+    job = ingest_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Ingest job not found")
+    return job
+
+
+@app.post("/ingest/columnar/{table}")
+def ingest_columnar(table: str, file: UploadFile = File(...), format: str = "parquet", db: Session = Depends(get_db)) -> Dict[str, Any]:
+    """Bulk-load bills or paychecks from a Parquet or Arrow IPC stream file.
+
+    Each record batch is type-checked as a whole against the table schema.
+    """
+    if not columnar.available():
+        raise HTTPException(status_code=501, detail="pyarrow is not installed")
+    try:
+        return columnar.import_batches(db, table, file.file, format)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"Invalid columnar file or database error: {e}")
+    finally:
+        response_cache.bump(table)
+        if table == "bills":
+            due_schedule.schedule.invalidate()
+
+
+@app.get("/export/columnar/{table}")
+def export_columnar(table: str, format: str = "parquet") -> StreamingResponse:
+    """Stream bills or paychecks as Parquet or Arrow IPC, one record batch at a time."""
+    if not columnar.available():
+        raise HTTPException(status_code=501, detail="pyarrow is not installed")
+    try:
+        body = columnar.export_stream(table, format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    ext = "parquet" if format == "parquet" else "arrows"
+    return StreamingResponse(
+        body,
+        media_type=columnar.FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{ext}"'},
+    )
 
 
 from pydantic import BaseModel
@@ -131,6 +252,8 @@ class BillUpdate(BaseModel):
     bill_class: Optional[str] = None
     pp: Optional[int] = None
     paid: Optional[bool] = None
+    apr: Optional[float] = None
+    min_payment: Optional[float] = None
 
 class BillCreate(BaseModel):
     name: str
@@ -138,6 +261,52 @@ class BillCreate(BaseModel):
     due_day: int
     bill_class: str
     pp: int
+    apr: Optional[float] = None
+    min_payment: Optional[float] = None
+
+# Response models document the list/create shapes; those endpoints return
+# rows through _json(), so every field is optional to allow ?fields= subsets.
+class BillOut(BaseModel):
+    id: int
+    name: Optional[str] = None
+    amount: Optional[float] = None
+    due_day: Optional[int] = None
+    bill_class: Optional[str] = None
+    pp: Optional[int] = None
+    paid: Optional[bool] = None
+    due_date: Optional[date] = None
+    apr: Optional[float] = None
+    min_payment: Optional[float] = None
+
+class CompatBillOut(BaseModel):
+    id: int
+    Name: Optional[str] = None
+    Amount: Optional[float] = None
+    DueDay: Optional[int] = None
+    Class: Optional[str] = None
+    PP: Optional[int] = None
+    paid: Optional[bool] = None
+
+class TaskOut(BaseModel):
+    id: int
+    name: Optional[str] = None
+    amount: Optional[float] = None
+    bill_class: Optional[str] = None
+    task_type: Optional[str] = None
+
+class PaycheckOut(BaseModel):
+    id: int
+    source: Optional[str] = None
+    amount: Optional[float] = None
+    player_id: Optional[str] = None
+
+class BillBatchUpdate(BillUpdate):
+    id: int
+
+class TogglePaidRequest(BaseModel):
+    ids: Optional[List[int]] = None
+    pp: Optional[int] = None
+    paid: Optional[bool] = None  # None toggles each bill
 
 class PaycheckBase(BaseModel):
     source: str
@@ -152,27 +321,86 @@ class PaycheckUpdate(BaseModel):
     amount: Optional[float] = None
     player_id: Optional[str] = None
 
+class PaycheckBatchUpdate(PaycheckUpdate):
+    id: int
+
+
+def _run_batch(db: Session, scope: str, fn: Any, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """Run a services/batch.py write and commit it; 400 on bad input, everything rolled back on error."""
+    try:
+        results, due = fn(db, *args, **kwargs)
+        db.commit()
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        db.rollback()
+        raise
+    if any(r["ok"] for r in results):
+        response_cache.bump(scope)
+    for bill_id, due_date, paid in due:
+        due_schedule.schedule.update(bill_id, due_date, paid)
+    return {"ok": sum(1 for r in results if r["ok"]), "failed": sum(1 for r in results if not r["ok"]), "results": results}
+
 @app.post("/paychecks", status_code=201)
 def create_paycheck(paycheck: PaycheckCreate, db: Session = Depends(get_db)):
     db_paycheck = models.Paycheck(**paycheck.dict())
     db.add(db_paycheck)
+    totals_service.apply_income_change(db, db_paycheck.amount or 0.0)
     db.commit()
+    response_cache.bump("paychecks")
     db.refresh(db_paycheck)
     return db_paycheck
 
-@app.get("/paychecks")
-def get_paychecks(db: Session = Depends(get_db)):
-    return db.query(models.Paycheck).all()
+# List endpoints: ?limit=&after_id= keyset pages (next cursor in X-Next-After-Id)
+# and ?fields=a,b projections pushed into the SELECT; see services/paging.py.
+# Rows are plain dicts from a Core select, serialized by _json().
+PageLimit = Query(None, ge=1, le=paging.MAX_LIMIT)
+
+
+def _projection(columns: Dict[str, Any], fields: Optional[str]) -> List[Any]:
+    try:
+        return paging.project(columns, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _page_response(page: Any) -> JSONResponse:
+    rows, next_after_id = page
+    headers = {paging.NEXT_HEADER: str(next_after_id)} if next_after_id is not None else None
+    return _json(rows, headers=headers)
+
+
+PAYCHECK_FIELDS = {
+    "id": models.Paycheck.id,
+    "source": models.Paycheck.source,
+    "amount": models.Paycheck.amount,
+    "player_id": models.Paycheck.player_id,
+}
+
+
+@app.get("/paychecks", response_model=List[PaycheckOut])
+def get_paychecks(
+    limit: Optional[int] = PageLimit,
+    after_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    stmt = paging.page(select(*_projection(PAYCHECK_FIELDS, fields)), models.Paycheck.id, after_id, limit)
+    return _page_response(paging.fetch(db.execute(stmt), limit))
 
 @app.put("/paychecks/{paycheck_id}")
 def update_paycheck(paycheck_id: int, paycheck: PaycheckUpdate, db: Session = Depends(get_db)):
     db_paycheck = db.query(models.Paycheck).filter(models.Paycheck.id == paycheck_id).first()
     if not db_paycheck:
         raise HTTPException(status_code=404, detail="Paycheck not found")
+    old_amount = db_paycheck.amount or 0.0
     update_data = paycheck.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_paycheck, key, value)
+    totals_service.apply_income_change(db, (db_paycheck.amount or 0.0) - old_amount)
     db.commit()
+    response_cache.bump("paychecks")
     db.refresh(db_paycheck)
     return db_paycheck
 
@@ -181,28 +409,39 @@ def delete_paycheck(paycheck_id: int, db: Session = Depends(get_db)):
     db_paycheck = db.query(models.Paycheck).filter(models.Paycheck.id == paycheck_id).first()
     if not db_paycheck:
         raise HTTPException(status_code=404, detail="Paycheck not found")
+    totals_service.apply_income_change(db, -(db_paycheck.amount or 0.0))
     db.delete(db_paycheck)
     db.commit()
+    response_cache.bump("paychecks")
     return {"ok": True}
 
-@app.post("/bills", status_code=201)
-def create_bill(bill: BillCreate, db: Session = Depends(get_db)):
-    db_bill = models.Bill(**bill.dict())
-    db.add(db_bill)
+@app.post("/bills", status_code=201, response_model=BillOut)
+def create_bill(bill: BillCreate, db: Session = Depends(get_db)) -> JSONResponse:
+    row = {**bill.dict(), "paid": False}
+    pay_calendar.stamp_due_dates([row], db)
+    row = {"id": db.execute(insert(models.Bill).returning(models.Bill.id), row).scalar_one(), **row}
+    totals_service.TotalsDelta().add_rows([row]).flush(db)
     db.commit()
-    db.refresh(db_bill)
-    return db_bill
+    response_cache.bump("bills")
+    due_schedule.schedule.update(row["id"], row["due_date"])
+    return _json(row, status_code=201)
 
 @app.put("/bills/{bill_id}")
 def update_bill(bill_id: int, bill: BillUpdate, db: Session = Depends(get_db)):
     db_bill = db.query(models.Bill).filter(models.Bill.id == bill_id).first()
     if not db_bill:
         raise HTTPException(status_code=404, detail="Bill not found")
+    old = totals_service.snapshot(db_bill)
     update_data = bill.dict(exclude_unset=True)
     for key, value in update_data.items():
         setattr(db_bill, key, value)
+    if "pp" in update_data or "due_day" in update_data:
+        pay_calendar.stamp_bill(db_bill, db)
+    totals_service.apply_bill_change(db, old, totals_service.snapshot(db_bill))
     db.commit()
+    response_cache.bump("bills")
     db.refresh(db_bill)
+    due_schedule.schedule.update(db_bill.id, db_bill.due_date, db_bill.paid)
     return db_bill
 
 @app.delete("/bills/{bill_id}", status_code=204)
@@ -210,58 +449,222 @@ def delete_bill(bill_id: int, db: Session = Depends(get_db)):
     db_bill = db.query(models.Bill).filter(models.Bill.id == bill_id).first()
     if not db_bill:
         raise HTTPException(status_code=404, detail="Bill not found")
+    totals_service.apply_bill_change(db, totals_service.snapshot(db_bill), None)
+    db.execute(delete(models.BillFingerprint).where(models.BillFingerprint.bill_id == bill_id))
     db.delete(db_bill)
     db.commit()
+    response_cache.bump("bills")
+    due_schedule.schedule.discard(bill_id)
     return {"ok": True}
 
 
-@app.get("/bills")
-def get_bills(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Retrieve all bills from the database."""
-    bills = db.query(models.Bill).all()
-    return [
-        {
-            "id": bill.id,
-            "name": bill.name,
-            "amount": bill.amount,
-            "due_day": bill.due_day,
-            "bill_class": bill.bill_class,
-            "pp": bill.pp,
-            "paid": bill.paid,
-        }
-        for bill in bills
-    ]
+# Batch writes: one transaction and one commit per request, per-item results.
+@app.post("/bills/batch")
+def create_bills_batch(bills: List[BillCreate], db: Session = Depends(get_db)) -> JSONResponse:
+    return _json(_run_batch(db, "bills", batch_service.create_bills, [b.dict() for b in bills]))
+
+@app.patch("/bills/batch")
+def update_bills_batch(bills: List[BillBatchUpdate], db: Session = Depends(get_db)) -> JSONResponse:
+    return _json(_run_batch(db, "bills", batch_service.update_bills, [b.dict(exclude_unset=True) for b in bills]))
+
+@app.post("/bills/toggle-paid")
+def toggle_paid_batch(req: TogglePaidRequest, db: Session = Depends(get_db)) -> JSONResponse:
+    """Toggle (or set, with "paid") bills selected by "ids" and/or "pp"."""
+    return _json(_run_batch(db, "bills", batch_service.set_paid, ids=req.ids, pp=req.pp, paid=req.paid))
+
+@app.post("/paychecks/batch")
+def create_paychecks_batch(paychecks: List[PaycheckCreate], db: Session = Depends(get_db)) -> JSONResponse:
+    return _json(_run_batch(db, "paychecks", batch_service.create_paychecks, [p.dict() for p in paychecks]))
+
+@app.patch("/paychecks/batch")
+def update_paychecks_batch(paychecks: List[PaycheckBatchUpdate], db: Session = Depends(get_db)) -> JSONResponse:
+    return _json(_run_batch(db, "paychecks", batch_service.update_paychecks, [p.dict(exclude_unset=True) for p in paychecks]))
+
+
+BILL_FIELDS = {
+    "id": models.Bill.id,
+    "name": models.Bill.name,
+    "amount": models.Bill.amount,
+    "due_day": models.Bill.due_day,
+    "bill_class": models.Bill.bill_class,
+    "pp": models.Bill.pp,
+    "paid": models.Bill.paid,
+    "due_date": models.Bill.due_date,
+    "apr": models.Bill.apr,
+    "min_payment": models.Bill.min_payment,
+}
+
+
+@app.get("/bills", response_model=List[BillOut])
+async def get_bills(
+    limit: Optional[int] = PageLimit,
+    after_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> JSONResponse:
+    """Retrieve bills in id order; all of them unless limit is given."""
+    stmt = paging.page(select(*_projection(BILL_FIELDS, fields)), models.Bill.id, after_id, limit)
+    return _page_response(paging.fetch(await db.execute(stmt), limit))
+
+
+@app.get("/payperiods/summary")
+async def payperiod_summaries(
+    pp_from: int = Query(..., alias="from"),
+    pp_to: int = Query(..., alias="to"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[Dict[str, Any]]:
+    """Return summaries for every pay period with bills in [from, to].
+
+    Reads the materialized pay_period_totals rows in one range scan.
+    """
+    if pp_from > pp_to:
+        raise HTTPException(status_code=400, detail="'from' must be <= 'to'")
+    rows = await db.scalars(
+        select(models.PayPeriodTotal)
+        .where(models.PayPeriodTotal.pp.between(pp_from, pp_to), models.PayPeriodTotal.bill_count > 0)
+        .order_by(models.PayPeriodTotal.pp)
+    )
+    return [totals_service.summary_from_total(t) for t in rows]
 
 
 @app.get("/payperiods/{pp_id}/summary")
-def payperiod_summary(pp_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """Return a real summary for a pay period based on data from the DB."""
-    bills = db.query(models.Bill).filter(models.Bill.pp == pp_id).all()
-    if not bills:
+async def payperiod_summary(pp_id: int, db: AsyncSession = Depends(get_async_db)) -> Dict[str, Any]:
+    """Return a real summary for a pay period based on data from the DB.
+
+    O(1): a primary-key lookup in the incrementally maintained pay_period_totals.
+    """
+    total = await db.get(models.PayPeriodTotal, pp_id)
+    if total is None or not total.bill_count:
         raise HTTPException(status_code=404, detail=f"No bills found for pay period {pp_id}")
-    summary = summarize_payperiod(db=db, bills=bills)
-    summary["pp_id"] = pp_id
-    return summary
+    return totals_service.summary_from_total(total)
+
+
+# Credit bills as snowball debts: the bill amount is the balance owed.
+DEBTS_QUERY = select(
+    models.Bill.name,
+    models.Bill.amount.label("balance"),
+    models.Bill.apr,
+    models.Bill.min_payment,
+).where(models.Bill.bill_class == 'Credit')
+
+async def _debts(db: AsyncSession):
+    """(debts, fingerprint); re-queried only after a bills write (services/debt_memo.py)."""
+    seen, hit = debt_memo.cached_debts()
+    if hit is not None:
+        return hit
+    return debt_memo.store_debts(seen, [dict(row._mapping) for row in await db.execute(DEBTS_QUERY)])
+
+
+def _debts_sync(db: Session):
+    return debt_memo.debts(lambda: [dict(row._mapping) for row in db.execute(DEBTS_QUERY)])
+
+
+MonthlyPayment = Query(300.0, ge=0, description="Total paid towards debts each month")
+Strategy = Query("snowball", pattern="^(snowball|avalanche)$")
+
+
+class DebtPayoffOut(BaseModel):
+    name: Optional[str] = None  # bills.name is nullable
+    balance: float
+    apr: float
+    min_payment: float
+    # null when the debt is not paid off within snowball.MAX_MONTHS
+    months: Optional[int] = None
+    payoff_date: Optional[str] = None
+    payoff_eta_days: Optional[int] = None
+    interest_paid: float
+
+class DebtPlanOut(BaseModel):
+    debts: List[DebtPayoffOut]
+    # null while any debt is left unpaid
+    months: Optional[int] = None
+    payoff_date: Optional[str] = None
+    total_interest: float
+
+
+@app.get("/debts/snowball", response_model=List[DebtPayoffOut])
+async def debts_snowball(
+    db: AsyncSession = Depends(get_async_db),
+    monthly_payment: float = MonthlyPayment,
+    strategy: str = Strategy,
+) -> List[Dict[str, Any]]:
+    """Return debts by balance with simulated payoff dates and interest.
+
+    Defensive: if called programmatically and `db` is not a session (for example
+    a `Depends` placeholder), read the debts through a local SessionLocal(),
+    which works with or without the async driver, using the default parameters.
+    """
+    if not hasattr(db, "execute"):
+        monthly_payment, strategy = 300.0, "snowball"
+        local_db = SessionLocal()
+        try:
+            debts, fp = _debts_sync(local_db)
+        finally:
+            local_db.close()
+    else:
+        debts, fp = await _debts(db)
+    params = (monthly_payment, strategy, date.today())
+    return debt_memo.memoized("snowball", debts, fp, params, lambda d: compute_snowball(d, *params))
+
+
+@app.get("/debts/plan", response_model=DebtPlanOut)
+async def debts_plan(
+    db: AsyncSession = Depends(get_async_db),
+    monthly_payment: float = MonthlyPayment,
+    strategy: str = Strategy,
+) -> Dict[str, Any]:
+    """Payoff plan: debts in target order plus overall payoff date and total interest."""
+    debts, fp = await _debts(db)
+    params = (monthly_payment, strategy, date.today())
+    return debt_memo.memoized("plan", debts, fp, params, lambda d: snowball_service.plan(d, *params))
 
 
-@app.get("/debts/snowball")
-def debts_snowball(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Return a simple snowball ordering with payoff ETA in days.
+class DebtSweepRequest(BaseModel):
+    min_payment: float
+    max_payment: float
+    step: float = 25.0
+    strategies: List[str] = ["snowball", "avalanche"]
+    order: Optional[List[str]] = None  # debt names, for the "custom" strategy
 
-    Defensive: if called programmatically and `db` is not a Session (for example
-    a `Depends` placeholder), create a local SessionLocal() and use that.
+
+@app.post("/debts/sweep")
+def debts_sweep(req: DebtSweepRequest, db: Session = Depends(get_db)) -> JSONResponse:
+    """Months to payoff and total interest for each strategy across a payment range.
+
+    Returns parallel arrays: months[i][j] / total_interest[i][j] are for
+    strategies[i] at payments[j].
     """
-    close_after = False
-    if not hasattr(db, "query"):
-        db = SessionLocal()
-        close_after = True
+    debts, fp = _debts_sync(db)
+    params = (req.min_payment, req.max_payment, req.step, tuple(req.strategies), tuple(req.order or ()), date.today())
     try:
-        debts = db.query(models.Bill).filter(models.Bill.bill_class == 'Credit').all()
-        debt_list = [{"name": debt.name, "balance": debt.amount, "apr": 0} for debt in debts]
-        return compute_snowball(debt_list)
-    finally:
-        if close_after:
-            db.close()
+        grid = debt_sweep.payments(req.min_payment, req.max_payment, req.step)
+        return _json(debt_memo.memoized(
+            "sweep", debts, fp, params, lambda d: debt_sweep.sweep(d, grid, req.strategies, req.order)
+        ))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/debts/optimize")
+def debts_optimize(
+    pp_from: Optional[int] = None,
+    pp_to: Optional[int] = None,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    """Lowest-interest allocation of each pay period's surplus across debts.
+
+    Same shape as /debts/plan, plus the per-period payment schedule and a
+    comparison with snowball and avalanche over the same periods.
+    """
+    debts = [dict(row._mapping) for row in db.execute(DEBTS_QUERY)]
+    periods = debt_optimizer.load_periods(db, pp_from, pp_to)
+    return _json(debt_optimizer.optimize(debts, periods))
+
+
+@app.get("/debts/memo-stats")
+def debts_memo_stats() -> Dict[str, int]:
+    """Hit/miss counters of the debt payoff memo, plus its current size."""
+    return {**debt_memo.stats, "size": debt_memo.size()}
 
 
 @app.get("/unlocks")
@@ -282,31 +685,25 @@ def get_unlocks(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
 
 @app.post("/reconcile")
 def reconcile(payload: Dict[str, Any], db: Session = Depends(get_db)) -> Dict[str, Any]:
-    """Return matched/unmatched for provided transactions without touching a DB."""
+    """Match transactions to bills whose name appears in the memo (services/reconcile.py)."""
     txns = payload.get("transactions") or []
-    bills = db.query(models.Bill).all()
-    return run_reconcile(txns, bills)
+    # Bill names compile into a matcher that is rebuilt only after bill writes.
+    matcher = reconcile_service.cached_matcher(lambda: db.execute(select(models.Bill.id, models.Bill.name)).all())
+    return run_reconcile(txns, matcher=matcher)
 
 
 @app.get("/calendar")
-def get_calendar(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
-    """Return calendar events derived from Bills and PayPeriods.
-
-    Bill due date is computed by mapping bill.pp to a year-month via _pp_month_key
-    and clamping due_day to the last day of that month.
+async def get_calendar(
+    start: Optional[date] = Query(None, description="First due date to include (inclusive)"),
+    end: Optional[date] = Query(None, description="Last due date to include (inclusive)"),
+    db: AsyncSession = Depends(get_async_db),
+) -> List[Dict[str, Any]]:
+    """Return calendar events derived from Bills and PayPeriods, ordered by date.
+
+    Bill dates are the stored bills.due_date (see services/pay_calendar.py), so
+    a start/end window is an index range scan that already returns rows in
+    order; bills and pay periods are merged rather than sorted.
     """
-
-    def _last_day_of_month(y: int, m: int) -> int:
-        nm = 1 if m == 12 else m + 1
-        ny = y + 1 if m == 12 else y
-        return (date(ny, nm, 1) - timedelta(days=1)).day
-
-    def _bill_due_date(bill: models.Bill) -> date:
-        ym = _pp_month_key(bill.pp)  # e.g., "2025-08"
-        y, m = map(int, ym.split("-"))
-        d = min(int(bill.due_day or 1), _last_day_of_month(y, m))
-        return date(y, m, d)
-
     color_map = {
         "Debt": "#c0392b",
         "Critical": "#e74c3c",
@@ -314,49 +711,64 @@ def get_calendar(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
         "Comfort": "#3498db",
     }
 
-    events: List[Dict[str, Any]] = []
-
     # Bills -> single-day events
-    bills = db.query(models.Bill).all()
-    for b in bills:
-        due = _bill_due_date(b)
-        events.append({
+    Bill = models.Bill
+    bill_stmt = (
+        select(Bill.id, Bill.name, Bill.amount, Bill.bill_class, Bill.paid, Bill.pp, Bill.due_date)
+        .where(Bill.due_date.is_not(None))
+        .order_by(Bill.due_date, Bill.id)
+    )
+    if start is not None:
+        bill_stmt = bill_stmt.where(Bill.due_date >= start)
+    if end is not None:
+        bill_stmt = bill_stmt.where(Bill.due_date <= end)
+    bill_events = [
+        {
             "id": f"bill-{b.id}",
             "type": "bill",
             "title": b.name,
-            "date": str(due),
+            "date": str(b.due_date),
             "amount": b.amount,
             "bill_class": b.bill_class,
             "color": color_map.get(b.bill_class, "#95a5a6"),
             "paid": bool(b.paid),
             "pp": b.pp,
-        })
+        }
+        for b in await db.execute(bill_stmt)
+    ]
 
-    # Pay periods -> span events, if present
+    # Pay periods -> span events overlapping the window, if present
+    pp_events: List[Dict[str, Any]] = []
     try:
-        pps = db.query(models.PayPeriod).order_by(models.PayPeriod.start_date).all()
-        for pp in pps:
-            if pp.start_date and pp.end_date:
-                events.append({
-                    "id": f"pp-{pp.pp_number or pp.id}",
-                    "type": "pay_period",
-                    "title": f"PP {pp.pp_number}",
-                    "start_date": str(pp.start_date),
-                    "end_date": str(pp.end_date),
-                    "all_day": True,
-                    "color": "#2ecc71",
-                })
+        PayPeriod = models.PayPeriod
+        pp_stmt = (
+            select(PayPeriod)
+            .where(PayPeriod.start_date.is_not(None), PayPeriod.end_date.is_not(None))
+            .order_by(PayPeriod.start_date)
+        )
+        if start is not None:
+            pp_stmt = pp_stmt.where(PayPeriod.end_date >= start)
+        if end is not None:
+            pp_stmt = pp_stmt.where(PayPeriod.start_date <= end)
+        for pp in (await db.scalars(pp_stmt)).all():
+            pp_events.append({
+                "id": f"pp-{pp.pp_number or pp.id}",
+                "type": "pay_period",
+                "title": f"PP {pp.pp_number}",
+                "start_date": str(pp.start_date),
+                "end_date": str(pp.end_date),
+                "all_day": True,
+                "color": "#2ecc71",
+            })
     except Exception:
         pass
 
-    # Sort events by date; bills by date, pay periods by start_date
-    def _event_sort_key(ev: Dict[str, Any]):
-        if ev.get("type") == "bill":
-            return (ev.get("date"), 0)
-        return (ev.get("start_date", "9999-12-31"), 1)
-
-    events.sort(key=_event_sort_key)
-    return events
+    # Both lists are already ordered; on the same day bills come first.
+    return list(heapq.merge(
+        bill_events,
+        pp_events,
+        key=lambda ev: (ev["date"], 0) if ev["type"] == "bill" else (ev["start_date"], 1),
+    ))
 
 
 from pydantic import BaseModel
@@ -385,20 +797,26 @@ def complete_gamification_task(task: GameTask) -> Dict[str, Any]:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.get("/gamification/tasks", tags=["gamification"])
-def get_gamification_tasks(db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
+TASK_FIELDS = {
+    "id": models.Bill.id,
+    "name": models.Bill.name,
+    "amount": models.Bill.amount,
+    "bill_class": models.Bill.bill_class,
+    "task_type": literal("pay_bill"),
+}
+
+
+@app.get("/gamification/tasks", tags=["gamification"], response_model=List[TaskOut])
+async def get_gamification_tasks(
+    limit: Optional[int] = PageLimit,
+    after_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+) -> JSONResponse:
     """Returns a list of unpaid bills to be used as available tasks."""
-    unpaid_bills = db.query(models.Bill).filter(models.Bill.paid == False).all()
-    return [
-        {
-            "id": bill.id,
-            "name": bill.name,
-            "amount": bill.amount,
-            "bill_class": bill.bill_class,
-            "task_type": "pay_bill"
-        }
-        for bill in unpaid_bills
-    ]
+    stmt = select(*_projection(TASK_FIELDS, fields)).where(models.Bill.paid == False)
+    stmt = paging.page(stmt, models.Bill.id, after_id, limit)
+    return _page_response(paging.fetch(await db.execute(stmt), limit))
 
 
 from fastapi import Header
@@ -413,8 +831,12 @@ def run_reminders_job(x_job_token: Optional[str] = Header(default=None)) -> Dict
     token: Optional[str] = x_job_token  # Header: X-Job-Token
     if token != JOB_TOKEN:
         raise HTTPException(status_code=403, detail="Forbidden")
-    sent = reminders_service.send_due_bill_reminders()
-    return {"ok": True, "sent": int(sent)}
+    # Same lease as scheduled runs (any worker), so runs never overlap.
+    with leases.held(leases.REMINDERS_LEASE) as acquired:
+        if not acquired:
+            raise HTTPException(status_code=409, detail="A reminders run is already in progress")
+        result = reminders_service.run_due_reminders()
+    return {"ok": True, **result}
 
 
 # --- COMPAT: Compatibility aliases for current frontend (/api/*)
@@ -438,56 +860,69 @@ async def _compat_ingest_csv() -> Dict[str, Any]:
 @app.get("/api/pay-periods")  # COMPAT
 def _compat_list_pp() -> List[Dict[str, Any]]:
     # Provide a tiny, stable list so CRA page renders
-    from datetime import date, timedelta
-    start = date(2025, 8, 4)
-    out: List[Dict[str, Any]] = []
-    for i in range(0, 2):
-        s = start + timedelta(weeks=2 * i)
-        out.append({
-            "id": i + 1,
-            "pp_number": 17 + i,
-            "start_date": str(s),
-            "end_date": str(s + timedelta(days=13)),
-        })
-    return out
-
-
-@app.get("/api/pay-periods/{pp}/bills")  # COMPAT
-def _compat_pp_bills(pp: int, db: Session = Depends(get_db)) -> List[Dict[str, Any]]:
-    bills = db.query(models.Bill).filter(models.Bill.pp == pp).all()
+    cal = pay_calendar.get_calendar()
+    first = cal.anchor_pp
     return [
         {
-            "id": bill.id,
-            "Name": bill.name,
-            "Amount": bill.amount,
-            "DueDay": bill.due_day,
-            "Class": bill.bill_class,
-            "PP": bill.pp,
-            "paid": bill.paid,
+            "id": i + 1,
+            "pp_number": pp["pp_number"],
+            "start_date": str(pp["start_date"]),
+            "end_date": str(pp["end_date"]),
         }
-        for bill in bills
+        for i, pp in enumerate(cal.window(first, first + 1))
     ]
 
 
+COMPAT_BILL_FIELDS = {
+    "id": models.Bill.id,
+    "Name": models.Bill.name,
+    "Amount": models.Bill.amount,
+    "DueDay": models.Bill.due_day,
+    "Class": models.Bill.bill_class,
+    "PP": models.Bill.pp,
+    "paid": models.Bill.paid,
+}
+
+
+@app.get("/api/pay-periods/{pp}/bills", response_model=List[CompatBillOut])  # COMPAT
+def _compat_pp_bills(
+    pp: int,
+    limit: Optional[int] = PageLimit,
+    after_id: Optional[int] = None,
+    fields: Optional[str] = None,
+    db: Session = Depends(get_db),
+) -> JSONResponse:
+    stmt = select(*_projection(COMPAT_BILL_FIELDS, fields)).where(models.Bill.pp == pp)
+    stmt = paging.page(stmt, models.Bill.id, after_id, limit)
+    return _page_response(paging.fetch(db.execute(stmt), limit))
+
+
 @app.post("/api/bills/{bill_id}/toggle-paid")  # COMPAT
 def _compat_toggle(bill_id: int, db: Session = Depends(get_db)) -> Dict[str, Any]:
     bill = db.query(models.Bill).filter(models.Bill.id == bill_id).first()
     if not bill:
         raise HTTPException(status_code=404, detail="Bill not found")
+    old = totals_service.snapshot(bill)
     bill.paid = not bill.paid
+    totals_service.apply_bill_change(db, old, totals_service.snapshot(bill))
     db.commit()
+    response_cache.bump("bills")
+    due_schedule.schedule.update(bill.id, bill.due_date, bill.paid)
     return {"ok": True, "id": bill.id, "paid": bill.paid}
 
 # --- COMPAT extras so /api/* works for MVP endpoints too
-@app.get("/api/debts/snowball")
-def _compat_debts_snowball() -> List[Dict[str, Any]]:
+@app.get("/api/debts/snowball", response_model=List[DebtPayoffOut])
+def _compat_debts_snowball(
+    monthly_payment: float = MonthlyPayment,
+    strategy: str = Strategy,
+) -> List[Dict[str, Any]]:
     # Directly implement the snowball compat route to avoid calling the
     # endpoint function (which relies on FastAPI dependency injection).
     db = SessionLocal()
     try:
-        debts = db.query(models.Bill).filter(models.Bill.bill_class == 'Credit').all()
-        debt_list = [{"name": debt.name, "balance": debt.amount, "apr": 0} for debt in debts]
-        return compute_snowball(debt_list)
+        debts, fp = _debts_sync(db)
+        params = (monthly_payment, strategy, date.today())
+        return debt_memo.memoized("snowball", debts, fp, params, lambda d: compute_snowball(d, *params))
     finally:
         db.close()
 
@@ -497,7 +932,11 @@ def _compat_unlocks() -> List[Dict[str, Any]]:
 
 @app.post("/api/reconcile")
 def _compat_reconcile(payload: Dict[str, Any]) -> Dict[str, Any]:
-    return reconcile(payload)
+    db = SessionLocal()
+    try:
+        return reconcile(payload, db)
+    finally:
+        db.close()
 
 
 # --- Dev-only lightweight persistence for compat bills paid state
@@ -530,43 +969,72 @@ def _save_bills_state(state: Dict[str, Any]) -> None:
         pass
 
 
-def _pp_month_key(pp: int) -> str:
-    """Compute a YYYY-MM key for a given pay period number.
+_resume_tasks: set = set()
+_due_runner: Optional[asyncio.Task] = None
+_leader: Optional[asyncio.Task] = None
 
-    Anchor PP=17 -> 2025-08-04; each PP is 2 weeks.
-    """
-    anchor_pp = 17
-    anchor = date(2025, 8, 4)
-    delta_weeks = (pp - anchor_pp) * 2
-    d = anchor + timedelta(weeks=delta_weeks)
-    return f"{d.year}-{d.month:02d}"
 
+def _run_reminders_leased(bill_ids: List[int]) -> List[int]:
+    with leases.held(leases.REMINDERS_LEASE) as acquired:
+        if not acquired:
+            # The runner reloads and retries these bills after a back-off.
+            raise RuntimeError("another reminders run holds the lease")
+        # Bills fire lead_days before they are due, so the window must reach that far.
+        return reminders_service.run_bill_reminders(bill_ids, days_ahead=due_schedule.schedule.lead_days)
 
-# --- Optional scheduling of reminders with APScheduler
-try:
-    from apscheduler.schedulers.asyncio import AsyncIOScheduler
-    _scheduler = AsyncIOScheduler()
-except Exception:
-    _scheduler = None
+
+async def _fire_reminders(bill_ids: List[int]) -> List[int]:
+    return await run_in_threadpool(_run_reminders_leased, bill_ids)
+
+
+async def _reload_due_schedule() -> List[Any]:
+    def _load() -> List[Any]:
+        db = SessionLocal()
+        try:
+            return due_schedule.upcoming_bills(db)
+        finally:
+            db.close()
+    return await run_in_threadpool(_load)
+
+
+def _start_scheduled_jobs() -> None:
+    """Called when this worker becomes the scheduler leader."""
+    global _due_runner
+    # Resume ingest jobs interrupted by a restart
+    task = asyncio.create_task(ingest_jobs.resume_pending_jobs())
+    _resume_tasks.add(task)
+    task.add_done_callback(_resume_tasks.discard)
+    # Fire each bill's reminder at its own time instead of a daily full scan.
+    # Writes served by other workers reach this heap through the runner's
+    # periodic reload (REMINDER_RELOAD_SECONDS).
+    due_schedule.schedule.invalidate()
+    _due_runner = asyncio.create_task(due_schedule.run(_fire_reminders, _reload_due_schedule))
+
+
+def _stop_scheduled_jobs() -> None:
+    global _due_runner
+    if _due_runner is not None:
+        _due_runner.cancel()
+        _due_runner = None
 
 
 @app.on_event("startup")
 async def _startup_jobs() -> None:
-    # Set up daily reminders if scheduler is available
-    if _scheduler is not None:
-        try:
-            _scheduler.add_job(reminders_service.send_due_bill_reminders, "cron", hour=9, minute=0)
-            _scheduler.start()
-        except Exception as e:
-            print(f"Failed to start scheduler: {e}")
-    else:
-        print("APScheduler not installed; reminders scheduling disabled.")
+    # With --workers N every process gets here; only the holder of the
+    # scheduler lease runs scheduled jobs, and a peer takes over if it dies.
+    global _leader
+    _leader = asyncio.create_task(leases.lead(_start_scheduled_jobs, _stop_scheduled_jobs))
 
 
 @app.on_event("shutdown")
 async def _shutdown_jobs() -> None:
-    if _scheduler is not None:
+    if _leader is not None:
+        _leader.cancel()
         try:
-            _scheduler.shutdown(wait=False)
-        except Exception:
+            await _leader  # steps down and releases the lease
+        except asyncio.CancelledError:
             pass
+    debt_sweep.shutdown()
+    # aiosqlite connections run on non-daemon threads; close them or exit hangs
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -1,16 +1,131 @@
+import os
+from pathlib import Path
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./autobudget_mvp.db"
+# Default DB lives at the repo root so it does not depend on the working directory.
+ROOT_DIR = Path(__file__).resolve().parents[1]
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{ROOT_DIR / 'autobudget_mvp.db'}")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+# Sync endpoints run on anyio's threadpool (40 threads by default); size the
+# pool to match so requests never queue on connections before threads.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "40"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# SQLite per-connection pragmas: WAL lets readers run alongside a writer and
+# busy_timeout waits for the write lock instead of failing "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", "-65536"),  # negative = KiB, i.e. 64 MiB
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "temp_store": "MEMORY",
+}
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _install_sqlite_pragmas(eng) -> None:
+    @event.listens_for(eng, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        try:
+            for name, value in SQLITE_PRAGMAS.items():
+                cur.execute(f"PRAGMA {name}={value}")
+        finally:
+            cur.close()
+
+
+def make_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
+    """Create the engine for database_url with backend-appropriate pooling."""
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        if _is_memory_sqlite(url):
+            # One shared connection, otherwise each checkout sees an empty DB.
+            return create_engine(
+                database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool
+            )
+        eng = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+        _install_sqlite_pragmas(eng)
+        return eng
+    return create_engine(
+        database_url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
+# Async drivers for the same database; ASYNC_DATABASE_URL overrides the mapping.
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def async_url(database_url: str = SQLALCHEMY_DATABASE_URL) -> str:
+    url = make_url(database_url)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        raise ValueError(f"No async driver configured for {url.get_backend_name()}")
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(hide_password=False)
+
+
+def make_async_engine(database_url: str = SQLALCHEMY_DATABASE_URL):
+    """Async counterpart of make_engine(); raises ImportError if the driver is missing."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = make_url(os.getenv("ASYNC_DATABASE_URL") or async_url(database_url))
+    if url.get_backend_name() == "sqlite":
+        if _is_memory_sqlite(url):
+            return create_async_engine(url, poolclass=StaticPool)
+        eng = create_async_engine(
+            url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT
+        )
+        _install_sqlite_pragmas(eng.sync_engine)
+        return eng
+    return create_async_engine(
+        url,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True,
+    )
+
+
+engine = make_engine()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional async path (aiosqlite / asyncpg); None when the driver is not installed.
+try:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+
+    async_engine = make_async_engine()
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+except (ImportError, ValueError) as e:
+    print(f"Async database access disabled: {e}")
+    async_engine = None
+    AsyncSessionLocal = None
+
 Base = declarative_base()
 
 def init_db():
+    from autobudget_backend import migrations
+
     Base.metadata.create_all(bind=engine)
+    migrations.migrate(engine)
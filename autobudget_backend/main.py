@@ -15,7 +15,9 @@ from typing import List
 from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, Date
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.ext.declarative import declarative_base
-from datetime import date, timedelta
+from datetime import date
+
+from autobudget_backend.services.ingest import bulk_load_bills_frame
 
 # --- Configuration ---
 # Resolve project root and use absolute DB/CSV paths to avoid path confusion when reloader/WSL changes cwd
@@ -113,24 +115,10 @@ def ingest_csv_data(db: Session = Depends(get_db)):
     except FileNotFoundError:
         raise HTTPException(status_code=500, detail=f"CSV file not found at {CSV_FILE_PATH}")
 
-    db.query(BillDB).delete()
-    db.query(PayPeriodDB).delete()
-
-    for _, row in df.iterrows():
-        bill = BillDB(**row.to_dict(), paid=False)
-        db.add(bill)
-
-    unique_pps = sorted(df["PP"].unique())
-
-    for pp_num in unique_pps:
-        offset = pp_num - unique_pps[0]
-        start_date = PAY_PERIOD_ANCHOR_DATE + timedelta(weeks=2 * offset)
-        end_date = start_date + timedelta(days=13)
-        pp_entry = PayPeriodDB(pp_number=pp_num, start_date=start_date, end_date=end_date)
-        db.add(pp_entry)
-    
-    db.commit()
-    return {"message": f"Successfully ingested {len(df)} bills and {len(unique_pps)} pay periods."}
+    bill_count, pp_count = bulk_load_bills_frame(
+        db, df, BillDB.__table__, PayPeriodDB.__table__, PAY_PERIOD_ANCHOR_DATE
+    )
+    return {"message": f"Successfully ingested {bill_count} bills and {pp_count} pay periods."}
 
 @app.get("/api/pay-periods", response_model=List[PayPeriod])
 def get_pay_periods(db: Session = Depends(get_db)):
@@ -0,0 +1,114 @@
+"""Lightweight, versioned schema migrations.
+
+init_db() runs create_all() for new tables, then migrate() applies every step
+in MIGRATIONS whose version is not yet recorded in schema_migrations. Steps
+must be idempotent (IF NOT EXISTS / column checks) because create_all() may
+already have built the object on a fresh database.
+"""
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Callable, List, Sequence, Tuple, Union
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+Step = Union[str, Callable[[Connection], None]]
+
+
+def add_column(table: str, column: str, ddl: str) -> Callable[[Connection], None]:
+    """Step that runs ALTER TABLE ... ADD COLUMN only if the column is missing."""
+    def _step(conn: Connection) -> None:
+        cols = {c["name"] for c in inspect(conn).get_columns(table)}
+        if column not in cols:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+    return _step
+
+
+def _rebuild_totals(conn: Connection) -> None:
+    from autobudget_backend.services import totals
+
+    totals.rebuild(conn)
+
+
+def _backfill_due_dates(conn: Connection) -> None:
+    from autobudget_backend.services import pay_calendar
+
+    pay_calendar.restamp(conn, only_missing=True)
+
+
+MIGRATIONS: List[Tuple[int, str, Sequence[Step]]] = [
+    (1, "composite indexes for hot query predicates", [
+        "CREATE INDEX IF NOT EXISTS ix_bills_pp_class_amount ON bills (pp, bill_class, amount)",
+        "CREATE INDEX IF NOT EXISTS ix_bills_class_amount ON bills (bill_class, amount)",
+        "CREATE INDEX IF NOT EXISTS ix_bills_paid_amount ON bills (paid, amount)",
+        "CREATE INDEX IF NOT EXISTS ix_reminders_bill_type_sent ON reminders (bill_id, reminder_type, sent_at)",
+    ]),
+    (2, "backfill pay_period_totals from existing bills", [
+        _rebuild_totals,
+    ]),
+    (3, "stored, indexed bills.due_date", [
+        add_column("bills", "due_date", "DATE"),
+        "CREATE INDEX IF NOT EXISTS ix_bills_due_date ON bills (due_date)",
+        _backfill_due_dates,
+    ]),
+    (4, "keyset pagination indexes", [
+        "CREATE INDEX IF NOT EXISTS ix_bills_pp_id ON bills (pp, id)",
+        "CREATE INDEX IF NOT EXISTS ix_bills_paid_id ON bills (paid, id)",
+    ]),
+    (5, "reminder delivery outcomes", [
+        add_column("reminders", "channel", "VARCHAR"),
+        add_column("reminders", "status", "VARCHAR"),
+        add_column("reminders", "attempts", "INTEGER"),
+        add_column("reminders", "error", "VARCHAR"),
+        add_column("reminders", "delivered_at", "DATETIME"),
+    ]),
+    (6, "debt terms on bills", [
+        add_column("bills", "apr", "FLOAT"),
+        add_column("bills", "min_payment", "FLOAT"),
+    ]),
+    (7, "ingest job claims", [
+        add_column("ingest_jobs", "owner", "VARCHAR"),
+        add_column("ingest_jobs", "heartbeat_at", "DATETIME"),
+    ]),
+    (8, "drop fingerprints of deleted bills", [
+        "DELETE FROM bill_fingerprints WHERE bill_id NOT IN (SELECT id FROM bills)",
+    ]),
+    (9, "reminder claim times", [
+        add_column("reminders", "claimed_at", "DATETIME"),
+    ]),
+]
+
+
+def _ensure_table(conn: Connection) -> None:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, description VARCHAR, applied_at TIMESTAMP)"
+    ))
+
+
+def current_version(engine: Engine) -> int:
+    with engine.begin() as conn:
+        _ensure_table(conn)
+        return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar() or 0
+
+
+def migrate(engine: Engine) -> List[int]:
+    """Apply pending migrations in order, each in its own transaction."""
+    applied: List[int] = []
+    done = current_version(engine)
+    for version, description, steps in MIGRATIONS:
+        if version <= done:
+            continue
+        with engine.begin() as conn:
+            for step in steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(text(step))
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": version, "d": description, "t": datetime.utcnow()},
+            )
+        applied.append(version)
+    return applied
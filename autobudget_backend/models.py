@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, ForeignKey, Index
 from .db import Base
 
 class Bill(Base):
@@ -11,6 +11,21 @@ class Bill(Base):
     bill_class = Column(String)
     pp = Column(Integer)
     paid = Column(Boolean, default=False)
+    due_date = Column(Date, index=True) # stamped from pp/due_day via services/pay_calendar.py
+    # Debt terms for services/snowball.py (Credit bills); NULL = 0% / default minimum
+    apr = Column(Float)
+    min_payment = Column(Float)
+
+    # Hot predicates: summaries by pp (+class/amount for SUM CASE), snowball
+    # by bill_class, unlocks/tasks by paid (+amount). Mirrored in migrations.py.
+    __table_args__ = (
+        Index("ix_bills_pp_class_amount", "pp", "bill_class", "amount"),
+        Index("ix_bills_class_amount", "bill_class", "amount"),
+        Index("ix_bills_paid_amount", "paid", "amount"),
+        # Keyset pages: WHERE pp = ? / paid = ? AND id > ? ORDER BY id.
+        Index("ix_bills_pp_id", "pp", "id"),
+        Index("ix_bills_paid_id", "paid", "id"),
+    )
 
 class Paycheck(Base):
     __tablename__ = "paychecks"
@@ -35,3 +50,75 @@ class Reminder(Base):
     bill_id = Column(Integer, ForeignKey("bills.id"))
     sent_at = Column(DateTime)
     reminder_type = Column(String) # e.g., "due_in_3_days"
+    # Delivery outcome written back by services/reminders.py (NULL on legacy rows)
+    channel = Column(String)
+    status = Column(String) # "pending" | "sent" | "failed"
+    attempts = Column(Integer)
+    error = Column(String)
+    delivered_at = Column(DateTime)
+    claimed_at = Column(DateTime) # when a run inserted the "pending" row
+
+    # Latest reminder per (bill, type) lookup in send_due_bill_reminders.
+    __table_args__ = (
+        Index("ix_reminders_bill_type_sent", "bill_id", "reminder_type", "sent_at"),
+    )
+
+class IngestFile(Base):
+    __tablename__ = "ingest_files"
+
+    file_hash = Column(String, primary_key=True) # sha256 of the uploaded bytes
+    ingested_at = Column(DateTime)
+    rows = Column(Integer)
+
+class BillFingerprint(Base):
+    __tablename__ = "bill_fingerprints"
+
+    bill_id = Column(Integer, ForeignKey("bills.id", ondelete="CASCADE"), primary_key=True)
+    row_key = Column(String, index=True) # hash of (name, due_day, pp)
+    row_hash = Column(String) # hash of the full normalized row
+
+class IngestJob(Base):
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True, index=True) # uuid hex
+    filename = Column(String)
+    path = Column(String) # spooled upload under .devdata/ingest_jobs
+    status = Column(String, index=True) # queued | running | done | failed
+    owner = Column(String) # worker running it (leases.HOLDER); claimed atomically
+    heartbeat_at = Column(DateTime) # refreshed per checkpoint; stale = claimable
+    rows_done = Column(Integer, default=0) # valid rows committed; resume point
+    rows_rejected = Column(Integer, default=0)
+    rows_per_second = Column(Float, default=0.0)
+    errors = Column(String, default="[]") # JSON list, capped
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+class PayPeriodTotal(Base):
+    __tablename__ = "pay_period_totals"
+
+    # Maintained incrementally by services/totals.py on every bill/paycheck write.
+    pp = Column(Integer, primary_key=True)
+    income = Column(Float, default=0.0) # all paychecks; paychecks are not per-PP yet
+    fixed = Column(Float, default=0.0)
+    variable = Column(Float, default=0.0)
+    bill_count = Column(Integer, default=0)
+    paid_count = Column(Integer, default=0)
+    unpaid_count = Column(Integer, default=0)
+
+class PayPeriodClassTotal(Base):
+    __tablename__ = "pay_period_class_totals"
+
+    pp = Column(Integer, primary_key=True)
+    bill_class = Column(String, primary_key=True)
+    amount = Column(Float, default=0.0)
+    bill_count = Column(Integer, default=0)
+
+class JobLease(Base):
+    __tablename__ = "job_leases"
+
+    # One row per named lease; see services/leases.py.
+    name = Column(String, primary_key=True)
+    holder = Column(String) # hostname:pid:nonce of the owning process/run
+    acquired_at = Column(DateTime)
+    expires_at = Column(DateTime)
@@ -0,0 +1,169 @@
+"""Batch writes for bills and paychecks, in the caller's transaction.
+
+create_bills(db, items) / create_paychecks(db, items) -> Written.
+update_bills(db, items) / update_paychecks(db, items) -> Written;
+  items are {"id": ..., <fields to change>}.
+set_paid(db, ids=None, pp=None, paid=None) -> Written; paid=None toggles
+  each bill (NULL counts as unpaid), True/False sets it.
+Written = (results, due): per-item results, and (bill_id, due_date, paid)
+  for every bill written, for due_schedule.
+
+Existing rows are read with one SELECT, written with one executemany and the
+pay period totals move by one TotalsDelta flush. Items naming a missing id
+come back as {"id", "ok": False, "error"} and do not fail the batch. Nothing
+is committed here: the caller commits, bumps response_cache and updates
+due_schedule.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import false, func, insert, not_, select, update
+from sqlalchemy.orm import Session
+
+from .. import models
+from . import pay_calendar, totals
+
+MAX_ITEMS = 5000
+BILL_COLUMNS = ("name", "amount", "due_day", "bill_class", "pp", "paid", "due_date", "apr", "min_payment")
+PAYCHECK_COLUMNS = ("source", "amount", "player_id")
+
+
+class Written(NamedTuple):
+    results: List[Dict[str, Any]]
+    due: List[Tuple[int, Optional[date], bool]] = []
+
+
+def _check_size(n: int) -> None:
+    if n > MAX_ITEMS:
+        raise ValueError(f"Batch too large: {n} items (max {MAX_ITEMS})")
+
+
+def _not_found(item_id: Any, what: str) -> Dict[str, Any]:
+    return {"id": item_id, "ok": False, "error": f"{what} not found"}
+
+
+def create_bills(db: Session, items: Sequence[Dict[str, Any]]) -> Written:
+    _check_size(len(items))
+    rows = [{"paid": False, **item} for item in items]
+    if rows:
+        pay_calendar.stamp_due_dates(rows, db)
+        ids = db.scalars(
+            insert(models.Bill).returning(models.Bill.id, sort_by_parameter_order=True), rows
+        ).all()
+        totals.TotalsDelta().add_rows(rows).flush(db)
+    else:
+        ids = []
+    return Written(
+        [{"id": bill_id, "ok": True, **row} for bill_id, row in zip(ids, rows)],
+        [(bill_id, row["due_date"], row["paid"]) for bill_id, row in zip(ids, rows)],
+    )
+
+
+def update_bills(db: Session, items: Sequence[Dict[str, Any]]) -> Written:
+    _check_size(len(items))
+    Bill = models.Bill
+    current = {
+        row.id: dict(row._mapping)
+        for row in db.execute(
+            select(Bill.id, *(getattr(Bill, c) for c in BILL_COLUMNS))
+            .where(Bill.id.in_({item["id"] for item in items}))
+        )
+    }
+    results: List[Dict[str, Any]] = []
+    changed: Dict[int, Dict[str, Any]] = {}
+    delta = totals.TotalsDelta()
+    for item in items:
+        old = current.get(item["id"])
+        if old is None:
+            results.append(_not_found(item["id"], "Bill"))
+            continue
+        # Later items for the same id build on earlier ones.
+        new = {**old, **item}
+        if new["pp"] != old["pp"] or new["due_day"] != old["due_day"]:
+            pay_calendar.stamp_due_dates([new], db)
+        delta.change(totals.snapshot(old), totals.snapshot(new))
+        current[item["id"]] = changed[item["id"]] = new
+        results.append({"ok": True, **new})
+    if changed:
+        db.execute(update(Bill), list(changed.values()))
+        delta.flush(db)
+    return Written(results, [(bill_id, row["due_date"], row["paid"]) for bill_id, row in changed.items()])
+
+
+def set_paid(
+    db: Session,
+    ids: Optional[Sequence[int]] = None,
+    pp: Optional[int] = None,
+    paid: Optional[bool] = None,
+) -> Written:
+    """Toggle (paid=None) or set paid on bills selected by ids and/or pp."""
+    if ids is None and pp is None:
+        raise ValueError("Provide ids or pp")
+    Bill = models.Bill
+    # NULL paid reads as unpaid on both sides, so the toggle and the delta agree.
+    is_paid = func.coalesce(Bill.paid, false())
+    stmt = select(Bill.id, Bill.pp, Bill.bill_class, Bill.amount, is_paid.label("paid"), Bill.due_date).order_by(Bill.id)
+    if ids is not None:
+        _check_size(len(ids))
+        stmt = stmt.where(Bill.id.in_(set(ids)))
+    if pp is not None:
+        stmt = stmt.where(Bill.pp == pp)
+    rows = {row.id: row for row in db.execute(stmt)}
+
+    delta = totals.TotalsDelta()
+    results: Dict[int, Dict[str, Any]] = {}
+    for row in rows.values():
+        new_paid = (not row.paid) if paid is None else paid
+        old = totals.snapshot(row._asdict())
+        delta.change(old, old and old[:3] + (new_paid,))
+        results[row.id] = {"id": row.id, "ok": True, "paid": new_paid}
+    if rows:
+        value = not_(is_paid) if paid is None else paid
+        db.execute(update(Bill).where(Bill.id.in_(list(rows))).values(paid=value))
+        delta.flush(db)
+    due = [(row.id, row.due_date, results[row.id]["paid"]) for row in rows.values()]
+    if ids is None:
+        return Written(list(results.values()), due)
+    return Written([results.get(i) or _not_found(i, "Bill") for i in ids], due)
+
+
+def create_paychecks(db: Session, items: Sequence[Dict[str, Any]]) -> Written:
+    _check_size(len(items))
+    rows = [dict(item) for item in items]
+    if not rows:
+        return Written([])
+    ids = db.scalars(
+        insert(models.Paycheck).returning(models.Paycheck.id, sort_by_parameter_order=True), rows
+    ).all()
+    totals.apply_income_change(db, sum(row.get("amount") or 0.0 for row in rows))
+    return Written([{"id": paycheck_id, "ok": True, **row} for paycheck_id, row in zip(ids, rows)])
+
+
+def update_paychecks(db: Session, items: Sequence[Dict[str, Any]]) -> Written:
+    _check_size(len(items))
+    Paycheck = models.Paycheck
+    current = {
+        row.id: dict(row._mapping)
+        for row in db.execute(
+            select(Paycheck.id, *(getattr(Paycheck, c) for c in PAYCHECK_COLUMNS))
+            .where(Paycheck.id.in_({item["id"] for item in items}))
+        )
+    }
+    results: List[Dict[str, Any]] = []
+    changed: Dict[int, Dict[str, Any]] = {}
+    income_delta = 0.0
+    for item in items:
+        old = current.get(item["id"])
+        if old is None:
+            results.append(_not_found(item["id"], "Paycheck"))
+            continue
+        new = {**old, **item}
+        income_delta += (new["amount"] or 0.0) - (old["amount"] or 0.0)
+        current[item["id"]] = changed[item["id"]] = new
+        results.append({"ok": True, **new})
+    if changed:
+        db.execute(update(Paycheck), list(changed.values()))
+        totals.apply_income_change(db, income_delta)
+    return Written(results)
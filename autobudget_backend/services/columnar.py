@@ -0,0 +1,214 @@
+"""Columnar (Parquet / Arrow IPC) import and export for bills and paychecks.
+
+import_batches(db, table, fileobj, fmt) -> {table, ingested_rows, batches}.
+export_stream(table, fmt) -> iterator of bytes, one chunk per record batch.
+Each batch is cast to the table schema as a whole; bills' due_date is
+computed from the pp/due_day columns and their totals from a group_by over
+the batch, so rows only become Python values for the bulk insert itself.
+Exports read each partition into a DataFrame and convert it column by column.
+Requires pyarrow.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List
+
+import pandas as pd
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from autobudget_backend.db import SessionLocal
+from autobudget_backend import models
+from autobudget_backend.services import pay_calendar, totals
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+except Exception:
+    pa = None
+
+BATCH_SIZE = 10_000
+FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def _tables() -> Dict[str, Dict[str, Any]]:
+    # name -> model, Arrow schema, required (non-null) columns, defaults for
+    # nulls, and columns derived on import (any incoming values are ignored)
+    return {
+        "bills": {
+            "model": models.Bill,
+            "schema": pa.schema([
+                ("name", pa.string()),
+                ("amount", pa.float64()),
+                ("due_day", pa.int64()),
+                ("bill_class", pa.string()),
+                ("pp", pa.int64()),
+                ("paid", pa.bool_()),
+                ("apr", pa.float64()),
+                ("min_payment", pa.float64()),
+                ("due_date", pa.date32()),
+            ]),
+            "required": ["name", "amount", "due_day", "bill_class", "pp"],
+            "defaults": {"paid": False},
+            "derived": ["due_date"],
+        },
+        "paychecks": {
+            "model": models.Paycheck,
+            "schema": pa.schema([
+                ("source", pa.string()),
+                ("amount", pa.float64()),
+                ("player_id", pa.string()),
+            ]),
+            "required": ["source", "amount", "player_id"],
+            "defaults": {},
+            "derived": [],
+        },
+    }
+
+
+def _spec(table: str) -> Dict[str, Any]:
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed")
+    spec = _tables().get(table)
+    if spec is None:
+        raise ValueError(f"Unknown table '{table}'; expected one of: bills, paychecks")
+    return spec
+
+
+def _conform(batch: Any, spec: Dict[str, Any], db: Session) -> Any:
+    """Cast a record batch to the table schema in one step; raise ValueError on bad data."""
+    schema = spec["schema"]
+    missing = [c for c in spec["required"] if c not in batch.schema.names]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    arrays = []
+    for field in schema:
+        if field.name in spec["derived"]:
+            continue
+        if field.name in batch.schema.names:
+            col = batch.column(field.name)
+        else:
+            col = pa.array([spec["defaults"][field.name]] * batch.num_rows, field.type)
+        try:
+            col = col.cast(field.type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Column '{field.name}' is not {field.type}: {e}")
+        if field.name in spec["required"] and col.null_count:
+            raise ValueError(f"Column '{field.name}' has {col.null_count} null values")
+        if field.name in spec["defaults"] and col.null_count:
+            col = pc.fill_null(col, spec["defaults"][field.name])
+        arrays.append(col)
+    if "due_date" in spec["derived"]:
+        pp, due_day = arrays[schema.names.index("pp")], arrays[schema.names.index("due_day")]
+        dues = pay_calendar.get_calendar(db).due_dates64(pp.to_numpy(), due_day.to_numpy())
+        arrays.append(pa.array(dues, pa.date32()))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _bill_totals(batch: Any) -> Any:
+    """TotalsDelta for a conformed bills batch, summed per (pp, bill_class, paid) in Arrow."""
+    grouped = pa.Table.from_batches([batch]).group_by(["pp", "bill_class", "paid"]).aggregate(
+        [("amount", "sum"), ("amount", "count")]
+    )
+    delta = totals.TotalsDelta()
+    for pp, bill_class, paid, amount, count in zip(*(grouped.column(c).to_pylist() for c in (
+        "pp", "bill_class", "paid", "amount_sum", "amount_count"
+    ))):
+        delta.add_group(pp, bill_class, paid, amount, count)
+    return delta
+
+
+def _rows(batch: Any) -> List[Dict[str, Any]]:
+    """Executemany parameters; each column is converted once, not cell by cell."""
+    names = batch.schema.names
+    return [dict(zip(names, values)) for values in zip(*(col.to_pylist() for col in batch.columns))]
+
+
+def _reader(fileobj: Any, fmt: str, batch_size: int) -> Iterator[Any]:
+    if fmt == "parquet":
+        return pq.ParquetFile(fileobj).iter_batches(batch_size=batch_size)
+    if fmt == "arrow":
+        return iter(ipc.open_stream(fileobj))
+    raise ValueError(f"Unknown format '{fmt}'; expected one of: {', '.join(FORMATS)}")
+
+
+def import_batches(db: Session, table: str, fileobj: Any, fmt: str = "parquet", batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """Bulk-insert every record batch of a Parquet/Arrow file; one commit."""
+    spec = _spec(table)
+    rows = 0
+    batches = 0
+    for batch in _reader(fileobj, fmt, batch_size):
+        if batch.num_rows == 0:
+            continue
+        batch = _conform(batch, spec, db)
+        db.execute(insert(spec["model"]), _rows(batch))
+        if table == "bills":
+            _bill_totals(batch).flush(db)
+        else:
+            totals.apply_income_change(db, pc.sum(batch.column("amount")).as_py() or 0.0)
+        rows += batch.num_rows
+        batches += 1
+    db.commit()
+    return {"table": table, "ingested_rows": rows, "batches": batches}
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back per batch."""
+
+    def __init__(self) -> None:
+        self._parts: List[bytes] = []
+        self.closed = False
+
+    def write(self, data: Any) -> int:
+        self._parts.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drain(self) -> bytes:
+        out, self._parts = b"".join(self._parts), []
+        return out
+
+
+def export_stream(table: str, fmt: str = "parquet", batch_size: int = BATCH_SIZE) -> Iterator[bytes]:
+    """Return an iterator yielding a Parquet/Arrow IPC file one record batch at a time.
+
+    Arguments are validated eagerly; rows are then fetched with a server-side
+    cursor in batch_size chunks, so the full table is never materialized.
+    """
+    spec = _spec(table)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'; expected one of: {', '.join(FORMATS)}")
+    return _export_batches(spec["model"], spec["schema"], fmt, batch_size)
+
+
+def _export_batches(model: Any, table_schema: Any, fmt: str, batch_size: int) -> Iterator[bytes]:
+    schema = pa.schema([("id", pa.int64())] + list(table_schema))
+    cols = [getattr(model, name) for name in schema.names]
+    sink = _ChunkSink()
+    if fmt == "parquet":
+        writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema)
+    else:
+        writer = ipc.new_stream(pa.PythonFile(sink, mode="w"), schema)
+    db = SessionLocal()
+    try:
+        conn = db.connection(execution_options={"stream_results": True})
+        for frame in pd.read_sql(select(*cols).order_by(model.id), conn, chunksize=batch_size):
+            writer.write_batch(pa.RecordBatch.from_pandas(frame, schema=schema, preserve_index=False))
+            yield sink.drain()
+        writer.close()
+        yield sink.drain()
+    finally:
+        db.close()
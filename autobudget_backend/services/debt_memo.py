@@ -0,0 +1,104 @@
+"""Memoized debt payoff results, keyed by a fingerprint of the debt set.
+
+debts(load) -> (debts, fingerprint); load() runs only after a bills write.
+cached_debts() / store_debts(seen, rows) -> the same in two steps, for async loads.
+memoized(kind, debts, fingerprint, params, compute) -> cached compute().
+fingerprint(debts) -> hex digest of the (name, balance, apr, min_payment) set.
+size(), clear(); stats = {hits, misses, evictions, loads}.
+
+The Credit debt list is re-read only when the "bills" data version moves (see
+response_cache.bump) or after DEBT_MEMO_TTL seconds. Results live in a
+DEBT_MEMO_SIZE-entry LRU keyed by (kind, fingerprint, params), so a write that
+does not touch a debt (say, paying a utility bill) still hits. Per process,
+like response_cache.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import response_cache
+
+MAX_ENTRIES = int(os.getenv("DEBT_MEMO_SIZE", "128"))
+TTL_SECONDS = float(os.getenv("DEBT_MEMO_TTL", "60"))
+SCOPES = ("bills",)
+
+_lock = threading.Lock()
+_entries: "OrderedDict[Tuple[Any, ...], Any]" = OrderedDict()
+# (bills version, expires, debts, fingerprint) of the last load
+_debts: Optional[Tuple[Tuple[int, ...], float, List[Dict[str, Any]], str]] = None
+stats = {"hits": 0, "misses": 0, "evictions": 0, "loads": 0}
+
+
+def fingerprint(debts: List[Dict[str, Any]]) -> str:
+    """Order-independent digest of the debt terms that affect a payoff plan."""
+    items = sorted(
+        (str(d.get("name") or ""), float(d.get("balance") or 0), float(d.get("apr") or 0),
+         -1.0 if d.get("min_payment") is None else float(d["min_payment"]))
+        for d in debts
+    )
+    return hashlib.blake2b(repr(items).encode(), digest_size=16).hexdigest()
+
+
+def cached_debts() -> Tuple[Tuple[int, ...], Optional[Tuple[List[Dict[str, Any]], str]]]:
+    """(bills version, (debts, fingerprint) if still current else None)."""
+    seen = response_cache.versions(SCOPES)
+    with _lock:
+        cached = _debts
+    if cached is not None and cached[0] == seen and cached[1] > time.monotonic():
+        return seen, (cached[2], cached[3])
+    return seen, None
+
+
+def store_debts(seen: Tuple[int, ...], rows: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], str]:
+    """Remember debts loaded while bills were at version `seen`."""
+    global _debts
+    fp = fingerprint(rows)
+    with _lock:
+        stats["loads"] += 1
+        if seen == response_cache.versions(SCOPES):  # no write landed mid-load
+            _debts = (seen, time.monotonic() + TTL_SECONDS, rows, fp)
+    return rows, fp
+
+
+def debts(load: Callable[[], List[Dict[str, Any]]]) -> Tuple[List[Dict[str, Any]], str]:
+    """The current debt list and its fingerprint, reloading only when bills changed."""
+    seen, hit = cached_debts()
+    return hit if hit is not None else store_debts(seen, load())
+
+
+def memoized(kind: str, debt_list: List[Dict[str, Any]], fp: str, params: Tuple[Any, ...], compute: Callable[[List[Dict[str, Any]]], Any]) -> Any:
+    """compute(debt_list), cached under (kind, fp, params).
+
+    Results are shared between callers, so treat them as read-only.
+    """
+    key = (kind, fp, params)
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            stats["hits"] += 1
+            return _entries[key]
+        stats["misses"] += 1
+    result = compute(debt_list)
+    with _lock:
+        _entries[key] = result
+        _entries.move_to_end(key)
+        while len(_entries) > MAX_ENTRIES:
+            _entries.popitem(last=False)
+            stats["evictions"] += 1
+    return result
+
+
+def size() -> int:
+    return len(_entries)
+
+
+def clear() -> None:
+    global _debts
+    with _lock:
+        _entries.clear()
+        _debts = None
@@ -0,0 +1,203 @@
+"""Debt payoff optimizer over the pay-period horizon.
+
+load_periods(db, pp_from=None, pp_to=None, floor_pots=FLOOR_POTS)
+  -> [{pp, start_date, end_date, cash}] from pay_period_totals.
+simulate_periods(balances, aprs, minimums, periods, orders, record=False)
+  -> {interest, payoff_period, remaining[, payments]} as arrays.
+optimize(debts, periods, max_rounds=MAX_ROUNDS)
+  -> snowball.plan() shape plus strategy, remaining_balance, schedule and
+     compare ({strategy: {total_interest, remaining_balance}}).
+
+Cash for debts in a period is its summary surplus (income - fixed - variable,
+as in /payperiods/{pp}/summary) less the pots kept at their floor
+(OPTIMIZER_FLOOR_POTS, default Annual_Rainy_Day). Each period interest accrues
+at apr * days / 365, minimums (monthly, pro-rated by days) are paid, and the
+rest of the cash goes to debts in a priority order.
+
+The order is found by greedy search with exchange: start from the better of
+avalanche and snowball, then repeatedly try every pairwise swap of the order
+(all candidates simulated at once as one (swaps, debts) array) and keep the
+best until no swap lowers total interest (remaining balance breaks ties).
+As in snowball.simulate(), minimums are paid even when a period's cash falls
+short, so the order also decides when those minimums stop.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import select
+
+from .. import models
+from . import pay_calendar, snowball, totals
+
+FLOOR_POTS = tuple(p for p in os.getenv("OPTIMIZER_FLOOR_POTS", "Annual_Rainy_Day").split(",") if p)
+MAX_ROUNDS = int(os.getenv("OPTIMIZER_MAX_ROUNDS", "50"))
+# Above this many swaps per round only adjacent swaps are tried.
+MAX_SWAPS = 2000
+
+
+def load_periods(
+    db: Any,
+    pp_from: Optional[int] = None,
+    pp_to: Optional[int] = None,
+    floor_pots: Sequence[str] = FLOOR_POTS,
+) -> List[Dict[str, Any]]:
+    """Pay periods with bills in [pp_from, pp_to] and the cash each has for debts."""
+    # Rows emptied by deletes stay behind with their income; skip them.
+    stmt = select(models.PayPeriodTotal).where(models.PayPeriodTotal.bill_count > 0).order_by(models.PayPeriodTotal.pp)
+    if pp_from is not None:
+        stmt = stmt.where(models.PayPeriodTotal.pp >= pp_from)
+    if pp_to is not None:
+        stmt = stmt.where(models.PayPeriodTotal.pp <= pp_to)
+    calendar = pay_calendar.get_calendar(db)
+    periods = []
+    for total in db.scalars(stmt):
+        summary = totals.summary_from_total(total)
+        reserved = sum(summary["pots"].get(p, 0.0) for p in floor_pots)
+        start, end = calendar.bounds(total.pp)
+        periods.append({
+            "pp": total.pp,
+            "start_date": start,
+            "end_date": end,
+            "cash": round(max(summary["surplus_or_deficit"] - reserved, 0.0), 2),
+        })
+    return periods
+
+
+def simulate_periods(
+    balances: np.ndarray,
+    aprs: np.ndarray,
+    minimums: np.ndarray,
+    periods: Sequence[Dict[str, Any]],
+    orders: np.ndarray,
+    record: bool = False,
+) -> Dict[str, np.ndarray]:
+    """Step S priority orders (S, D) through the periods at once.
+
+    payoff_period is the index of the period a debt is cleared in (-1 if not);
+    payments (S, T, D) is only built with record=True.
+    """
+    orders = np.atleast_2d(orders)
+    n, t_count = len(orders), len(periods)
+    days = np.array([(p["end_date"] - p["start_date"]).days + 1 for p in periods], dtype=float)
+    cash = np.array([p["cash"] for p in periods], dtype=float)
+    rates = np.outer(days / 365.0, aprs / 100.0)
+    mins = np.outer(days * 12 / 365.0, minimums)
+    rows = np.arange(n)[:, None]
+
+    bal = np.tile(np.asarray(balances, dtype=float), (n, 1))
+    bal[bal <= snowball.EPSILON] = 0.0
+    payoff = np.where(bal > 0, -1, 0)
+    interest = np.zeros_like(bal)
+    payments = np.zeros((n, t_count, bal.shape[1])) if record else None
+    for t in range(t_count):
+        active = bal > 0
+        if not active.any():
+            break
+        accrued = bal * rates[t]
+        interest += accrued
+        bal += accrued
+        paid = np.minimum(mins[t], bal)
+        bal -= paid
+        extra = snowball.allocate(bal, np.maximum(cash[t] - paid.sum(axis=1), 0.0), orders, rows)
+        bal -= extra
+        done = bal <= snowball.EPSILON
+        payoff[active & done] = t
+        bal[done] = 0.0
+        if record:
+            payments[:, t] = paid + extra
+    out = {"interest": interest, "payoff_period": payoff, "remaining": bal}
+    if record:
+        out["payments"] = payments
+    return out
+
+
+def _best(res: Dict[str, np.ndarray]) -> int:
+    """Index of the lowest total interest; remaining balance breaks ties."""
+    return int(np.lexsort((res["remaining"].sum(axis=1).round(2), res["interest"].sum(axis=1).round(6)))[0])
+
+
+def _swaps(order: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    cand = np.tile(order, (len(pairs), 1))
+    idx = np.arange(len(pairs))
+    cand[idx, pairs[:, 0]] = order[pairs[:, 1]]
+    cand[idx, pairs[:, 1]] = order[pairs[:, 0]]
+    return cand
+
+
+def _months_between(start: date, end: date) -> int:
+    return (end.year - start.year) * 12 + end.month - start.month + (1 if end.day > start.day else 0)
+
+
+def optimize(
+    debts: List[Dict[str, Any]],
+    periods: Sequence[Dict[str, Any]],
+    max_rounds: int = MAX_ROUNDS,
+) -> Dict[str, Any]:
+    """Lowest-interest payoff order over the periods, in snowball.plan() shape."""
+    cleaned = snowball.normalize(debts)
+    balances = np.array([d["balance"] for d in cleaned], dtype=float)
+    aprs = np.array([d["apr"] for d in cleaned], dtype=float)
+    mins = np.array([d["min_payment"] for d in cleaned], dtype=float)
+    count = len(cleaned)
+
+    baselines = {s: snowball.priority(s, balances, aprs) for s in ("avalanche", "snowball")}
+    res = simulate_periods(balances, aprs, mins, periods, np.array(list(baselines.values())).reshape(2, count))
+    compare = {
+        s: {
+            "total_interest": round(float(res["interest"][i].sum()), 2),
+            "remaining_balance": round(float(res["remaining"][i].sum()), 2),
+        }
+        for i, s in enumerate(baselines)
+    }
+    order = list(baselines.values())[_best(res)]
+
+    pairs = np.array(list(itertools.combinations(range(count), 2)), dtype=np.intp).reshape(-1, 2)
+    if len(pairs) > MAX_SWAPS:
+        pairs = np.column_stack([np.arange(count - 1), np.arange(1, count)])
+    best = res["interest"].sum(axis=1).min() if count else 0.0
+    for _ in range(max_rounds if len(pairs) else 0):
+        cand = _swaps(order, pairs)
+        res = simulate_periods(balances, aprs, mins, periods, cand)
+        i = _best(res)
+        if res["interest"][i].sum() >= best - 1e-9:
+            break
+        order, best = cand[i], res["interest"][i].sum()
+
+    res = simulate_periods(balances, aprs, mins, periods, order, record=True)
+    start = periods[0]["start_date"] if periods else date.today()
+    out = []
+    for i in order:
+        k = int(res["payoff_period"][0, i])
+        payoff_date = periods[k]["end_date"] if k >= 0 and periods else None
+        out.append({
+            **cleaned[i],
+            "months": _months_between(start, payoff_date) if payoff_date else None,
+            "payoff_date": payoff_date.isoformat() if payoff_date else None,
+            "payoff_eta_days": (payoff_date - start).days if payoff_date else None,
+            "interest_paid": round(float(res["interest"][0, i]), 2),
+        })
+    remaining = float(res["remaining"][0].sum())
+    last = max((periods[k]["end_date"] for k in res["payoff_period"][0] if 0 <= k < len(periods)), default=None)
+    done = remaining <= snowball.EPSILON and last is not None
+    total_interest = round(float(res["interest"][0].sum()), 2)
+    compare["optimal"] = {"total_interest": total_interest, "remaining_balance": round(remaining, 2)}
+    return {
+        "strategy": "optimal",
+        "debts": out,
+        "months": _months_between(start, last) if done else None,
+        "payoff_date": last.isoformat() if done else None,
+        "total_interest": total_interest,
+        "remaining_balance": round(remaining, 2),
+        "schedule": {
+            "pp": [p["pp"] for p in periods],
+            "cash": [p["cash"] for p in periods],
+            # payments[t][j] goes to debts[j] in period pp[t]
+            "payments": res["payments"][0][:, order].round(2).tolist(),
+        },
+        "compare": compare,
+    }
@@ -0,0 +1,131 @@
+"""Payoff sweeps: months and total interest over a grid of monthly payments.
+
+payments(start, stop, step) -> the payment grid (inclusive of stop).
+custom_priority(debts, names) -> priority order following a list of names.
+sweep(debts, payments, strategies, order_names=None, start=None)
+  -> {start, payments, strategies, months, total_interest}.
+
+Each strategy's grid is one snowball.simulate() call with one scenario per
+payment, so a sweep costs about as much as a few single plans. Grids of at
+least SWEEP_PARALLEL_POINTS points are split into chunks of SWEEP_CHUNK
+payments and run on a process pool of SWEEP_WORKERS (spawned lazily, closed by
+shutdown()). Results are parallel arrays indexed [strategy][payment]; months
+is null where some debt is never paid off.
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from . import snowball
+
+STRATEGIES = ("snowball", "avalanche", "custom")
+MAX_POINTS = int(os.getenv("SWEEP_MAX_POINTS", "20000"))
+PARALLEL_POINTS = int(os.getenv("SWEEP_PARALLEL_POINTS", "4000"))
+CHUNK = int(os.getenv("SWEEP_CHUNK", "500"))
+WORKERS = int(os.getenv("SWEEP_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def payments(start: float, stop: float, step: float) -> np.ndarray:
+    """Monthly payments start, start + step, ... up to stop; raises ValueError."""
+    if step <= 0 or start < 0 or stop < start:
+        raise ValueError("Expected 0 <= start <= stop and step > 0")
+    count = int(np.floor((stop - start) / step + 1e-9)) + 1
+    if count > MAX_POINTS:
+        raise ValueError(f"Too many payments: {count} (max {MAX_POINTS})")
+    return start + step * np.arange(count)
+
+
+def custom_priority(debts: Sequence[Dict[str, Any]], names: Sequence[str]) -> np.ndarray:
+    """Debts named in `names` first, in that order; the rest after, by balance."""
+    rank = {name: i for i, name in enumerate(dict.fromkeys(names))}
+    balances = [float(d.get("balance") or 0) for d in debts]
+    keys = [(rank.get(d.get("name"), len(rank)), balances[i]) for i, d in enumerate(debts)]
+    return np.array(sorted(range(len(debts)), key=keys.__getitem__), dtype=np.intp)
+
+
+def _pool_executor() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn: forking a threaded server process can deadlock the child
+            _pool = ProcessPoolExecutor(WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def shutdown() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def _simulate_chunk(balances, aprs, mins, budgets, order):
+    res = snowball.simulate(balances, aprs, mins, budgets, order)
+    return res["months"], res["total_interest"]
+
+
+def sweep(
+    debts: List[Dict[str, Any]],
+    payment_grid: Sequence[float],
+    strategies: Sequence[str] = ("snowball", "avalanche"),
+    order_names: Optional[Sequence[str]] = None,
+    start: Optional[date] = None,
+    parallel: Optional[bool] = None,
+) -> Dict[str, Any]:
+    """Evaluate every (strategy, payment) pair; parallel=None decides by grid size."""
+    unknown = [s for s in strategies if s not in STRATEGIES]
+    if unknown:
+        raise ValueError(f"Unknown strategies: {', '.join(unknown)}; expected any of: {', '.join(STRATEGIES)}")
+    if "custom" in strategies and not order_names:
+        raise ValueError("The custom strategy needs an order of debt names")
+    grid = np.asarray(payment_grid, dtype=float)
+    cleaned = snowball.normalize(debts)
+    balances = np.array([d["balance"] for d in cleaned])
+    aprs = np.array([d["apr"] for d in cleaned])
+    mins = np.array([d["min_payment"] for d in cleaned])
+    orders = {
+        s: custom_priority(cleaned, order_names) if s == "custom" else snowball.priority(s, balances, aprs)
+        for s in strategies
+    }
+    if parallel is None:
+        parallel = len(grid) * len(strategies) >= PARALLEL_POINTS and WORKERS > 1
+
+    chunks = [(s, grid[i:i + CHUNK]) for s in strategies for i in range(0, len(grid), CHUNK)]
+    parts = None
+    if parallel:
+        pool = _pool_executor()
+        try:
+            futures = [pool.submit(_simulate_chunk, balances, aprs, mins, budgets, orders[s]) for s, budgets in chunks]
+            parts = [f.result() for f in futures]
+        except BrokenProcessPool:
+            shutdown()  # a worker died; start a fresh pool next time, finish here
+    if parts is None:
+        parts = [_simulate_chunk(balances, aprs, mins, budgets, orders[s]) for s, budgets in chunks]
+
+    months: Dict[str, List[np.ndarray]] = {s: [] for s in strategies}
+    interest: Dict[str, List[np.ndarray]] = {s: [] for s in strategies}
+    for (s, _), (m, ti) in zip(chunks, parts):
+        months[s].append(m)
+        interest[s].append(ti)
+    return {
+        "start": (start or date.today()).isoformat(),
+        "payments": grid.round(2).tolist(),
+        "strategies": list(strategies),
+        "months": [
+            [int(v) if v >= 0 else None for v in np.concatenate(months[s] or [np.empty(0)])]
+            for s in strategies
+        ],
+        "total_interest": [np.concatenate(interest[s] or [np.empty(0)]).round(2).tolist() for s in strategies],
+    }
@@ -0,0 +1,154 @@
+"""Async reminder delivery: per-channel batches, bounded concurrency, retries.
+
+deliver(messages, sinks=None, concurrency, batch_size, max_attempts, backoff)
+  -> [{reminder_id, status, attempts, error, delivered_at}], one per message.
+
+Messages are grouped by channel and split into batches of batch_size; at most
+`concurrency` batches are in flight at once. A sink's send(batch) returns one
+error (or None) per message, or raises to fail the whole batch. Failed
+messages are retried with exponential backoff (backoff * 2**n, jittered) until
+max_attempts, then reported as "failed".
+
+Sinks stand in for real providers: ConsoleSink (the default "console"
+channel), FileSink (JSON lines) and MemorySink (tests). register_sink() adds
+or replaces a channel.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import random
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+CONCURRENCY = int(os.getenv("REMINDER_CONCURRENCY", "10"))
+BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "50"))
+MAX_ATTEMPTS = int(os.getenv("REMINDER_MAX_ATTEMPTS", "3"))
+BACKOFF_SECONDS = float(os.getenv("REMINDER_BACKOFF_SECONDS", "0.5"))
+DEFAULT_CHANNEL = os.getenv("REMINDER_CHANNEL", "console")
+
+
+class Message:
+    __slots__ = ("reminder_id", "bill_id", "channel", "text")
+
+    def __init__(self, reminder_id: int, bill_id: int, channel: str, text: str) -> None:
+        self.reminder_id = reminder_id
+        self.bill_id = bill_id
+        self.channel = channel
+        self.text = text
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"reminder_id": self.reminder_id, "bill_id": self.bill_id, "channel": self.channel, "text": self.text}
+
+
+class ConsoleSink:
+    """Prints each reminder; the behaviour of the old placeholder."""
+
+    async def send(self, batch: Sequence[Message]) -> List[Optional[str]]:
+        for msg in batch:
+            print(f"[REMINDER] {msg.text}")
+        return [None] * len(batch)
+
+
+class FileSink:
+    """Appends each batch to a JSON-lines file."""
+
+    def __init__(self, path: Any) -> None:
+        self.path = Path(path)
+
+    def _write(self, batch: Sequence[Message]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as fh:
+            fh.writelines(json.dumps(msg.as_dict()) + "\n" for msg in batch)
+
+    async def send(self, batch: Sequence[Message]) -> List[Optional[str]]:
+        await asyncio.to_thread(self._write, batch)
+        return [None] * len(batch)
+
+
+class MemorySink:
+    """Collects messages in memory; fail_first[reminder_id] = n fails that message n times."""
+
+    def __init__(self, fail_first: Optional[Dict[int, int]] = None) -> None:
+        self.sent: List[Message] = []
+        self.batches: List[int] = []
+        self.fail_first = dict(fail_first or {})
+
+    async def send(self, batch: Sequence[Message]) -> List[Optional[str]]:
+        self.batches.append(len(batch))
+        errors: List[Optional[str]] = []
+        for msg in batch:
+            if self.fail_first.get(msg.reminder_id, 0) > 0:
+                self.fail_first[msg.reminder_id] -= 1
+                errors.append("simulated failure")
+            else:
+                self.sent.append(msg)
+                errors.append(None)
+        return errors
+
+
+SINKS: Dict[str, Any] = {"console": ConsoleSink()}
+
+
+def register_sink(channel: str, sink: Any) -> None:
+    SINKS[channel] = sink
+
+
+def _batches(messages: Sequence[Message], batch_size: int) -> List[List[Message]]:
+    by_channel: Dict[str, List[Message]] = {}
+    for msg in messages:
+        by_channel.setdefault(msg.channel, []).append(msg)
+    return [
+        group[i:i + batch_size]
+        for group in by_channel.values()
+        for i in range(0, len(group), batch_size)
+    ]
+
+
+async def deliver(
+    messages: Sequence[Message],
+    sinks: Optional[Dict[str, Any]] = None,
+    concurrency: int = CONCURRENCY,
+    batch_size: int = BATCH_SIZE,
+    max_attempts: int = MAX_ATTEMPTS,
+    backoff: float = BACKOFF_SECONDS,
+) -> List[Dict[str, Any]]:
+    """Send every message; returns one outcome per message."""
+    sinks = SINKS if sinks is None else sinks
+    limit = asyncio.Semaphore(max(1, concurrency))
+    outcomes: Dict[int, Dict[str, Any]] = {}
+
+    async def run_batch(batch: List[Message]) -> None:
+        sink = sinks.get(batch[0].channel)
+        pending = batch
+        for attempt in range(1, max_attempts + 1):
+            if sink is None:
+                errors: List[Optional[str]] = [f"No sink for channel '{batch[0].channel}'"] * len(pending)
+            else:
+                async with limit:
+                    try:
+                        errors = list(await sink.send(pending))
+                    except Exception as e:
+                        errors = [f"{type(e).__name__}: {e}"] * len(pending)
+            retry = []
+            for msg, error in zip(pending, errors):
+                outcomes[msg.reminder_id] = {
+                    "reminder_id": msg.reminder_id,
+                    "status": "sent" if error is None else "failed",
+                    "attempts": attempt,
+                    "error": error,
+                    "delivered_at": datetime.utcnow() if error is None else None,
+                }
+                if error is not None:
+                    retry.append(msg)
+            if not retry or sink is None:
+                return
+            pending = retry
+            if attempt < max_attempts:
+                # Sleep outside the semaphore so other batches keep flowing.
+                await asyncio.sleep(backoff * 2 ** (attempt - 1) * random.uniform(0.5, 1.0))
+
+    await asyncio.gather(*(run_batch(b) for b in _batches(messages, batch_size)))
+    return [outcomes[msg.reminder_id] for msg in messages]
@@ -0,0 +1,200 @@
+"""In-process schedule of upcoming bill reminders (min-heap of fire times).
+
+A bill's reminder fires at REMINDER_HOUR on due_date - REMINDER_LEAD_DAYS (or
+right away if that moment has passed and the bill is not yet due). The heap is
+built from unpaid bills with due_date >= today, an index range on
+ix_bills_due_date, so its cost follows upcoming bills rather than history.
+
+Bill writes keep it current: update(bill_id, due_date, paid) and discard(bill_id)
+after single or batch writes, invalidate() after bulk loads (the next tick
+reloads). run(fire) sleeps until the earliest fire time and calls
+fire(bill_ids); a write that schedules an earlier event wakes it. fire may
+return the ids it did not handle; those are retried after the next reload.
+
+Only the scheduler leader runs run(), so writes served by other workers never
+reach its heap directly; run() also reloads from the DB every
+REMINDER_RELOAD_SECONDS to pick them up. Fire times already fired are
+remembered, so a reload does not fire them again.
+"""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from autobudget_backend import models
+
+LEAD_DAYS = int(os.getenv("REMINDER_LEAD_DAYS", "3"))
+REMINDER_HOUR = int(os.getenv("REMINDER_HOUR", "9"))
+# Upper bound on one sleep, so clock jumps and missed wake-ups self-correct.
+MAX_SLEEP_SECONDS = 3600.0
+RELOAD_SECONDS = float(os.getenv("REMINDER_RELOAD_SECONDS", "60"))
+RETRY_SECONDS = 60.0
+
+
+class DueSchedule:
+    """Heap of (fire_at, bill_id) with lazy deletion; thread-safe."""
+
+    def __init__(self, lead_days: int = LEAD_DAYS, hour: int = REMINDER_HOUR) -> None:
+        self.lead_days = lead_days
+        self.hour = hour
+        self._heap: List[Tuple[datetime, int]] = []
+        self._targets: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        # Writes seen while a reload is in flight; replayed on top of it.
+        self._pending: Dict[int, Optional[datetime]] = {}
+        # Fire time each bill last fired at; skipped when a reload brings it back.
+        self._fired: Dict[int, datetime] = {}
+        self._wake: Optional[Callable[[], None]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def fire_time(self, due_date: date) -> datetime:
+        return datetime.combine(due_date - timedelta(days=self.lead_days), time(self.hour))
+
+    def load(self, rows: Iterable[Tuple[int, date]]) -> None:
+        """Replace the schedule with (bill_id, due_date) of unpaid upcoming bills."""
+        targets = {bill_id: self.fire_time(due) for bill_id, due in rows if due is not None}
+        with self._lock:
+            for bill_id, fire_at in self._pending.items():
+                if fire_at is None:
+                    targets.pop(bill_id, None)
+                else:
+                    targets[bill_id] = fire_at
+            self._pending.clear()
+            self._fired = {b: f for b, f in self._fired.items() if targets.get(b) == f}
+            for bill_id in self._fired:
+                del targets[bill_id]
+            self._heap = [(fire_at, bill_id) for bill_id, fire_at in targets.items()]
+            heapq.heapify(self._heap)
+            self._targets, self._loaded = targets, True
+        self._notify()
+
+    def invalidate(self) -> None:
+        """Force a reload from the DB on the next tick (after bulk writes)."""
+        with self._lock:
+            self._loaded = False
+        self._notify()
+
+    def update(self, bill_id: int, due_date: Optional[date], paid: bool = False) -> None:
+        """Reschedule one bill after a write; paid, past or undated bills are dropped."""
+        if due_date is None or paid or due_date < date.today():
+            self.discard(bill_id)
+            return
+        fire_at = self.fire_time(due_date)
+        with self._lock:
+            if not self._loaded:
+                if self._wake is not None:  # a runner will reload; otherwise nothing to keep
+                    self._pending[bill_id] = fire_at
+                return
+            if self._targets.get(bill_id) == fire_at or self._fired.get(bill_id) == fire_at:
+                return
+            self._targets[bill_id] = fire_at
+            heapq.heappush(self._heap, (fire_at, bill_id))
+            earliest = self._heap[0] == (fire_at, bill_id)
+        if earliest:
+            self._notify()
+
+    def discard(self, bill_id: int) -> None:
+        with self._lock:
+            if not self._loaded and self._wake is not None:
+                self._pending[bill_id] = None
+            self._targets.pop(bill_id, None)  # its heap entry is skipped when popped
+
+    def next_fire(self) -> Optional[datetime]:
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> List[int]:
+        """Remove and return bills whose fire time is <= now."""
+        due: List[int] = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                fire_at, bill_id = heapq.heappop(self._heap)
+                if self._targets.get(bill_id) == fire_at:
+                    del self._targets[bill_id]
+                    self._fired[bill_id] = fire_at
+                    due.append(bill_id)
+        return due
+
+    def unfire(self, bill_ids: Iterable[int]) -> None:
+        """Forget that bills fired (their run failed), so the next load reschedules them."""
+        with self._lock:
+            for bill_id in bill_ids:
+                self._fired.pop(bill_id, None)
+
+    def __len__(self) -> int:
+        return len(self._targets)
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._targets.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _notify(self) -> None:
+        if self._wake is not None:
+            self._wake()
+
+
+def upcoming_bills(db: Any, today: Optional[date] = None) -> List[Tuple[int, date]]:
+    Bill = models.Bill
+    return [tuple(row) for row in db.execute(
+        select(Bill.id, Bill.due_date).where(Bill.paid == False, Bill.due_date >= (today or date.today()))
+    )]
+
+
+schedule = DueSchedule()
+
+
+async def run(
+    fire: Callable[[List[int]], Awaitable[Optional[Iterable[int]]]],
+    reload: Callable[[], Awaitable[List[Tuple[int, date]]]],
+    sched: DueSchedule = schedule,
+    reload_every: float = RELOAD_SECONDS,
+) -> None:
+    """Fire reminders as their times come up; runs until cancelled."""
+    loop = asyncio.get_running_loop()
+    wake = asyncio.Event()
+    sched._wake = lambda: loop.call_soon_threadsafe(wake.set)
+    loaded_at = float("-inf")
+    try:
+        while True:
+            wake.clear()
+            if sched.loaded and loop.time() - loaded_at >= reload_every:
+                sched.invalidate()  # writes landing mid-reload are replayed on top
+            if not sched.loaded:
+                sched.load(await reload())
+                loaded_at = loop.time()
+                wake.clear()
+            due = sched.pop_due(datetime.now())
+            if due:
+                try:
+                    skipped = list(await fire(due) or ())
+                    if skipped:
+                        print(f"Reminder run did not select bills {skipped}; retrying after the next reload")
+                        sched.unfire(skipped)
+                except Exception as e:
+                    # Reload so the popped bills are rescheduled, then back off.
+                    print(f"Reminder run failed: {e}")
+                    sched.unfire(due)
+                    sched.invalidate()
+                    await asyncio.sleep(RETRY_SECONDS)
+                continue
+            next_fire = sched.next_fire()
+            delay = min(MAX_SLEEP_SECONDS, max(reload_every - (loop.time() - loaded_at), 0.0))
+            if next_fire is not None:
+                delay = min(delay, max((next_fire - datetime.now()).total_seconds(), 0.0))
+            try:
+                await asyncio.wait_for(wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        sched._wake = None
@@ -0,0 +1,399 @@
+"""Bill CSV ingest utilities.
+
+ingest_bills_stream(upload, db) -> {ingested_rows, skipped_rows, rows_per_second}.
+Reads the upload in fixed-size chunks, parses rows incrementally and flushes
+bulk inserts from a worker thread so the event loop is never blocked.
+
+ingest_bills_upsert(upload, db) -> {inserted, updated, unchanged, rejected, ...}.
+Content-hash based re-ingest: seen files are skipped, changed files apply a
+row-level delta.
+
+bulk_load_bills_frame(db, df, ...) -> (bills, pay_periods) for DataFrame loads.
+"""
+from __future__ import annotations
+
+import codecs
+import csv
+import hashlib
+import io
+import time
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .. import models
+from . import pay_calendar, totals
+
+CHUNK_SIZE = 64 * 1024
+BATCH_SIZE = 1000
+SNIFF_SIZE = 2048
+BULK_BATCH_SIZE = 5000
+
+# CSV header (lowercased) -> Bill column, in the positional order assumed
+# when the file has no header row.
+BILL_HEADERS: Tuple[Tuple[str, str], ...] = (
+    ("name", "name"),
+    ("amount", "amount"),
+    ("dueday", "due_day"),
+    ("class", "bill_class"),
+    ("pp", "pp"),
+)
+
+
+def _sniff(sample: str) -> Tuple[Any, bool]:
+    try:
+        sniffer = csv.Sniffer()
+        return sniffer.sniff(sample), sniffer.has_header(sample)
+    except Exception:
+        return csv.excel, True
+
+
+def _split_lines(text: str) -> List[str]:
+    # Only CR, LF and CRLF end a line; str.splitlines would also split on
+    # form feeds, NEL and Unicode line separators inside quoted fields.
+    return io.StringIO(text, newline="").readlines()
+
+
+def _complete_lines(text: str, quotechar: Optional[str]) -> Tuple[List[str], str]:
+    """Split text into lines that end on a record boundary plus the remainder.
+
+    A record may span lines when a quoted field contains a newline; we only
+    release lines once the running quote count is even.
+    """
+    lines = _split_lines(text)
+    # A trailing CR may be the first half of a CRLF split across chunks.
+    if lines and not lines[-1].endswith("\n"):
+        remainder = lines.pop()
+    else:
+        remainder = ""
+    if not quotechar:
+        return lines, remainder
+    cut = 0
+    quotes = 0
+    for i, line in enumerate(lines):
+        quotes += line.count(quotechar)
+        if quotes % 2 == 0:
+            cut = i + 1
+    return lines[:cut], "".join(lines[cut:]) + remainder
+
+
+def resolve_columns(header: Optional[List[str]]) -> Dict[str, int]:
+    """Map Bill columns to CSV positions once; raises ValueError if one is missing."""
+    if header is None:
+        return {col: i for i, (_, col) in enumerate(BILL_HEADERS)}
+    positions = {h.strip().lower(): i for i, h in enumerate(header)}
+    missing = [h for h, _ in BILL_HEADERS if h not in positions]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    return {col: positions[h] for h, col in BILL_HEADERS}
+
+
+def parse_row(row: List[str], cols: Dict[str, int]) -> Dict[str, Any]:
+    """Convert one CSV row into Bill column values; raises ValueError/IndexError."""
+    return {
+        "name": row[cols["name"]],
+        "amount": float(row[cols["amount"]]),
+        "due_day": int(row[cols["due_day"]]),
+        "bill_class": row[cols["bill_class"]],
+        "pp": int(row[cols["pp"]]),
+    }
+
+
+def iter_bill_rows(
+    rows: Iterable[List[str]],
+    cols: Dict[str, int],
+    stats: Dict[str, int],
+    errors: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Yield parsed Bill rows, counting rejects in stats['skipped_rows'].
+
+    When errors is given, each reject's message is appended to it.
+    """
+    for row in rows:
+        if not any(cell.strip() for cell in row):
+            continue
+        try:
+            yield parse_row(row, cols)
+        except (ValueError, IndexError) as e:
+            stats["skipped_rows"] += 1
+            if errors is not None:
+                errors.append(f"{e} (row: {','.join(row)[:80]})")
+            print(f"Skipping row due to parsing error: {e}")
+
+
+async def aiter_csv_rows(upload: Any, chunk_size: int = CHUNK_SIZE):
+    """Yield (header, rows) batches parsed from an async-readable upload.
+
+    header is None for headerless files. Each yielded batch holds the rows
+    completed by one chunk, so memory is bounded by chunk_size.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    dialect = None
+    header: Optional[List[str]] = None
+    first = True
+    while True:
+        chunk = await upload.read(chunk_size)
+        final = not chunk
+        text = pending + decoder.decode(chunk or b"", final=final)
+        if dialect is None:
+            if not final and len(text) < SNIFF_SIZE:
+                pending = text
+                continue
+            if not text:
+                return
+            dialect, has_header = _sniff(text[:SNIFF_SIZE])
+        if final:
+            lines, pending = _split_lines(text), ""
+        else:
+            lines, pending = _complete_lines(text, getattr(dialect, "quotechar", '"'))
+        rows = list(csv.reader(lines, dialect))
+        if first and rows:
+            first = False
+            if has_header:
+                header = rows.pop(0)
+        if rows:
+            yield header, rows
+        if final:
+            return
+
+
+async def aiter_bill_batches(
+    upload: Any,
+    stats: Dict[str, int],
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = BATCH_SIZE,
+    errors: Optional[List[str]] = None,
+):
+    """Yield lists of parsed Bill rows of at most batch_size from an upload."""
+    cols: Optional[Dict[str, int]] = None
+    batch: List[Dict[str, Any]] = []
+    async for header, rows in aiter_csv_rows(upload, chunk_size):
+        if cols is None:
+            cols = resolve_columns(header)
+        for bill in iter_bill_rows(rows, cols, stats, errors):
+            batch.append(bill)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+def _insert_batch(db: Session, batch: List[Dict[str, Any]]) -> None:
+    pay_calendar.stamp_due_dates(batch, db)
+    db.execute(insert(models.Bill), batch)
+    totals.TotalsDelta().add_rows(batch).flush(db)
+
+
+def throughput(rows: int, started: float) -> float:
+    """Rows per second since the perf_counter() timestamp started."""
+    return round(rows / max(time.perf_counter() - started, 1e-9), 1)
+
+
+async def ingest_bills_stream(
+    upload: Any,
+    db: Session,
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Stream a bills CSV into the DB in bulk batches; one commit at the end."""
+    started = time.perf_counter()
+    stats = {"ingested_rows": 0, "skipped_rows": 0}
+    async for batch in aiter_bill_batches(upload, stats, chunk_size, batch_size):
+        await run_in_threadpool(_insert_batch, db, batch)
+        stats["ingested_rows"] += len(batch)
+    await run_in_threadpool(db.commit)
+    return {**stats, "rows_per_second": throughput(stats["ingested_rows"], started)}
+
+
+# --- Idempotent re-ingest: file and row fingerprints
+
+def normalize_bill(bill: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form used for both storage and fingerprints."""
+    return {
+        "name": " ".join(str(bill["name"]).split()),
+        "amount": round(float(bill["amount"]), 2),
+        "due_day": int(bill["due_day"]),
+        "bill_class": str(bill["bill_class"]).strip(),
+        "pp": int(bill["pp"]),
+    }
+
+
+def row_key(bill: Dict[str, Any]) -> str:
+    """Identity of a normalized bill: same name, due day and pay period."""
+    raw = f"{bill['name'].lower()}|{bill['due_day']}|{bill['pp']}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def row_hash(bill: Dict[str, Any]) -> str:
+    """Content fingerprint of a normalized bill."""
+    raw = f"{bill['name']}|{bill['amount']:.2f}|{bill['due_day']}|{bill['bill_class']}|{bill['pp']}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def file_hash(upload: Any, chunk_size: int = CHUNK_SIZE) -> str:
+    """sha256 of the upload; rewinds it so it can be parsed afterwards."""
+    digest = hashlib.sha256()
+    while True:
+        chunk = await upload.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+    await upload.seek(0)
+    return digest.hexdigest()
+
+
+def _upsert_batch(db: Session, batch: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+    # Collapse repeated keys within the batch; the last row wins.
+    incoming: Dict[str, Tuple[Dict[str, Any], str]] = {}
+    for raw in batch:
+        bill = normalize_bill(raw)
+        incoming[row_key(bill)] = (bill, row_hash(bill))
+    stats["unchanged"] += len(batch) - len(incoming)
+
+    existing = {
+        key: (bill_id, h, (pp, bill_class or "", amount or 0.0, bool(paid)))
+        for bill_id, key, h, pp, bill_class, amount, paid in db.execute(
+            select(
+                models.BillFingerprint.bill_id,
+                models.BillFingerprint.row_key,
+                models.BillFingerprint.row_hash,
+                models.Bill.pp,
+                models.Bill.bill_class,
+                models.Bill.amount,
+                models.Bill.paid,
+            )
+            .join(models.Bill, models.Bill.id == models.BillFingerprint.bill_id)
+            .where(models.BillFingerprint.row_key.in_(list(incoming)))
+        )
+    }
+
+    new_keys: List[str] = []
+    new_rows: List[Dict[str, Any]] = []
+    bill_updates: List[Dict[str, Any]] = []
+    fp_updates: List[Dict[str, Any]] = []
+    delta = totals.TotalsDelta()
+    for key, (bill, h) in incoming.items():
+        known = existing.get(key)
+        if known is None:
+            new_keys.append(key)
+            new_rows.append(bill)
+        elif known[1] == h:
+            stats["unchanged"] += 1
+        else:
+            bill_updates.append({"id": known[0], **bill})
+            fp_updates.append({"bill_id": known[0], "row_hash": h})
+            old = known[2]
+            delta.change(old, (bill["pp"], bill["bill_class"], bill["amount"], old[3]))
+
+    pay_calendar.stamp_due_dates(new_rows + bill_updates, db)
+    if new_rows:
+        ids = db.scalars(
+            insert(models.Bill).returning(models.Bill.id, sort_by_parameter_order=True),
+            new_rows,
+        ).all()
+        db.execute(
+            insert(models.BillFingerprint),
+            [
+                {"bill_id": bill_id, "row_key": key, "row_hash": incoming[key][1]}
+                for bill_id, key in zip(ids, new_keys)
+            ],
+        )
+        delta.add_rows(new_rows)
+        stats["inserted"] += len(new_rows)
+    if bill_updates:
+        db.execute(update(models.Bill), bill_updates)
+        db.execute(update(models.BillFingerprint), fp_updates)
+        stats["updated"] += len(bill_updates)
+    delta.flush(db)
+
+
+async def ingest_bills_upsert(
+    upload: Any,
+    db: Session,
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = BATCH_SIZE,
+) -> Dict[str, Any]:
+    """Idempotently apply a bills CSV.
+
+    A file whose sha256 was already applied is skipped with one primary-key
+    lookup. Otherwise each row is keyed by (name, due_day, pp) and only rows
+    that are new or whose content fingerprint changed are written.
+    """
+    started = time.perf_counter()
+    digest = await file_hash(upload, chunk_size)
+    stats = {"inserted": 0, "updated": 0, "unchanged": 0, "rejected": 0}
+    result: Dict[str, Any] = {"mode": "upsert", "file_hash": digest, "skipped": False}
+    if await run_in_threadpool(db.get, models.IngestFile, digest) is not None:
+        return {**result, "skipped": True, **stats, "ingested_rows": 0, "rows_per_second": 0.0}
+
+    parse_stats = {"skipped_rows": 0}
+    async for batch in aiter_bill_batches(upload, parse_stats, chunk_size, batch_size):
+        await run_in_threadpool(_upsert_batch, db, batch, stats)
+    stats["rejected"] = parse_stats["skipped_rows"]
+    total = sum(stats.values())
+    db.add(models.IngestFile(file_hash=digest, ingested_at=datetime.utcnow(), rows=total))
+    await run_in_threadpool(db.commit)
+    written = stats["inserted"] + stats["updated"]
+    return {**result, **stats, "ingested_rows": written, "rows_per_second": throughput(total, started)}
+
+
+def pay_period_rows(pp_numbers: Any, anchor: date) -> List[Dict[str, Any]]:
+    """Build pay period rows for the distinct PPs, set-based.
+
+    The smallest PP starts on anchor; each later PP is offset by 2 weeks per
+    number and spans 14 days.
+    """
+    pps = np.unique(np.asarray(pp_numbers, dtype=np.int64))
+    if pps.size == 0:
+        return []
+    starts = np.datetime64(anchor, "D") + ((pps - pps[0]) * 14).astype("timedelta64[D]")
+    ends = starts + np.timedelta64(13, "D")
+    return [
+        {"pp_number": pp, "start_date": s, "end_date": e}
+        for pp, s, e in zip(pps.tolist(), starts.tolist(), ends.tolist())
+    ]
+
+
+def bulk_load_bills_frame(
+    db: Session,
+    df: Any,
+    bill_table: Any,
+    pay_period_table: Any,
+    anchor: date,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> Tuple[int, int]:
+    """Replace bills and pay periods from a DataFrame in one transaction.
+
+    Columns shared by df and bill_table are written with Core insert()
+    executemany batches; pay periods are derived from df["PP"]. Tables are
+    passed in so legacy schemas (main.BillDB, scripts/ingest_data.BillDB) can
+    share the loader. Returns (bill_count, pay_period_count).
+    """
+    cols = [c.name for c in bill_table.columns if c.name in df.columns]
+    frame = df[cols]
+    if "paid" in bill_table.columns and "paid" not in df.columns:
+        frame = frame.assign(paid=False)
+    pp_rows = pay_period_rows(df["PP"].to_numpy(), anchor)
+    try:
+        if bill_table.name == models.Bill.__tablename__ and inspect(db.get_bind()).has_table(
+            models.BillFingerprint.__tablename__
+        ):
+            # Fingerprints point at the bills being replaced.
+            db.execute(delete(models.BillFingerprint))
+        db.execute(delete(bill_table))
+        db.execute(delete(pay_period_table))
+        for start in range(0, len(frame), batch_size):
+            db.execute(insert(bill_table), frame.iloc[start:start + batch_size].to_dict("records"))
+        if pp_rows:
+            db.execute(insert(pay_period_table), pp_rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return len(frame), len(pp_rows)
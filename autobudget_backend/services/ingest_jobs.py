@@ -0,0 +1,221 @@
+"""Background, resumable bills ingest jobs.
+
+create_job(upload) spools the upload to .devdata/ingest_jobs and records a
+queued job; run_job(job_id) streams it into the DB in checkpointed batches.
+Each batch and its progress row commit together, so a job interrupted by a
+restart resumes from its last committed batch (resume_pending_jobs()).
+
+A worker claims a job with one conditional UPDATE (queued, or running with a
+heartbeat older than INGEST_JOB_STALE_SECONDS) that sets owner and heartbeat;
+every checkpoint refreshes the heartbeat and only commits while the worker
+still owns the job. A job a live worker is processing is never run twice.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, insert, or_, select, update
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from autobudget_backend.db import SessionLocal
+from autobudget_backend import models
+from . import due_schedule, ingest, leases, pay_calendar, response_cache, totals
+
+_SPOOL_DIR = Path(__file__).resolve().parents[2] / ".devdata" / "ingest_jobs"
+MAX_ERRORS = 50
+STALE_SECONDS = float(os.getenv("INGEST_JOB_STALE_SECONDS", "120"))
+
+
+class LostClaim(Exception):
+    """Another worker took over the job (our heartbeat went stale)."""
+
+
+def job_status(job: models.IngestJob) -> Dict[str, Any]:
+    """Public view of a job row."""
+    return {
+        "job_id": job.id,
+        "filename": job.filename,
+        "status": job.status,
+        "rows_done": job.rows_done or 0,
+        "rows_rejected": job.rows_rejected or 0,
+        "rows_per_second": job.rows_per_second or 0.0,
+        "errors": json.loads(job.errors or "[]"),
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+async def create_job(upload: Any) -> Dict[str, Any]:
+    """Spool the upload to disk and record a queued job; returns its status."""
+    job_id = uuid.uuid4().hex
+    _SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    path = _SPOOL_DIR / f"{job_id}.csv"
+    with path.open("wb") as fh:
+        while True:
+            chunk = await upload.read(ingest.CHUNK_SIZE)
+            if not chunk:
+                break
+            await run_in_threadpool(fh.write, chunk)
+
+    def _record() -> Dict[str, Any]:
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            job = models.IngestJob(
+                id=job_id,
+                filename=getattr(upload, "filename", None),
+                path=str(path),
+                status="queued",
+                rows_done=0,
+                rows_rejected=0,
+                rows_per_second=0.0,
+                errors="[]",
+                created_at=now,
+                updated_at=now,
+            )
+            db.add(job)
+            db.commit()
+            return job_status(job)
+        finally:
+            db.close()
+
+    return await run_in_threadpool(_record)
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        job = db.get(models.IngestJob, job_id)
+        return job_status(job) if job else None
+    finally:
+        db.close()
+
+
+def _claimable(now: datetime):
+    Job = models.IngestJob
+    return or_(
+        Job.status == "queued",
+        and_(Job.status == "running", or_(Job.heartbeat_at.is_(None), Job.heartbeat_at < now - timedelta(seconds=STALE_SECONDS))),
+    )
+
+
+def claim(db, job_id: str, owner: str = leases.HOLDER, now: Optional[datetime] = None) -> bool:
+    """Atomically take a queued or stale job for owner; False if someone else holds it."""
+    now = now or datetime.utcnow()
+    Job = models.IngestJob
+    claimed = db.execute(
+        update(Job)
+        .where(Job.id == job_id, _claimable(now))
+        .values(status="running", owner=owner, heartbeat_at=now, updated_at=now)
+    ).rowcount == 1
+    db.commit()
+    return claimed
+
+
+def _checkpoint(db, job_id: str, owner: str, batch: List[Dict[str, Any]], progress: Dict[str, Any]) -> None:
+    """Write one batch and the job's progress in the same transaction, if still owned."""
+    if batch:
+        pay_calendar.stamp_due_dates(batch, db)
+        db.execute(insert(models.Bill), batch)
+        totals.TotalsDelta().add_rows(batch).flush(db)
+    now = datetime.utcnow()
+    Job = models.IngestJob
+    owned = db.execute(
+        update(Job)
+        .where(Job.id == job_id, Job.owner == owner)
+        .values(**progress, updated_at=now, heartbeat_at=now)
+    ).rowcount == 1
+    if not owned:
+        db.rollback()
+        raise LostClaim(job_id)
+    db.commit()
+    if batch:
+        response_cache.bump("bills")
+        due_schedule.schedule.invalidate()
+
+
+async def run_job(job_id: str, batch_size: int = ingest.BATCH_SIZE, owner: str = leases.HOLDER) -> None:
+    """Claim and process (or resume) a job; rows before job.rows_done are skipped."""
+    db = SessionLocal()
+    try:
+        if not await run_in_threadpool(claim, db, job_id, owner):
+            return
+        job = await run_in_threadpool(db.get, models.IngestJob, job_id)
+        resume_from = job.rows_done or 0
+        done = resume_from
+
+        started = time.perf_counter()
+        stats = {"skipped_rows": 0}
+        errors: List[str] = []
+        to_skip = resume_from
+        with open(job.path, "rb") as fh:
+            # Parsing is deterministic, so rejects seen while skipping the
+            # committed prefix rebuild the same counts and messages.
+            batches = ingest.aiter_bill_batches(UploadFile(file=fh), stats, batch_size=batch_size, errors=errors)
+            async for batch in batches:
+                if to_skip >= len(batch):
+                    to_skip -= len(batch)
+                    continue
+                batch, to_skip = batch[to_skip:], 0
+                done += len(batch)
+                await run_in_threadpool(_checkpoint, db, job_id, owner, batch, {
+                    "rows_done": done,
+                    "rows_rejected": stats["skipped_rows"],
+                    "rows_per_second": ingest.throughput(done - resume_from, started),
+                    "errors": json.dumps(errors[:MAX_ERRORS]),
+                })
+        await run_in_threadpool(_checkpoint, db, job_id, owner, [], {
+            "status": "done",
+            "rows_done": done,
+            "rows_rejected": stats["skipped_rows"],
+            "rows_per_second": ingest.throughput(done - resume_from, started),
+            "errors": json.dumps(errors[:MAX_ERRORS]),
+            "finished_at": datetime.utcnow(),
+        })
+        Path(job.path).unlink(missing_ok=True)
+    except LostClaim:
+        pass  # the new owner carries on from the last committed batch
+    except Exception as e:
+        db.rollback()
+        try:
+            job = db.get(models.IngestJob, job_id)
+            if job is not None and job.owner == owner:
+                errs = json.loads(job.errors or "[]")
+                errs.append(f"Job failed: {e}")
+                job.errors = json.dumps(errs[-MAX_ERRORS:])
+                job.status = "failed"
+                job.updated_at = job.finished_at = datetime.utcnow()
+                db.commit()
+        except Exception:
+            db.rollback()
+    finally:
+        db.close()
+
+
+def pending_job_ids() -> List[str]:
+    """Jobs nobody is working on: queued, or running with a stale heartbeat."""
+    db = SessionLocal()
+    try:
+        return list(db.scalars(
+            select(models.IngestJob.id)
+            .where(_claimable(datetime.utcnow()))
+            .order_by(models.IngestJob.created_at)
+        ))
+    finally:
+        db.close()
+
+
+async def resume_pending_jobs() -> int:
+    """Resume jobs left queued or abandoned by a dead worker, one at a time."""
+    ids = await run_in_threadpool(pending_job_ids)
+    for job_id in ids:
+        await run_job(job_id)
+    return len(ids)
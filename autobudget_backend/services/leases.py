@@ -0,0 +1,118 @@
+"""DB-backed leases so one process at a time runs a named job.
+
+try_acquire(name, holder, ttl) -> bool: take the lease, or renew it if held.
+release(name, holder): give it up early.
+held(name, ttl) -> context manager yielding True if this run got the lease.
+lead(start, stop) -> async loop that keeps the scheduler lease and calls
+  start() on gaining and stop() on losing leadership.
+
+A lease is a job_leases row (name, holder, expires_at). Acquiring is one
+conditional UPDATE (ours or expired) with an INSERT for first use, so it is
+atomic on SQLite and Postgres alike. A holder that dies stops renewing and its
+lease expires after ttl, when another worker takes over.
+"""
+from __future__ import annotations
+
+import asyncio
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, Optional
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+
+from autobudget_backend.db import SessionLocal
+from autobudget_backend import models
+
+HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+SCHEDULER_LEASE = "scheduler"
+SCHEDULER_TTL = float(os.getenv("SCHEDULER_LEASE_TTL", "30"))
+REMINDERS_LEASE = "reminders-run"
+REMINDERS_TTL = float(os.getenv("REMINDERS_LEASE_TTL", "600"))
+
+
+def try_acquire(name: str, holder: str = HOLDER, ttl: float = SCHEDULER_TTL, db: Any = None, now: Optional[datetime] = None) -> bool:
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        now = now or datetime.utcnow()
+        JobLease = models.JobLease
+        taken = db.execute(
+            update(JobLease)
+            .where(JobLease.name == name, or_(JobLease.holder == holder, JobLease.expires_at <= now))
+            .values(holder=holder, acquired_at=now, expires_at=now + timedelta(seconds=ttl))
+        ).rowcount
+        if not taken:
+            try:
+                db.execute(insert(JobLease).values(
+                    name=name, holder=holder, acquired_at=now, expires_at=now + timedelta(seconds=ttl)
+                ))
+            except IntegrityError:
+                db.rollback()
+                return False  # held by someone else
+        db.commit()
+        return True
+    finally:
+        if own_session:
+            db.close()
+
+
+def release(name: str, holder: str = HOLDER, db: Any = None) -> None:
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        db.execute(
+            update(models.JobLease)
+            .where(models.JobLease.name == name, models.JobLease.holder == holder)
+            .values(expires_at=datetime.utcnow())
+        )
+        db.commit()
+    finally:
+        if own_session:
+            db.close()
+
+
+@contextmanager
+def held(name: str, ttl: float = REMINDERS_TTL) -> Iterator[bool]:
+    """Hold a lease for one run; a distinct holder per run, so runs exclude each other in-process too."""
+    holder = f"{HOLDER}:{uuid.uuid4().hex[:8]}"
+    acquired = try_acquire(name, holder, ttl)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            release(name, holder)
+
+
+async def lead(
+    start: Callable[[], Any],
+    stop: Callable[[], Any],
+    name: str = SCHEDULER_LEASE,
+    ttl: float = SCHEDULER_TTL,
+    holder: str = HOLDER,
+) -> None:
+    """Keep (or wait for) the named lease, renewing every ttl/3; runs until cancelled."""
+    leading = False
+    try:
+        while True:
+            try:
+                ok = await run_in_threadpool(try_acquire, name, holder, ttl)
+            except Exception as e:
+                # Cannot renew: step down now, a peer takes over once the lease expires.
+                print(f"Lease '{name}' renewal failed: {e}")
+                ok = False
+            if ok and not leading:
+                leading = True
+                start()
+            elif not ok and leading:
+                leading = False
+                stop()
+            await asyncio.sleep(ttl / 3)
+    finally:
+        if leading:
+            stop()
+            await run_in_threadpool(release, name, holder)
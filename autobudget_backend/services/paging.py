@@ -0,0 +1,49 @@
+"""Keyset pagination and column projection for list endpoints.
+
+project(columns, fields) -> labeled columns for a ?fields= list.
+page(stmt, id_col, after_id, limit) -> stmt ordered by id, after the cursor.
+fetch(result, limit) -> (rows as dicts, after_id of the next page or None).
+
+Pages seek on the primary key (WHERE id > after_id ORDER BY id LIMIT n), so a
+page costs the same at any table size, unlike OFFSET. Only the requested
+columns are selected; no ORM objects are built.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+MAX_LIMIT = 1000
+NEXT_HEADER = "X-Next-After-Id"
+
+
+def project(columns: Dict[str, Any], fields: Optional[str] = None) -> List[Any]:
+    """Labeled columns for a comma-separated fields list (None = all).
+
+    "id" is always included because it is the pagination cursor. Raises
+    ValueError for unknown names.
+    """
+    if not fields:
+        return [col.label(name) for name, col in columns.items()]
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; expected any of: {', '.join(columns)}")
+    return [columns[n].label(n) for n in dict.fromkeys(["id", *names])]
+
+
+def page(stmt: Any, id_col: Any, after_id: Optional[int] = None, limit: Optional[int] = None) -> Any:
+    """Keyset-page stmt; fetches limit + 1 rows so fetch() can tell if more remain."""
+    if after_id is not None:
+        stmt = stmt.where(id_col > after_id)
+    stmt = stmt.order_by(id_col)
+    return stmt.limit(limit + 1) if limit is not None else stmt
+
+
+def fetch(result: Any, limit: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """Rows of a page() result as dicts, plus the next page's after_id."""
+    keys = tuple(result.keys())
+    rows = [dict(zip(keys, row)) for row in result.all()]
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1]["id"]
+    return rows, None
@@ -0,0 +1,184 @@
+"""Pay period calendar: PP number -> start, end and month, built once.
+
+Pay periods are 2 weeks long and anchored at PAY_PERIOD_ANCHOR_PP starting on
+PAY_PERIOD_ANCHOR_DATE (env; default PP17 = 2025-08-04). Rows in the
+pay_periods table override the arithmetic for their PP. A bill is due in the
+month its PP starts, on due_day clamped to that month's last day.
+
+get_calendar(db) returns the cached calendar; invalidate() drops it after
+pay_periods changes. Bills store the result in bills.due_date: bulk writers
+call stamp_due_dates(rows), ORM writers stamp_bill(bill).
+"""
+from __future__ import annotations
+
+import os
+import threading
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import bindparam, select, update
+
+from .. import models
+
+ANCHOR_PP = int(os.getenv("PAY_PERIOD_ANCHOR_PP", "17"))
+ANCHOR_DATE = date.fromisoformat(os.getenv("PAY_PERIOD_ANCHOR_DATE", "2025-08-04"))
+PERIOD_DAYS = 14
+
+
+class PayPeriodCalendar:
+    """Immutable PP table with scalar and vectorized lookups."""
+
+    def __init__(
+        self,
+        anchor_pp: int = ANCHOR_PP,
+        anchor_date: date = ANCHOR_DATE,
+        overrides: Optional[Dict[int, Tuple[date, date]]] = None,
+    ) -> None:
+        self.anchor_pp = anchor_pp
+        self.anchor_date = anchor_date
+        self.overrides = dict(overrides or {})
+        self._anchor64 = np.datetime64(anchor_date, "D")
+        # Bound per instance so a rebuilt calendar never serves stale entries.
+        self.bounds = lru_cache(maxsize=4096)(self._bounds)
+
+    def _bounds(self, pp: int) -> Tuple[date, date]:
+        if pp in self.overrides:
+            return self.overrides[pp]
+        start = self.anchor_date + timedelta(days=PERIOD_DAYS * (pp - self.anchor_pp))
+        return start, start + timedelta(days=PERIOD_DAYS - 1)
+
+    def start(self, pp: int) -> date:
+        return self.bounds(pp)[0]
+
+    def end(self, pp: int) -> date:
+        return self.bounds(pp)[1]
+
+    def month_key(self, pp: int) -> str:
+        """YYYY-MM of the month the PP starts in."""
+        s = self.start(pp)
+        return f"{s.year}-{s.month:02d}"
+
+    def due_date(self, pp: int, due_day: Optional[int]) -> date:
+        return self.due_dates([pp], [due_day])[0]
+
+    def starts(self, pps: Sequence[int]) -> np.ndarray:
+        """datetime64[D] start dates for an array of PP numbers."""
+        arr = np.asarray(pps, dtype=np.int64)
+        out = self._anchor64 + ((arr - self.anchor_pp) * PERIOD_DAYS).astype("timedelta64[D]")
+        if self.overrides and arr.size:
+            for i in np.flatnonzero(np.isin(arr, list(self.overrides))):
+                out[i] = np.datetime64(self.overrides[int(arr[i])][0], "D")
+        return out
+
+    def due_dates(self, pps: Sequence[Optional[int]], due_days: Sequence[Optional[int]]) -> List[Optional[date]]:
+        """Vectorized due dates; None for rows without a PP."""
+        if len(pps) == 0:
+            return []
+        missing = np.array([p is None for p in pps])
+        pp_arr = np.array([self.anchor_pp if p is None else p for p in pps], dtype=np.int64)
+        day_arr = np.array([d or 1 for d in due_days], dtype=np.int64)
+        out = self.due_dates64(pp_arr, day_arr).tolist()
+        return [None if m else d for d, m in zip(out, missing)] if missing.any() else out
+
+    def due_dates64(self, pps: np.ndarray, due_days: np.ndarray) -> np.ndarray:
+        """datetime64[D] due dates for int arrays of PPs and due days (no nulls)."""
+        months = self.starts(pps).astype("datetime64[M]")
+        first = months.astype("datetime64[D]")
+        days_in_month = ((months + 1).astype("datetime64[D]") - first).astype(np.int64)
+        return first + (np.clip(due_days, 1, days_in_month) - 1).astype("timedelta64[D]")
+
+    def window(self, pp_from: int, pp_to: int) -> List[Dict[str, Any]]:
+        """[{pp_number, start_date, end_date, month}] for pp_from..pp_to inclusive."""
+        return [
+            {
+                "pp_number": pp,
+                "start_date": self.start(pp),
+                "end_date": self.end(pp),
+                "month": self.month_key(pp),
+            }
+            for pp in range(pp_from, pp_to + 1)
+        ]
+
+
+_lock = threading.Lock()
+_cached: Optional[PayPeriodCalendar] = None
+
+
+def load(db: Any) -> PayPeriodCalendar:
+    """Build a calendar from the pay_periods table (rows override arithmetic)."""
+    rows = db.execute(
+        select(models.PayPeriod.pp_number, models.PayPeriod.start_date, models.PayPeriod.end_date)
+        .where(models.PayPeriod.pp_number.is_not(None), models.PayPeriod.start_date.is_not(None))
+    )
+    overrides = {
+        pp: (start, end or start + timedelta(days=PERIOD_DAYS - 1))
+        for pp, start, end in rows
+    }
+    return PayPeriodCalendar(overrides=overrides)
+
+
+def cached() -> Optional[PayPeriodCalendar]:
+    return _cached
+
+
+def get_calendar(db: Any = None) -> PayPeriodCalendar:
+    """Return the process-wide calendar, loading it on first use."""
+    global _cached
+    if _cached is not None:
+        return _cached
+    with _lock:
+        if _cached is None:
+            if db is None:
+                from autobudget_backend.db import SessionLocal
+
+                session = SessionLocal()
+                try:
+                    _cached = load(session)
+                finally:
+                    session.close()
+            else:
+                _cached = load(db)
+        return _cached
+
+
+def invalidate() -> None:
+    """Drop the cached calendar; call after writing pay_periods (then restamp())."""
+    global _cached
+    with _lock:
+        _cached = None
+
+
+def stamp_due_dates(rows: List[Dict[str, Any]], db: Any = None) -> List[Dict[str, Any]]:
+    """Set rows[i]["due_date"] from pp/due_day in one vectorized pass; returns rows."""
+    if rows:
+        dues = get_calendar(db).due_dates([r.get("pp") for r in rows], [r.get("due_day") for r in rows])
+        for row, due in zip(rows, dues):
+            row["due_date"] = due
+    return rows
+
+
+def stamp_bill(bill: models.Bill, db: Any = None) -> None:
+    """Refresh an ORM Bill's stored due_date."""
+    bill.due_date = get_calendar(db).due_date(bill.pp, bill.due_day) if bill.pp is not None else None
+
+
+def restamp(db: Any, only_missing: bool = False, batch_size: int = 5000) -> int:
+    """Recompute stored bills.due_date in bulk (Core executemany); caller commits."""
+    cal = load(db)
+    Bill = models.Bill.__table__
+    stmt = select(Bill.c.id, Bill.c.pp, Bill.c.due_day)
+    if only_missing:
+        stmt = stmt.where(Bill.c.due_date.is_(None))
+    rows = db.execute(stmt).all()
+    upd = (
+        update(Bill)
+        .where(Bill.c.id == bindparam("b_id"))
+        .values(due_date=bindparam("b_due"))
+    )
+    for i in range(0, len(rows), batch_size):
+        chunk = rows[i:i + batch_size]
+        dues = cal.due_dates([r.pp for r in chunk], [r.due_day for r in chunk])
+        db.execute(upd, [{"b_id": r.id, "b_due": d} for r, d in zip(chunk, dues)])
+    return len(rows)
@@ -1,20 +1,22 @@
-"""Pay period summary utilities."""
+"""Pay period summary utilities.
+
+build_summary(income, fixed, variable) -> {income, fixed, variable,
+surplus_or_deficit, pots}. Period totals come from pay_period_totals (see
+services/totals.py).
+"""
 from __future__ import annotations
 
-from typing import Dict, List
-from sqlalchemy.orm import Session
-from .. import models
+from typing import Dict
 
+FIXED_CLASSES = ("Debt", "Critical")
+VARIABLE_CLASSES = ("Needed", "Comfort")
 
-def summarize_payperiod(db: Session, bills: List[models.Bill]) -> Dict[str, object]:
-    """Return a summary for a pay period based on real data from the database."""
-    # Calculate total income from all paychecks
-    paychecks = db.query(models.Paycheck).all()
-    income = sum(p.amount for p in paychecks)
 
-    # Calculate fixed and variable costs from the bills for the period
-    fixed = sum(b.amount for b in bills if b.bill_class in ['Debt', 'Critical'])
-    variable = sum(b.amount for b in bills if b.bill_class in ['Needed', 'Comfort'])
+def build_summary(income: float, fixed: float, variable: float) -> Dict[str, object]:
+    """Return the summary dict (surplus and pots) from period totals."""
+    income = income or 0.0
+    fixed = fixed or 0.0
+    variable = variable or 0.0
     surplus = round(income - fixed - variable, 2)
 
     # Pots are based on the budgeted income allocation
@@ -33,4 +35,5 @@ def summarize_payperiod(db: Session, bills: List[models.Bill]) -> Dict[str, obje
         "variable": variable,
         "surplus_or_deficit": surplus,
         "pots": pots,
-    }
\ No newline at end of file
+    }
+
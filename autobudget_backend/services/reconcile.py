@@ -1,24 +1,135 @@
 """Transaction reconciliation utilities.
 
-run(transactions) -> {matched:[], unmatched:[]}.
-Pure function; naive matching by exact amount and date, none provided so all unmatched.
+run(transactions, bills=None, matcher=None) -> {matched, unmatched, matched_count, unmatched_count}.
+Matcher(bills) -> Aho-Corasick automaton over lowercased bill names;
+  match(memo) -> (bill_id, name) of the longest name in memo, or None.
+cached_matcher(load) -> Matcher, rebuilt only after a bills write.
+
+A transaction matches when its memo contains a bill name (case-insensitive).
+Each memo is scanned once, in time linear in its length, however many bills
+there are. When several names occur, the longest wins (then the earliest in
+the memo); bills sharing a name resolve to the lowest id. Matched
+transactions carry bill_id and bill_name.
+
+cached_matcher() keys the automaton on the "bills" data version (see
+response_cache.bump), and rebuilds after RECONCILE_MATCHER_TTL seconds
+regardless, as writes in other workers are not seen.
 """
 from __future__ import annotations
-from typing import Any, Dict, List
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import response_cache
+
+TTL_SECONDS = float(os.getenv("RECONCILE_MATCHER_TTL", "60"))
+
+
+class Matcher:
+    """Aho-Corasick automaton: goto dicts, failure links and best output per state."""
+
+    def __init__(self, bills: Iterable[Any]) -> None:
+        names: Dict[str, Tuple[int, str]] = {}
+        for bill in bills:
+            bill_id, name = (bill.id, bill.name) if hasattr(bill, "name") else bill
+            key = (name or "").lower()
+            # An empty name would match every memo; skip it.
+            if key and (key not in names or bill_id < names[key][0]):
+                names[key] = (bill_id, name)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Longest name ending at each state: (length, bill_id, name) or None.
+        self._out: List[Optional[Tuple[int, int, str]]] = [None]
+        for key, (bill_id, name) in names.items():
+            state = 0
+            for ch in key:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                state = nxt
+            self._out[state] = (len(key), bill_id, name)
+        self.size = len(names)
+
+        # Breadth-first, so a state's failure target is final before its
+        # children; depth-1 states fail to the root.
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # A state's own name is longer than any name on its failure chain.
+                if self._out[nxt] is None:
+                    self._out[nxt] = self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def match(self, memo: str) -> Optional[Tuple[int, str]]:
+        """(bill_id, name) of the longest bill name in memo, or None."""
+        goto, fail, out = self._goto, self._fail, self._out
+        state, best = 0, None
+        for ch in memo.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found = out[state]
+            if found is not None and (best is None or found[0] > best[0]):
+                best = found
+        return (best[1], best[2]) if best is not None else None
+
+
+_lock = threading.Lock()
+# (bills version, expires, matcher) of the last build
+_cached: Optional[Tuple[Tuple[int, ...], float, Matcher]] = None
+
+
+def cached_matcher(load: Callable[[], Iterable[Any]]) -> Matcher:
+    """The matcher for the current bills; load() -> (id, name) rows runs only on a rebuild."""
+    global _cached
+    seen = response_cache.versions(("bills",))
+    with _lock:
+        cached = _cached
+    if cached is not None and cached[0] == seen and cached[1] > time.monotonic():
+        return cached[2]
+    matcher = Matcher(load())
+    with _lock:
+        if seen == response_cache.versions(("bills",)):  # no write landed mid-build
+            _cached = (seen, time.monotonic() + TTL_SECONDS, matcher)
+    return matcher
+
+
+def clear() -> None:
+    global _cached
+    with _lock:
+        _cached = None
 
 
-def run(transactions: List[Dict[str, Any]], bills: List[Any]) -> Dict[str, Any]:
-    """Deterministically mark transactions as matched by bill names.
+def run(
+    transactions: List[Dict[str, Any]],
+    bills: Optional[List[Any]] = None,
+    matcher: Optional[Matcher] = None,
+) -> Dict[str, Any]:
+    """Mark transactions as matched when the memo contains a bill name.
 
-    If memo contains a bill name (case-insensitive), it's matched.
+    bills are objects with id and name, or (id, name) pairs; pass a prebuilt
+    matcher instead to skip compiling them.
     """
+    if matcher is None:
+        matcher = Matcher(bills or [])
     matched: List[Dict[str, Any]] = []
     unmatched: List[Dict[str, Any]] = []
-    bill_names = [bill.name.lower() for bill in bills]
     for t in transactions or []:
-        memo = str(t.get("memo", "")).strip().lower()
-        if any(bill_name in memo for bill_name in bill_names):
-            matched.append(t)
+        hit = matcher.match(str(t.get("memo", "")).strip())
+        if hit is not None:
+            matched.append({**t, "bill_id": hit[0], "bill_name": hit[1]})
         else:
             unmatched.append(t)
     result: Dict[str, Any] = {"matched": matched, "unmatched": unmatched}
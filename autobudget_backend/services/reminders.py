@@ -1,42 +1,160 @@
+"""Due-bill reminders.
+
+run_due_reminders(days_ahead, db=None, now=None, sinks=None, bill_ids=None) -> {selected, sent, failed}.
+run_bill_reminders(bill_ids, days_ahead) -> ids of bill_ids the run did not select.
+send_due_bill_reminders(...) -> number sent.
+Candidates come from one query: unpaid bills whose stored due_date is in the
+window (ix_bills_due_date), each checked for a recent reminder of the
+matching type with a correlated NOT EXISTS that seeks
+ix_reminders_bill_type_sent per bill. They are claimed with one bulk
+insert of "pending" Reminder rows, delivered concurrently through
+services/delivery.py, and the outcomes are written back with one bulk update.
+Failed reminders do not count for the 24h duplicate check, and neither do
+"pending" ones claimed more than REMINDER_PENDING_STALE_SECONDS ago (the run
+that claimed them died before writing an outcome), so those are retried.
+
+The window defaults to REMINDER_LEAD_DAYS, the lead time the due schedule
+fires at. Bills due within 3 days get a "due_in_3_days" reminder, bills
+further out (a lead time above 3) a "due_soon" one.
+"""
 from __future__ import annotations
 
+import asyncio
+import os
 from datetime import date, datetime, timedelta
-from typing import List
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+from sqlalchemy import and_, case, func, insert, literal, or_, select, update
 from sqlalchemy.orm import Session
 
 from autobudget_backend.db import SessionLocal
 from autobudget_backend import models
+from autobudget_backend.services import delivery, due_schedule
+
+DEDUP_WINDOW = timedelta(hours=24)
+PENDING_STALE = timedelta(seconds=float(os.getenv("REMINDER_PENDING_STALE_SECONDS", "600")))
+
+
+def _reminder_text(bill: Any, reminder_type: str) -> str:
+    return f"{reminder_type}: {bill.name} is due soon (${bill.amount:.2f})."
+
+
+def due_reminders_query(today: date, days_ahead: int, now: datetime, bill_ids: Optional[Sequence[int]] = None):
+    """SELECT id, name, amount, due_date, reminder_type for reminders to send."""
+    Bill, Reminder = models.Bill, models.Reminder
+    reminder_type = case(
+        (Bill.due_date <= today + timedelta(days=3), literal("due_in_3_days")),
+        else_=literal("due_soon"),
+    )
+    stale_pending = and_(
+        Reminder.status == "pending",
+        func.coalesce(Reminder.claimed_at, Reminder.sent_at) <= now - PENDING_STALE,
+    )
+    # Correlated, so each candidate seeks ix_reminders_bill_type_sent instead
+    # of the whole reminders history being grouped on every run.
+    sent_recently = (
+        select(Reminder.id)
+        .where(
+            Reminder.bill_id == Bill.id,
+            Reminder.reminder_type == reminder_type,
+            Reminder.sent_at > now - DEDUP_WINDOW,
+            or_(Reminder.status.is_(None), and_(Reminder.status != "failed", ~stale_pending)),
+        )
+        .exists()
+    )
+    stmt = (
+        select(Bill.id, Bill.name, Bill.amount, Bill.due_date, reminder_type.label("reminder_type"))
+        .where(
+            # Not indexable on purpose (and NULL reads as unpaid): the due_date
+            # range, not every unpaid bill, drives the query.
+            func.coalesce(Bill.paid, False) == False,
+            Bill.due_date.between(today, today + timedelta(days=days_ahead)),
+            # Duplicate prevention: nothing of this type sent in the last 24h.
+            ~sent_recently,
+        )
+        .order_by(Bill.due_date, Bill.id)
+    )
+    return stmt.where(Bill.id.in_(bill_ids)) if bill_ids is not None else stmt
+
+
+def run_due_reminders(
+    days_ahead: int = due_schedule.LEAD_DAYS,
+    db: Optional[Session] = None,
+    now: Optional[datetime] = None,
+    sinks: Optional[Dict[str, Any]] = None,
+    channel: str = delivery.DEFAULT_CHANNEL,
+    bill_ids: Optional[Sequence[int]] = None,
+) -> Dict[str, int]:
+    """Select, claim, deliver and record due-bill reminders (only bill_ids, if given).
+
+    Must be called from a thread without a running event loop (sync endpoint,
+    scheduler worker, script): delivery runs in its own asyncio.run().
+    """
+    return _run(days_ahead, db, now, sinks, channel, bill_ids)[0]
+
+
+def run_bill_reminders(
+    bill_ids: Sequence[int],
+    days_ahead: int,
+    db: Optional[Session] = None,
+    now: Optional[datetime] = None,
+    sinks: Optional[Dict[str, Any]] = None,
+) -> List[int]:
+    """run_due_reminders() for the bills a schedule fired; returns the ids it did not select."""
+    selected = set(_run(days_ahead, db, now, sinks, delivery.DEFAULT_CHANNEL, bill_ids)[1])
+    return [bill_id for bill_id in bill_ids if bill_id not in selected]
+
+
+def _run(
+    days_ahead: int,
+    db: Optional[Session],
+    now: Optional[datetime],
+    sinks: Optional[Dict[str, Any]],
+    channel: str,
+    bill_ids: Optional[Sequence[int]],
+) -> Tuple[Dict[str, int], List[int]]:
+    own_session = db is None
+    db = db or SessionLocal()
+    try:
+        today = now.date() if now else date.today()
+        now = now or datetime.utcnow()
+        due = db.execute(due_reminders_query(today, days_ahead, now, bill_ids)).all()
+        if not due:
+            return {"selected": 0, "sent": 0, "failed": 0}, []
+
+        # Claim first, so an overlapping run's duplicate check sees these rows.
+        # Each bill appears once per run, so ids map back by bill_id and the
+        # insert can stay a single multi-row statement on SQLite too.
+        claimed = db.execute(
+            insert(models.Reminder).returning(models.Reminder.bill_id, models.Reminder.id),
+            [
+                {"bill_id": row.id, "sent_at": now, "claimed_at": now, "reminder_type": row.reminder_type,
+                 "channel": channel, "status": "pending", "attempts": 0}
+                for row in due
+            ],
+        )
+        reminder_ids = dict(claimed.all())
+        db.commit()
 
-
-def _pp_month_key(pp: int) -> str:
-    # Duplicate of logic in app._pp_month_key to avoid circular imports
-    anchor_pp = 17
-    anchor = date(2025, 8, 4)
-    delta_weeks = (pp - anchor_pp) * 2
-    d = anchor + timedelta(weeks=delta_weeks)
-    return f"{d.year}-{d.month:02d}"
-
-
-def _last_day_of_month(y: int, m: int) -> int:
-    nm = 1 if m == 12 else m + 1
-    ny = y + 1 if m == 12 else y
-    return (date(ny, nm, 1) - timedelta(days=1)).day
-
-
-def _bill_due_date(bill: models.Bill) -> date:
-    ym = _pp_month_key(bill.pp)
-    y, m = map(int, ym.split("-"))
-    d = min(int(bill.due_day or 1), _last_day_of_month(y, m))
-    return date(y, m, d)
-
-
-def _send_reminder(bill: models.Bill, reminder_type: str) -> None:
-    # Placeholder for actual delivery (email/SMS/push). For now, just print.
-    print(f"[REMINDER] {reminder_type}: {bill.name} is due soon (${bill.amount:.2f}).")
+        messages = [
+            delivery.Message(reminder_ids[row.id], row.id, channel, _reminder_text(row, row.reminder_type))
+            for row in due
+        ]
+        outcomes = asyncio.run(delivery.deliver(messages, sinks))
+        db.execute(update(models.Reminder), [
+            {"id": o["reminder_id"], "status": o["status"], "attempts": o["attempts"],
+             "error": o["error"], "delivered_at": o["delivered_at"]}
+            for o in outcomes
+        ])
+        db.commit()
+        sent = sum(1 for o in outcomes if o["status"] == "sent")
+        return {"selected": len(due), "sent": sent, "failed": len(due) - sent}, [row.id for row in due]
+    finally:
+        if own_session:
+            db.close()
 
 
-def send_due_bill_reminders(days_ahead: int = 3) -> int:
+def send_due_bill_reminders(days_ahead: int = due_schedule.LEAD_DAYS, db: Optional[Session] = None, now: Optional[datetime] = None) -> int:
     """Find unpaid bills due within days_ahead and send unique reminders.
 
     Duplicate prevention: for a (bill_id, reminder_type) pair, if a reminder
@@ -44,44 +162,4 @@ def send_due_bill_reminders(days_ahead: int = 3) -> int:
 
     Returns the number of reminders sent.
     """
-    db: Session = SessionLocal()
-    sent_count = 0
-    try:
-        today = date.today()
-        window_end = today + timedelta(days=days_ahead)
-        unpaid: List[models.Bill] = (
-            db.query(models.Bill)
-            .filter(models.Bill.paid == False)
-            .all()
-        )
-
-        now = datetime.utcnow()
-        for b in unpaid:
-            due = _bill_due_date(b)
-            if today <= due <= window_end:
-                reminder_type = "due_in_3_days" if (due - today).days <= 3 else "due_soon"
-
-                # Check last reminder within 24 hours
-                recent = (
-                    db.query(models.Reminder)
-                    .filter(models.Reminder.bill_id == b.id)
-                    .filter(models.Reminder.reminder_type == reminder_type)
-                    .order_by(models.Reminder.sent_at.desc())
-                    .first()
-                )
-                if recent and (now - recent.sent_at).total_seconds() < 24 * 3600:
-                    continue  # skip duplicate within 24h
-
-                _send_reminder(b, reminder_type)
-                rec = models.Reminder(
-                    bill_id=b.id,
-                    sent_at=now,
-                    reminder_type=reminder_type,
-                )
-                db.add(rec)
-                sent_count += 1
-
-        db.commit()
-        return sent_count
-    finally:
-        db.close()
+    return run_due_reminders(days_ahead, db=db, now=now)["sent"]
@@ -0,0 +1,96 @@
+"""In-process cache of serialized GET responses, invalidated by writes.
+
+Entries hold the response body and its ETag, keyed by path + query string and
+tagged with the data scopes the endpoint reads ("bills", "paychecks"). Writers
+call bump(scope) after committing; entries recorded under an older version of
+any of their scopes stop matching and age out of the size-bounded LRU.
+
+get(key, scopes) -> Entry or None; put(key, scopes, ...) -> Entry.
+etag_matches(if_none_match, etag) implements If-None-Match comparison.
+
+The cache is per process: with several workers a write only invalidates the
+worker that served it, so entries also expire after RESPONSE_CACHE_TTL seconds.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+
+
+class Entry:
+    __slots__ = ("body", "etag", "headers", "versions", "expires")
+
+    def __init__(self, body: bytes, headers: Dict[str, str], versions: Tuple[int, ...], expires: float) -> None:
+        self.body = body
+        self.etag = '"' + hashlib.blake2b(body, digest_size=12).hexdigest() + '"'
+        self.headers = headers
+        self.versions = versions
+        self.expires = expires
+
+
+_lock = threading.Lock()
+_versions: Dict[str, int] = {}
+_entries: "OrderedDict[str, Entry]" = OrderedDict()
+stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+def versions(scopes: Sequence[str]) -> Tuple[int, ...]:
+    return tuple(_versions.get(s, 0) for s in scopes)
+
+
+def bump(*scopes: str) -> None:
+    """Advance the data version of scopes after a committed write."""
+    with _lock:
+        for scope in scopes:
+            _versions[scope] = _versions.get(scope, 0) + 1
+
+
+def get(key: str, scopes: Sequence[str]) -> Optional[Entry]:
+    """Return the fresh entry for key, or None (stale entries are dropped)."""
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry.versions == versions(scopes) and entry.expires > time.monotonic():
+            _entries.move_to_end(key)
+            stats["hits"] += 1
+            return entry
+        if entry is not None:
+            del _entries[key]
+        stats["misses"] += 1
+        return None
+
+
+def put(key: str, scopes: Sequence[str], body: bytes, headers: Dict[str, str], seen: Tuple[int, ...]) -> Entry:
+    """Store a response rendered while the scopes were at versions `seen`.
+
+    If a write landed while the response was being built, the entry is
+    returned (for its ETag) but not cached.
+    """
+    entry = Entry(body, headers, seen, time.monotonic() + TTL_SECONDS)
+    with _lock:
+        if seen == versions(scopes):
+            _entries[key] = entry
+            _entries.move_to_end(key)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+                stats["evictions"] += 1
+    return entry
+
+
+def clear() -> None:
+    with _lock:
+        _entries.clear()
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value names etag (weak comparison)."""
+    if not if_none_match:
+        return False
+    tags: Iterable[str] = (t.strip() for t in if_none_match.split(","))
+    return any(t == "*" or t.removeprefix("W/") == etag for t in tags)
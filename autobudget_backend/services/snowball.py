@@ -1,33 +1,185 @@
 """Debt snowball computation utilities.
 
-compute(debts) -> list of {name,balance,apr,payoff_eta_days} sorted by balance.
-Pure function; no I/O.
+compute(debts, monthly_payment=300.0, strategy="snowball", start=None)
+  -> list of {name, balance, apr, min_payment, months, payoff_date,
+     payoff_eta_days, interest_paid} sorted by balance.
+plan(debts, monthly_payment=300.0, strategy="snowball", start=None)
+  -> {debts, months, payoff_date, total_interest}; debts in payoff order.
+simulate(balances, aprs, minimums, budgets, orders, max_months=MAX_MONTHS)
+  -> {payoff_month, interest, total_interest, months} as arrays.
+normalize(debts) -> [{name, balance, apr, min_payment}] with defaults applied.
+allocate(bal, extra, orders, rows) -> one step of paying extra in priority order.
+
+simulate() steps every debt (and every scenario) forward one month at a time
+as NumPy arrays: interest accrues at apr / 12, each debt gets its minimum, and
+whatever is left of the monthly budget goes to debts in priority order. A paid
+off debt's minimum stays in the budget, so it rolls into the next target.
+monthly_payment is the total paid towards debts each month; if it is below
+the sum of minimums the minimums are still paid. Debts without a min_payment
+pay max(MIN_PAYMENT_FLOOR, interest + MIN_PAYMENT_RATE * balance) at the start.
+Pure functions; no I/O.
 """
 from __future__ import annotations
-from typing import List, Dict, Any
+
+import calendar
 import math
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+MAX_MONTHS = 360
+MIN_PAYMENT_FLOOR = float(os.getenv("DEBT_MIN_PAYMENT_FLOOR", "25"))
+MIN_PAYMENT_RATE = float(os.getenv("DEBT_MIN_PAYMENT_RATE", "0.01"))
+# Balances below half a cent count as paid off.
+EPSILON = 0.005
+
+
+def _number(value: Any) -> float:
+    try:
+        num = float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+    return num if math.isfinite(num) and num > 0 else 0.0
+
+
+def default_minimum(balance: float, apr: float) -> float:
+    return min(balance, max(MIN_PAYMENT_FLOOR, balance * (apr / 1200.0 + MIN_PAYMENT_RATE)))
+
+
+def add_months(start: date, months: int) -> date:
+    year, month = divmod(start.month - 1 + months, 12)
+    year += start.year
+    day = min(start.day, calendar.monthrange(year, month + 1)[1])
+    return date(year, month + 1, day)
+
+
+def priority(strategy: str, balances: np.ndarray, aprs: np.ndarray) -> np.ndarray:
+    """Indexes of debts in payoff order for "snowball" or "avalanche"."""
+    if strategy == "snowball":  # smallest balance first, higher APR breaks ties
+        return np.lexsort((-aprs, balances))
+    if strategy == "avalanche":  # highest APR first, smaller balance breaks ties
+        return np.lexsort((balances, -aprs))
+    raise ValueError(f"Unknown strategy '{strategy}'; expected snowball or avalanche")
 
 
-def compute(debts: List[Dict[str, Any]], monthly_payment: float = 300.0) -> List[Dict[str, Any]]:
-    """Return debts sorted by smallest balance with robust payoff ETA in days.
+def allocate(bal: np.ndarray, extra: np.ndarray, orders: np.ndarray, rows: np.ndarray) -> np.ndarray:
+    """Split extra[s] over bal[s] in priority order orders[s]; returns payments (S, D)."""
+    # cumsum = running amount needed to clear every earlier target
+    remaining = bal[rows, orders]
+    ahead = np.cumsum(remaining, axis=1) - remaining
+    pay = np.empty_like(bal)
+    pay[rows, orders] = np.clip(extra[:, None] - ahead, 0.0, remaining)
+    return pay
 
-    ETA = ceil(balance / max(1, monthly_payment)) * 30 days.
+
+def simulate(
+    balances: Sequence[float],
+    aprs: Sequence[float],
+    minimums: Sequence[float],
+    budgets: Any,
+    orders: Any,
+    max_months: int = MAX_MONTHS,
+) -> Dict[str, Any]:
+    """Month-by-month payoff of D debts under S scenarios at once.
+
+    budgets is a scalar or shape (S,); orders is a priority order of shape (D,)
+    or (S, D). Returns payoff_month (S, D; -1 if not paid off within
+    max_months), interest (S, D), total_interest (S,) and months (S,; -1 if
+    any debt is left).
     """
+    bal0 = np.asarray(balances, dtype=float)
+    rate = np.asarray(aprs, dtype=float) / 1200.0
+    mins = np.asarray(minimums, dtype=float)
+    orders = np.atleast_2d(np.asarray(orders, dtype=np.intp))
+    budgets = np.atleast_1d(np.asarray(budgets, dtype=float))
+    n = max(len(budgets), len(orders))
+    budgets = np.broadcast_to(budgets, (n,))
+    orders = np.broadcast_to(orders, (n, len(bal0)))
+    rows = np.arange(n)[:, None]
+
+    bal = np.tile(bal0, (n, 1))
+    bal[bal <= EPSILON] = 0.0
+    payoff = np.where(bal > 0, -1, 0)
+    interest = np.zeros_like(bal)
+    for month in range(1, max_months + 1):
+        active = bal > 0
+        if not active.any():
+            break
+        accrued = bal * rate
+        interest += accrued
+        bal += accrued
+        paid = np.minimum(mins, bal)
+        bal -= paid
+        bal -= allocate(bal, np.maximum(budgets - paid.sum(axis=1), 0.0), orders, rows)
+        done = bal <= EPSILON
+        payoff[active & done] = month
+        bal[done] = 0.0
+    months = np.where((payoff >= 0).all(axis=1), payoff.max(axis=1, initial=0), -1)
+    return {
+        "payoff_month": payoff,
+        "interest": interest,
+        "total_interest": interest.sum(axis=1),
+        "months": months,
+    }
+
+
+def normalize(debts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     cleaned = []
     for d in debts:
-        # Normalize balance; guard against negatives/non-finite
-        try:
-            bal = float(d.get("balance", 0) or 0)
-        except (TypeError, ValueError):
-            bal = 0.0
-        if not math.isfinite(bal) or bal < 0:
-            bal = 0.0
-        eta_months = math.ceil(bal / max(1.0, monthly_payment))
-        eta_days = int(eta_months * 30)
-        cleaned.append({
-            "name": d.get("name", ""),
-            "balance": bal,
-            "apr": (float(d.get("apr", 0) or 0) if isinstance(d.get("apr", 0), (int, float, str)) else 0.0),
-            "payoff_eta_days": eta_days,
+        bal = _number(d.get("balance"))
+        apr = _number(d.get("apr"))
+        minimum = _number(d.get("min_payment")) if d.get("min_payment") is not None else default_minimum(bal, apr)
+        cleaned.append({"name": d.get("name", ""), "balance": bal, "apr": apr, "min_payment": minimum})
+    return cleaned
+
+
+def plan(
+    debts: List[Dict[str, Any]],
+    monthly_payment: float = 300.0,
+    strategy: str = "snowball",
+    start: Optional[date] = None,
+    order: Optional[Sequence[int]] = None,
+) -> Dict[str, Any]:
+    """Simulate one payoff plan; debts come back in the order they are targeted.
+
+    order (indexes into debts) overrides the strategy's priority.
+    """
+    start = start or date.today()
+    cleaned = normalize(debts)
+    balances = np.array([d["balance"] for d in cleaned])
+    aprs = np.array([d["apr"] for d in cleaned])
+    mins = np.array([d["min_payment"] for d in cleaned])
+    if order is None:
+        order = priority(strategy, balances, aprs)
+    result = simulate(balances, aprs, mins, max(0.0, float(monthly_payment)), order)
+
+    out = []
+    for i in order:
+        months = int(result["payoff_month"][0, i])
+        payoff_date = add_months(start, months) if months >= 0 else None
+        out.append({
+            **cleaned[i],
+            "months": months if months >= 0 else None,
+            "payoff_date": payoff_date.isoformat() if payoff_date else None,
+            "payoff_eta_days": (payoff_date - start).days if payoff_date else None,
+            "interest_paid": round(float(result["interest"][0, i]), 2),
         })
-    return sorted(cleaned, key=lambda x: x["balance"])
+    months = int(result["months"][0])
+    return {
+        "debts": out,
+        "months": months if months >= 0 else None,
+        "payoff_date": add_months(start, months).isoformat() if months >= 0 else None,
+        "total_interest": round(float(result["total_interest"][0]), 2),
+    }
+
+
+def compute(
+    debts: List[Dict[str, Any]],
+    monthly_payment: float = 300.0,
+    strategy: str = "snowball",
+    start: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """Return debts sorted by smallest balance with simulated payoff dates."""
+    return sorted(plan(debts, monthly_payment, strategy, start)["debts"], key=lambda x: x["balance"])
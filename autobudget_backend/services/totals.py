@@ -0,0 +1,205 @@
+"""Incrementally maintained per-pay-period totals.
+
+pay_period_totals holds one row per PP (income, fixed, variable, bill/paid/
+unpaid counts) and pay_period_class_totals the per-class sums. Writers record
+bill changes in a TotalsDelta and flush() it in the same transaction, which
+applies small additive upserts. rebuild() recomputes both tables from raw
+rows; verify() reports any drift.
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import case, delete, func, insert, select, update
+
+from .. import models
+from .pots import FIXED_CLASSES, VARIABLE_CLASSES, build_summary
+
+# (pp, bill_class, amount, paid)
+BillSnapshot = Tuple[int, str, float, bool]
+
+_PP_FIELDS = ("fixed", "variable", "bill_count", "paid_count", "unpaid_count")
+_TOLERANCE = 0.005
+
+
+def snapshot(bill: Any) -> Optional[BillSnapshot]:
+    """Totals-relevant fields of a Bill (ORM object or mapping)."""
+    get = bill.get if isinstance(bill, dict) else (lambda k, d=None: getattr(bill, k, d))
+    pp = get("pp")
+    if pp is None:
+        return None
+    # NULL class is keyed as "" so it can live in the class-totals primary key
+    return (int(pp), get("bill_class") or "", float(get("amount") or 0.0), bool(get("paid") or False))
+
+
+def _dialect_insert(bind: Any, table: Any):
+    name = bind.dialect.name
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        raise NotImplementedError(f"pay_period_totals upsert not supported on {name}")
+    return dialect_insert(table)
+
+
+class TotalsDelta:
+    """Accumulates bill contributions and flushes them as additive upserts."""
+
+    def __init__(self) -> None:
+        self.pp: Dict[int, List[float]] = defaultdict(lambda: [0.0] * len(_PP_FIELDS))
+        self.cls: Dict[Tuple[int, str], List[float]] = defaultdict(lambda: [0.0, 0])
+
+    def add(self, snap: Optional[BillSnapshot], sign: int = 1) -> None:
+        if snap is None:
+            return
+        pp, bill_class, amount, paid = snap
+        self.add_group(pp, bill_class, paid, sign * amount, sign)
+
+    def add_group(self, pp: int, bill_class: str, paid: bool, amount: float, count: int) -> None:
+        """Add `count` bills sharing (pp, bill_class, paid) whose amounts sum to `amount`."""
+        row = self.pp[pp]
+        if bill_class in FIXED_CLASSES:
+            row[0] += amount
+        elif bill_class in VARIABLE_CLASSES:
+            row[1] += amount
+        row[2] += count
+        row[3 if paid else 4] += count
+        c = self.cls[(pp, bill_class)]
+        c[0] += amount
+        c[1] += count
+
+    def change(self, old: Optional[BillSnapshot], new: Optional[BillSnapshot]) -> None:
+        """Record an update: remove old contribution, add new."""
+        if old != new:
+            self.add(old, -1)
+            self.add(new, 1)
+
+    def add_rows(self, rows: Iterable[Any], sign: int = 1) -> "TotalsDelta":
+        for row in rows:
+            self.add(snapshot(row), sign)
+        return self
+
+    def flush(self, db: Any) -> None:
+        """Apply and clear accumulated deltas; caller commits."""
+        if self.pp:
+            bind = db.get_bind() if hasattr(db, "get_bind") else db
+            income = db.execute(select(func.coalesce(func.sum(models.Paycheck.amount), 0.0))).scalar()
+            table = models.PayPeriodTotal.__table__
+            stmt = _dialect_insert(bind, table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.pp],
+                set_={f: table.c[f] + stmt.excluded[f] for f in _PP_FIELDS},
+            )
+            db.execute(stmt, [
+                {"pp": pp, "income": income, **dict(zip(_PP_FIELDS, vals))}
+                for pp, vals in self.pp.items()
+            ])
+            ctable = models.PayPeriodClassTotal.__table__
+            cstmt = _dialect_insert(bind, ctable)
+            cstmt = cstmt.on_conflict_do_update(
+                index_elements=[ctable.c.pp, ctable.c.bill_class],
+                set_={f: ctable.c[f] + cstmt.excluded[f] for f in ("amount", "bill_count")},
+            )
+            db.execute(cstmt, [
+                {"pp": pp, "bill_class": bill_class, "amount": amount, "bill_count": count}
+                for (pp, bill_class), (amount, count) in self.cls.items()
+            ])
+        self.pp.clear()
+        self.cls.clear()
+
+
+def apply_bill_change(db: Any, old: Optional[BillSnapshot], new: Optional[BillSnapshot]) -> None:
+    """One-shot delta for a single bill create (old=None), update or delete (new=None)."""
+    delta = TotalsDelta()
+    delta.change(old, new)
+    delta.flush(db)
+
+
+def apply_income_change(db: Any, amount_delta: float) -> None:
+    """Paychecks are global, so income moves on every PP row at once."""
+    if amount_delta:
+        db.execute(update(models.PayPeriodTotal).values(income=models.PayPeriodTotal.income + amount_delta))
+
+
+def _raw_pp_totals():
+    Bill = models.Bill
+    return (
+        select(
+            Bill.pp,
+            func.sum(case((Bill.bill_class.in_(FIXED_CLASSES), Bill.amount), else_=0.0)),
+            func.sum(case((Bill.bill_class.in_(VARIABLE_CLASSES), Bill.amount), else_=0.0)),
+            func.count(),
+            func.sum(case((Bill.paid == True, 1), else_=0)),
+            func.sum(case((Bill.paid == True, 0), else_=1)),
+        )
+        .where(Bill.pp.is_not(None))
+        .group_by(Bill.pp)
+    )
+
+
+def _raw_class_totals():
+    Bill = models.Bill
+    return (
+        select(Bill.pp, func.coalesce(Bill.bill_class, ""), func.sum(Bill.amount), func.count())
+        .where(Bill.pp.is_not(None))
+        .group_by(Bill.pp, func.coalesce(Bill.bill_class, ""))
+    )
+
+
+def rebuild(db: Any) -> int:
+    """Recompute both tables from raw bills/paychecks with INSERT ... SELECT; caller commits."""
+    income = select(func.coalesce(func.sum(models.Paycheck.amount), 0.0)).scalar_subquery()
+    db.execute(delete(models.PayPeriodTotal))
+    db.execute(delete(models.PayPeriodClassTotal))
+    raw = _raw_pp_totals().add_columns(income)
+    db.execute(insert(models.PayPeriodTotal).from_select(["pp", *_PP_FIELDS, "income"], raw))
+    db.execute(insert(models.PayPeriodClassTotal).from_select(
+        ["pp", "bill_class", "amount", "bill_count"], _raw_class_totals()
+    ))
+    return db.execute(select(func.count()).select_from(models.PayPeriodTotal)).scalar()
+
+
+def verify(db: Any) -> List[Dict[str, Any]]:
+    """Return mismatches between the materialized tables and raw data (empty = OK)."""
+    income = db.execute(select(func.coalesce(func.sum(models.Paycheck.amount), 0.0))).scalar()
+    problems: List[Dict[str, Any]] = []
+
+    expected = {row[0]: (income, *row[1:]) for row in db.execute(_raw_pp_totals())}
+    fields = ("income", *_PP_FIELDS)
+    actual = {
+        t.pp: tuple(getattr(t, f) for f in fields)
+        for t in db.execute(select(models.PayPeriodTotal)).scalars()
+        if t.bill_count  # rows emptied by deletes are equivalent to missing
+    }
+    for pp in sorted(set(expected) | set(actual)):
+        want = expected.get(pp, (income,) + (0,) * len(_PP_FIELDS))
+        have = actual.get(pp, (income,) + (0,) * len(_PP_FIELDS))
+        for f, w, h in zip(fields, want, have):
+            if abs((w or 0) - (h or 0)) > _TOLERANCE:
+                problems.append({"pp": pp, "field": f, "expected": w, "actual": h})
+
+    expected_cls = {(pp, c): (a, n) for pp, c, a, n in db.execute(_raw_class_totals())}
+    actual_cls = {
+        (t.pp, t.bill_class): (t.amount, t.bill_count)
+        for t in db.execute(select(models.PayPeriodClassTotal)).scalars()
+        if t.bill_count
+    }
+    for key in sorted(set(expected_cls) | set(actual_cls), key=str):
+        want = expected_cls.get(key, (0.0, 0))
+        have = actual_cls.get(key, (0.0, 0))
+        for f, w, h in zip(("amount", "bill_count"), want, have):
+            if abs((w or 0) - (h or 0)) > _TOLERANCE:
+                problems.append({"pp": key[0], "bill_class": key[1], "field": f, "expected": w, "actual": h})
+    return problems
+
+
+def summary_from_total(total: models.PayPeriodTotal) -> Dict[str, object]:
+    """pots.build_summary() of a totals row, plus pp_id and bill counts."""
+    summary = build_summary(total.income, round(total.fixed or 0.0, 2), round(total.variable or 0.0, 2))
+    summary["pp_id"] = total.pp
+    summary["bill_count"] = total.bill_count
+    summary["paid_count"] = total.paid_count
+    summary["unpaid_count"] = total.unpaid_count
+    return summary
@@ -1,11 +1,12 @@
 
 import os
+import sys
 import logging
 from pathlib import Path
 import pandas as pd
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
-from datetime import date, timedelta
+from datetime import date
 
 # This script reuses the database models and configuration from the FastAPI backend
 # to populate the database from the CSV file.
@@ -13,6 +14,11 @@ from datetime import date, timedelta
 # --- Configuration ---
 # Ensure paths are resolved from the project root to run this script from anywhere
 ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from autobudget_backend.services.ingest import bulk_load_bills_frame
+
 DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{ROOT_DIR / 'autobudget.db'}")
 CSV_FILE_PATH = os.getenv("CSV_FILE_PATH", str(ROOT_DIR / "data/5.Tidy_Bills_AugNov_with_PPs.csv"))
 PAY_PERIOD_ANCHOR_DATE = date.fromisoformat(os.getenv("PAY_PERIOD_ANCHOR_DATE", "2025-08-04"))
@@ -65,30 +71,14 @@ def ingest_data():
         logger.error(f"FATAL: CSV file not found at {CSV_FILE_PATH}")
         return
 
-    logger.info("Wiping existing data from bills and pay_periods tables...")
-    db.query(BillDB).delete()
-    db.query(PayPeriodDB).delete()
-
-    logger.info(f"Ingesting {len(df)} new bill records...")
-    for _, row in df.iterrows():
-        bill = BillDB(**row.to_dict(), paid=False)
-        db.add(bill)
-
-    unique_pps = sorted(df["PP"].unique())
-    logger.info(f"Ingesting {len(unique_pps)} new pay period records...")
-    for pp_num in unique_pps:
-        offset = int(pp_num - unique_pps[0])
-        start_date = PAY_PERIOD_ANCHOR_DATE + timedelta(weeks=2 * offset)
-        end_date = start_date + timedelta(days=13)
-        pp_entry = PayPeriodDB(pp_number=pp_num, start_date=start_date, end_date=end_date)
-        db.add(pp_entry)
-    
+    logger.info(f"Replacing bills and pay_periods with {len(df)} bill records...")
     try:
-        db.commit()
-        logger.info("Successfully committed all new data to the database!")
+        bill_count, pp_count = bulk_load_bills_frame(
+            db, df, BillDB.__table__, PayPeriodDB.__table__, PAY_PERIOD_ANCHOR_DATE
+        )
+        logger.info(f"Successfully committed {bill_count} bills and {pp_count} pay periods!")
     except Exception as e:
         logger.error(f"Failed to commit data: {e}")
-        db.rollback()
     finally:
         db.close()
         logger.info("Database session closed.")
@@ -0,0 +1,56 @@
+"""Rebuild or verify the materialized pay_period_totals tables.
+
+Usage:
+  python scripts/rebuild_totals.py            # verify, then rebuild if drift is found
+  python scripts/rebuild_totals.py --verify   # report drift only (exit 1 if any)
+  python scripts/rebuild_totals.py --rebuild  # always rebuild from raw bills/paychecks
+
+Uses DATABASE_URL like the backend.
+"""
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from autobudget_backend import models  # noqa: F401  (registers tables)
+from autobudget_backend.db import SessionLocal, init_db, SQLALCHEMY_DATABASE_URL
+from autobudget_backend.services import totals
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("rebuild_totals")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--verify", action="store_true", help="only report drift")
+    group.add_argument("--rebuild", action="store_true", help="rebuild without verifying first")
+    args = parser.parse_args()
+
+    logger.info(f"Using database at {SQLALCHEMY_DATABASE_URL}")
+    init_db()
+    db = SessionLocal()
+    try:
+        if not args.rebuild:
+            problems = totals.verify(db)
+            for p in problems:
+                logger.warning(f"Drift: {p}")
+            logger.info(f"Verify: {len(problems)} mismatches")
+            if args.verify:
+                return 1 if problems else 0
+            if not problems:
+                return 0
+        count = totals.rebuild(db)
+        db.commit()
+        logger.info(f"Rebuilt totals for {count} pay periods")
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import csv
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Point the app at a throwaway SQLite file before autobudget_backend.db is imported.
+_TMP_DIR = tempfile.mkdtemp(prefix="autobudget-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{Path(_TMP_DIR) / 'test.db'}"
+
+SAMPLE_CSV = Path(__file__).resolve().parents[1] / "data" / "5.Tidy_Bills_AugNov_with_PPs.csv"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def seed_sample_bills():
+    """Load the sample bills CSV (PP17–PP24) once per test session."""
+    from sqlalchemy import insert
+    from autobudget_backend import models
+    from autobudget_backend.db import SessionLocal, init_db
+    from autobudget_backend.services import pay_calendar, totals
+
+    init_db()
+    with SAMPLE_CSV.open(newline="", encoding="utf-8") as f:
+        rows = [
+            {
+                "name": r["Name"],
+                "amount": float(r["Amount"]),
+                "due_day": int(r["DueDay"]),
+                "bill_class": r["Class"],
+                "pp": int(r["PP"]),
+                "paid": False,
+            }
+            for r in csv.DictReader(f)
+        ]
+    db = SessionLocal()
+    try:
+        pay_calendar.stamp_due_dates(rows, db)
+        db.execute(insert(models.Bill), rows)
+        totals.TotalsDelta().add_rows(rows).flush(db)
+        db.commit()
+    finally:
+        db.close()
+    yield
+    # Pooled aiosqlite connections hold non-daemon threads; close them so the run exits.
+    from autobudget_backend.db import async_engine
+    if async_engine is not None:
+        import asyncio
+        asyncio.run(async_engine.dispose())
@@ -0,0 +1,816 @@
+import asyncio
+import io
+
+from autobudget_backend.services import ingest
+
+
+class _Upload:
+    def __init__(self, data: bytes):
+        self._buf = io.BytesIO(data)
+
+    async def read(self, size: int = -1) -> bytes:
+        return self._buf.read(size)
+
+
+def _collect_rows(data: bytes, chunk_size: int):
+    async def _run():
+        out = []
+        async for header, rows in ingest.aiter_csv_rows(_Upload(data), chunk_size):
+            out.append((header, rows))
+        return out
+    return asyncio.run(_run())
+
+
+def test_ingest_chunked_parse_matches_whole_file():
+    data = (
+        "Name,Amount,DueDay,Class,PP\n"
+        '"Multi\nline",12.5,3,Credit,17\n'
+        + "".join(f"Bill {i},{i}.0,{i % 28 + 1},Needed,18\n" for i in range(50))
+        # Only CR/LF end records: form feed, NEL and U+2028 stay in the name.
+        + 'Form\x0cfeed,1,2,Needed,18\r\nCafé\x85Bar,2,3,Needed,18\n"Line\u2028sep",3,4,Needed,18\n'
+    ).encode("utf-8")
+    batches = _collect_rows(data, chunk_size=7)
+    header = batches[0][0]
+    rows = [row for _, rs in batches for row in rs]
+    assert header == ["Name", "Amount", "DueDay", "Class", "PP"]
+    assert len(rows) == 54
+    assert rows[0][0] == "Multi\nline"
+    assert [r[0] for r in rows[-3:]] == ["Form\x0cfeed", "Café\x85Bar", "Line\u2028sep"]
+    cols = ingest.resolve_columns(header)
+    assert ingest.parse_row(rows[50], cols)["amount"] == 49.0
+    for size in (1, 3, 64, len(data)):
+        assert [row for _, rs in _collect_rows(data, chunk_size=size) for row in rs] == rows
+
+
+def test_bulk_load_bills_frame_replaces_tables():
+    import pandas as pd
+    from datetime import date
+    from sqlalchemy import create_engine, func, select
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import main as legacy
+
+    engine = create_engine("sqlite://")
+    legacy.Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    df = pd.DataFrame({
+        "Name": ["Amex", "Rent", "Food"],
+        "Month": ["AUG", "AUG", "SEP"],
+        "Amount": [152.0, 3400.0, 500.0],
+        "DueDay": [8, 1, 7],
+        "Class": ["Credit", "Essential", "Essential"],
+        "PP": [17, 17, 19],
+    })
+    for _ in range(2):  # second run must replace, not append
+        bills, pps = ingest.bulk_load_bills_frame(
+            db, df, legacy.BillDB.__table__, legacy.PayPeriodDB.__table__, date(2025, 8, 4)
+        )
+    assert (bills, pps) == (3, 2)
+    assert db.scalar(select(func.count()).select_from(legacy.BillDB)) == 3
+    pp19 = db.scalars(select(legacy.PayPeriodDB).where(legacy.PayPeriodDB.pp_number == 19)).one()
+    assert pp19.start_date == date(2025, 9, 1)
+    assert pp19.end_date == date(2025, 9, 14)
+    assert db.scalars(select(legacy.BillDB.paid)).all() == [False] * 3
+
+
+def test_make_engine_applies_sqlite_pragmas(tmp_path):
+    from sqlalchemy import text
+    from autobudget_backend.db import make_engine
+
+    eng = make_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    with eng.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+    assert eng.pool.size() == 40
+
+    mem = make_engine("sqlite://")
+    with mem.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+    with mem.connect() as conn:  # same connection, table still visible
+        assert conn.execute(text("SELECT count(*) FROM t")).scalar() == 0
+
+
+def test_migrations_add_indexes_used_by_hot_queries(tmp_path):
+    from datetime import date
+    from sqlalchemy import create_engine, select, text
+    from autobudget_backend import migrations, models
+
+    eng = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with eng.begin() as conn:  # pre-index schema, as created by older releases
+        conn.execute(text("CREATE TABLE bills (id INTEGER PRIMARY KEY, name VARCHAR, amount FLOAT, "
+                          "due_day INTEGER, bill_class VARCHAR, pp INTEGER, paid BOOLEAN)"))
+        conn.execute(text("INSERT INTO bills (name, amount, due_day, bill_class, pp, paid) "
+                          "VALUES ('Old', 10.0, 31, 'Credit', 19, 0)"))
+        conn.execute(text("CREATE TABLE reminders (id INTEGER PRIMARY KEY, bill_id INTEGER, "
+                          "sent_at DATETIME, reminder_type VARCHAR)"))
+    models.Base.metadata.create_all(eng)  # as init_db(): new tables only, old ones untouched
+    assert migrations.migrate(eng) == [m[0] for m in migrations.MIGRATIONS]
+    assert migrations.migrate(eng) == []
+
+    Bill, Reminder = models.Bill, models.Reminder
+    with eng.connect() as conn:  # PP19 starts 2025-09-01; day 31 clamps to the 30th
+        assert conn.execute(select(Bill.due_date)).scalar_one() == date(2025, 9, 30)
+    queries = {
+        "ix_bills_due_date": select(Bill).where(Bill.due_date.between(date(2025, 9, 1), date(2025, 9, 30)))
+            .order_by(Bill.due_date),
+        "ix_bills_pp_class_amount": select(Bill.bill_class, Bill.amount).where(Bill.pp == 17),
+        "ix_bills_class_amount": select(Bill).where(Bill.bill_class == "Credit"),
+        "ix_bills_paid_amount": select(Bill).where(Bill.amount < 100, Bill.paid == False),
+        "ix_bills_pp_id": select(Bill).where(Bill.pp == 17, Bill.id > 5).order_by(Bill.id).limit(50),
+        "ix_bills_paid_id": select(Bill).where(Bill.paid == False, Bill.id > 5).order_by(Bill.id).limit(50),
+        "ix_reminders_bill_type_sent": select(Reminder)
+            .where(Reminder.bill_id == 1, Reminder.reminder_type == "due_in_3_days")
+            .order_by(Reminder.sent_at.desc()).limit(1),
+    }
+    with eng.connect() as conn:
+        for index, stmt in queries.items():
+            sql = str(stmt.compile(eng, compile_kwargs={"literal_binds": True}))
+            plan = " ".join(row[-1] for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+            assert index in plan, plan
+
+
+def test_summary_from_totals_matches_bill_sums():
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import pots, totals
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    bills = [
+        models.Bill(name="Loan", amount=200.0, due_day=1, bill_class="Debt", pp=17),
+        models.Bill(name="Rent", amount=1000.0, due_day=1, bill_class="Critical", pp=17),
+        models.Bill(name="Food", amount=150.5, due_day=5, bill_class="Needed", pp=17),
+        models.Bill(name="Fun", amount=40.0, due_day=9, bill_class="Comfort", pp=18),
+        models.Bill(name="Card", amount=80.0, due_day=9, bill_class="Credit", pp=18),
+    ]
+    db.add_all(bills + [models.Paycheck(source="Job", amount=2000.0, player_id="player1")])
+    db.flush()
+    totals.rebuild(db)
+
+    s17 = totals.summary_from_total(db.get(models.PayPeriodTotal, 17))
+    assert (s17["income"], s17["fixed"], s17["variable"]) == (2000.0, 1200.0, 150.5)
+    assert s17["surplus_or_deficit"] == 649.5
+    assert s17["pots"] == pots.build_summary(2000.0, 1200.0, 150.5)["pots"]
+    assert db.get(models.PayPeriodTotal, 99) is None
+    s18 = totals.summary_from_total(db.get(models.PayPeriodTotal, 18))
+    assert (s18["pp_id"], s18["fixed"], s18["variable"], s18["bill_count"]) == (18, 0.0, 40.0, 2)
+
+
+def test_totals_rebuild_and_verify_detects_drift():
+    from sqlalchemy import create_engine, update
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import totals
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        models.Bill(name="Rent", amount=1000.0, due_day=1, bill_class="Critical", pp=17, paid=True),
+        models.Bill(name="Food", amount=150.0, due_day=5, bill_class="Needed", pp=17),
+        models.Bill(name="Card", amount=80.0, due_day=9, bill_class=None, pp=18),
+        models.Paycheck(source="Job", amount=2000.0, player_id="player1"),
+    ])
+    db.flush()
+    assert totals.rebuild(db) == 2
+    assert totals.verify(db) == []
+    t17 = db.get(models.PayPeriodTotal, 17)
+    assert (t17.income, t17.fixed, t17.variable, t17.paid_count, t17.unpaid_count) == (2000.0, 1000.0, 150.0, 1, 1)
+
+    db.execute(update(models.PayPeriodTotal).where(models.PayPeriodTotal.pp == 18).values(bill_count=5))
+    assert [(p["pp"], p["field"]) for p in totals.verify(db)] == [(18, "bill_count")]
+
+
+def test_pay_calendar_vectorized_due_dates_match_scalar_rule():
+    from datetime import date, timedelta
+    from autobudget_backend.services.pay_calendar import PayPeriodCalendar
+
+    def legacy_due(pp, due_day):  # the rule previously duplicated in app.py/reminders.py
+        d = date(2025, 8, 4) + timedelta(weeks=(pp - 17) * 2)
+        nm, ny = (1, d.year + 1) if d.month == 12 else (d.month + 1, d.year)
+        last = (date(ny, nm, 1) - timedelta(days=1)).day
+        return date(d.year, d.month, min(int(due_day or 1), last))
+
+    cal = PayPeriodCalendar()
+    pps = [pp for pp in range(-30, 120) for _ in range(3)]
+    days = [None, 15, 31] * 150
+    assert cal.due_dates(pps, days) == [legacy_due(p, d) for p, d in zip(pps, days)]
+    assert cal.month_key(17) == "2025-08" and cal.end(17) == date(2025, 8, 17)
+    assert cal.due_dates([None, 17], [5, 5]) == [None, date(2025, 8, 5)]
+
+    shifted = PayPeriodCalendar(overrides={18: (date(2025, 9, 1), date(2025, 9, 14))})
+    assert shifted.due_date(18, 31) == date(2025, 9, 30)
+    assert shifted.month_key(18) == "2025-09"
+
+
+def test_response_cache_lru_versions_and_etags(monkeypatch):
+    from autobudget_backend.services import response_cache as rc
+
+    monkeypatch.setattr(rc, "MAX_ENTRIES", 2)
+    rc.clear()
+    seen = rc.versions(["t"])
+    first = rc.put("/a", ["t"], b"a", {}, seen)
+    rc.put("/b", ["t"], b"b", {}, seen)
+    assert rc.get("/a", ["t"]) is first  # refreshes /a, so /b is evicted next
+    rc.put("/c", ["t"], b"c", {}, seen)
+    assert rc.get("/b", ["t"]) is None and rc.get("/c", ["t"]) is not None
+
+    rc.bump("t")
+    assert rc.get("/a", ["t"]) is None
+    rc.put("/a", ["t"], b"a", {}, seen)  # rendered before the bump: not cached
+    assert rc.get("/a", ["t"]) is None
+
+    assert rc.etag_matches(f'W/{first.etag}, "x"', first.etag)
+    assert rc.etag_matches("*", first.etag)
+    assert not rc.etag_matches('"other"', first.etag)
+    rc.clear()
+
+
+def test_due_reminders_selected_in_one_query_and_bulk_inserted():
+    from datetime import datetime, timedelta
+    from sqlalchemy import create_engine, event, select
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import reminders
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime(2025, 9, 1, 9, 0)
+    today = now.date()
+    bills = {
+        name: models.Bill(name=name, amount=10.0, due_day=1, bill_class="Credit", pp=19, paid=paid, due_date=today + timedelta(days=offset))
+        for name, offset, paid in [
+            ("today", 0, False), ("soon", 3, False), ("later", 5, False),
+            ("past", -1, False), ("far", 9, False), ("paid", 1, True),
+            ("recent", 1, False), ("stale", 2, False),
+        ]
+    }
+    db.add_all(bills.values())
+    db.flush()
+    db.add_all([
+        models.Reminder(bill_id=bills["recent"].id, reminder_type="due_in_3_days", sent_at=now - timedelta(hours=2)),
+        models.Reminder(bill_id=bills["stale"].id, reminder_type="due_in_3_days", sent_at=now - timedelta(hours=30)),
+        models.Reminder(bill_id=bills["later"].id, reminder_type="due_in_3_days", sent_at=now - timedelta(hours=1)),
+    ])
+    db.commit()
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    assert reminders.send_due_bill_reminders(days_ahead=7, db=db, now=now) == 4
+    assert sum(s.lstrip().upper().startswith("SELECT") for s in statements) == 1
+    assert sum(s.lstrip().upper().startswith("INSERT") for s in statements) == 1
+
+    sent = db.execute(select(models.Bill.name, models.Reminder.reminder_type)
+                      .join(models.Reminder, models.Reminder.bill_id == models.Bill.id)
+                      .where(models.Reminder.sent_at == now)).all()
+    assert sorted(sent) == [("later", "due_soon"), ("soon", "due_in_3_days"),
+                            ("stale", "due_in_3_days"), ("today", "due_in_3_days")]
+    assert reminders.send_due_bill_reminders(days_ahead=7, db=db, now=now) == 0
+
+    # Driven by the due_date range, one index seek per candidate; no scan of reminder history.
+    sql = str(reminders.due_reminders_query(today, 7, now).compile(engine, compile_kwargs={"literal_binds": True}))
+    plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert "ix_bills_due_date" in plan and "ix_reminders_bill_type_sent (bill_id=?" in plan, plan
+    assert "MATERIALIZE" not in plan and "SCAN" not in plan, plan
+
+
+def test_delivery_batches_per_channel_limits_concurrency_and_retries():
+    import asyncio
+    from autobudget_backend.services import delivery
+
+    class SlowSink(delivery.MemorySink):
+        in_flight = peak = 0
+
+        async def send(self, batch):
+            SlowSink.in_flight += 1
+            SlowSink.peak = max(SlowSink.peak, SlowSink.in_flight)
+            await asyncio.sleep(0.01)
+            SlowSink.in_flight -= 1
+            return await super().send(batch)
+
+    email, sms = SlowSink(fail_first={1: 1, 2: 5}), delivery.MemorySink()
+    messages = [delivery.Message(i, i, "email" if i <= 7 else "sms", f"m{i}") for i in range(1, 10)]
+    outcomes = asyncio.run(delivery.deliver(
+        messages, {"email": email, "sms": sms}, concurrency=2, batch_size=3, max_attempts=3, backoff=0.001,
+    ))
+    by_id = {o["reminder_id"]: o for o in outcomes}
+    assert [o["reminder_id"] for o in outcomes] == list(range(1, 10))
+    assert (by_id[1]["status"], by_id[1]["attempts"]) == ("sent", 2)
+    assert (by_id[2]["status"], by_id[2]["attempts"], by_id[2]["error"]) == ("failed", 3, "simulated failure")
+    assert all(by_id[i]["status"] == "sent" and by_id[i]["attempts"] == 1 for i in range(3, 10))
+    assert email.batches[:3] == [3, 3, 1] and sms.batches == [2]
+    assert SlowSink.peak <= 2
+
+    missing = asyncio.run(delivery.deliver([delivery.Message(1, 1, "fax", "x")], {}))
+    assert missing[0]["status"] == "failed" and missing[0]["attempts"] == 1
+
+
+def test_reminder_outcomes_written_back_and_failures_retried_next_run(tmp_path):
+    from datetime import datetime, timedelta
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import delivery, reminders
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime(2025, 9, 1, 9, 0)
+    db.add_all(models.Bill(name=f"B{i}", amount=1.0, due_day=1, pp=19, paid=False, due_date=now.date()) for i in range(3))
+    db.commit()
+
+    class Flaky(delivery.MemorySink):
+        async def send(self, batch):
+            return ["provider down" if m.text.startswith("due_in_3_days: B0") else None for m in batch]
+
+    result = reminders.run_due_reminders(db=db, now=now, sinks={"console": Flaky()})
+    assert result == {"selected": 3, "sent": 2, "failed": 1}
+    rows = db.execute(select(models.Reminder.status, models.Reminder.attempts, models.Reminder.error)
+                      .order_by(models.Reminder.id)).all()
+    assert rows[0] == ("failed", delivery.MAX_ATTEMPTS, "provider down")
+    assert [r.status for r in rows[1:]] == ["sent", "sent"]
+
+    out = tmp_path / "reminders.jsonl"
+    later = now + timedelta(hours=1)
+    assert reminders.run_due_reminders(db=db, now=later, sinks={"console": delivery.FileSink(out)})["sent"] == 1
+    assert "B0" in out.read_text()
+
+
+def test_stale_pending_reminder_claims_are_retried():
+    from datetime import datetime, timedelta
+    from sqlalchemy import create_engine, select
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import delivery, reminders
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime(2025, 9, 1, 9, 0)
+    db.add_all(models.Bill(id=i, name=f"B{i}", amount=1.0, due_day=1, pp=19, paid=False, due_date=now.date()) for i in (1, 2))
+    # Claimed by runs that never wrote an outcome: B1 long ago, B2 just now.
+    db.add_all([
+        models.Reminder(bill_id=1, sent_at=now - timedelta(hours=1), claimed_at=now - reminders.PENDING_STALE * 2,
+                        reminder_type="due_in_3_days", status="pending", attempts=0),
+        models.Reminder(bill_id=2, sent_at=now - timedelta(minutes=1), claimed_at=now - timedelta(minutes=1),
+                        reminder_type="due_in_3_days", status="pending", attempts=0),
+    ])
+    db.commit()
+
+    result = reminders.run_due_reminders(db=db, now=now, sinks={"console": delivery.MemorySink()})
+    assert result == {"selected": 1, "sent": 1, "failed": 0}
+    latest = db.execute(select(models.Reminder.bill_id, models.Reminder.status, models.Reminder.claimed_at)
+                        .order_by(models.Reminder.id.desc())).first()
+    assert tuple(latest) == (1, "sent", now)
+
+def test_due_schedule_heap_updates_incrementally():
+    from datetime import date, datetime, timedelta
+    from autobudget_backend.services.due_schedule import DueSchedule
+
+    today = date.today()
+    sched = DueSchedule(lead_days=3, hour=9)
+    sched.update(1, today + timedelta(days=10))  # not loaded and no runner: ignored
+    assert len(sched) == 0
+    sched.load([(1, today + timedelta(days=10)), (2, today + timedelta(days=5)), (3, None)])
+    assert len(sched) == 2
+    assert sched.next_fire() == datetime.combine(today + timedelta(days=2), datetime.min.time()).replace(hour=9)
+
+    sched.update(2, today + timedelta(days=20))  # moved later: old heap entry goes stale
+    sched.update(4, today + timedelta(days=4))
+    sched.update(1, today + timedelta(days=10), paid=True)
+    assert sched.next_fire() == sched.fire_time(today + timedelta(days=4))
+    far = datetime.combine(today + timedelta(days=30), datetime.min.time())
+    assert sched.pop_due(far) == [4, 2]
+    assert sched.pop_due(far) == [] and sched.next_fire() is None
+
+    # While a runner is reloading, writes are replayed on top of the reload.
+    sched._wake = lambda: None
+    sched.invalidate()
+    sched.update(5, today + timedelta(days=6))
+    sched.discard(6)
+    sched.load([(6, today + timedelta(days=7))])
+    assert sorted(sched._targets) == [5]
+
+
+def test_due_schedule_runner_fires_at_target_and_wakes_on_writes():
+    import asyncio
+    from datetime import date, timedelta
+    from autobudget_backend.services import due_schedule
+
+    today = date.today()
+    sched = due_schedule.DueSchedule(lead_days=3, hour=0)
+    fired = []
+
+    async def scenario():
+        got = asyncio.Event()
+
+        async def fire(ids):
+            fired.append(sorted(ids))
+            got.set()
+
+        async def reload():
+            return [(1, today + timedelta(days=1)), (2, today + timedelta(days=60))]
+
+        task = asyncio.create_task(due_schedule.run(fire, reload, sched))
+        await asyncio.wait_for(got.wait(), 2)  # bill 1 is already inside its lead window
+        got.clear()
+        await asyncio.to_thread(sched.update, 3, today)  # a write from a worker thread
+        await asyncio.wait_for(got.wait(), 2)
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert fired == [[1], [3]]
+    assert list(sched._targets) == [2]
+
+
+def test_leases_exclusive_renewable_and_expire(tmp_path):
+    from datetime import datetime, timedelta
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import leases
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'leases.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    t0 = datetime(2025, 9, 1, 9, 0)
+
+    def acquire(holder, at, ttl=30):
+        with Session() as db:
+            return leases.try_acquire("scheduler", holder, ttl, db=db, now=at)
+
+    assert acquire("a", t0)
+    assert not acquire("b", t0 + timedelta(seconds=10))
+    assert acquire("a", t0 + timedelta(seconds=20))  # renew pushes expiry to t0+50s
+    assert not acquire("b", t0 + timedelta(seconds=45))
+    assert acquire("b", t0 + timedelta(seconds=51))  # a stopped renewing: failover
+    assert not acquire("a", t0 + timedelta(seconds=52))
+    with Session() as db:
+        leases.release("scheduler", "b", db=db)
+    assert acquire("a", datetime.utcnow())
+
+
+def test_scheduler_leadership_fails_over_between_workers(monkeypatch, tmp_path):
+    import asyncio
+    import gc
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import leases
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'leader.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    monkeypatch.setattr(leases, "SessionLocal", sessionmaker(bind=engine))
+    events = []
+    gc.collect()  # a collection pause mid-scenario would reorder the two workers
+
+    async def scenario():
+        def worker(name):
+            return asyncio.create_task(leases.lead(
+                lambda: events.append(("start", name)), lambda: events.append(("stop", name)),
+                ttl=0.3, holder=name,
+            ))
+
+        w1 = worker("w1")
+        await asyncio.sleep(0.05)
+        w2 = worker("w2")
+        await asyncio.sleep(0.4)
+        assert events == [("start", "w1")]  # w2 keeps waiting while w1 renews
+        w1.cancel()  # worker shuts down (releases) ...
+        await asyncio.gather(w1, return_exceptions=True)
+        await asyncio.sleep(0.3)  # ... and w2 takes over on its next renewal
+        w2.cancel()
+        await asyncio.gather(w2, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert events == [("start", "w1"), ("stop", "w1"), ("start", "w2"), ("stop", "w2")]
+
+
+def test_snowball_simulation_amortizes_with_interest_and_rollover():
+    import time
+    from datetime import date
+
+    import numpy as np
+    from autobudget_backend.services import snowball
+
+    # One debt at a fixed payment matches the closed-form annuity term.
+    bal, apr, pay = 5000.0, 18.0, 200.0
+    r = apr / 1200
+    res = snowball.simulate([bal], [apr], [pay], pay, [0])
+    n = -np.log(1 - r * bal / pay) / np.log(1 + r)
+    assert res["payoff_month"][0, 0] == int(np.ceil(n))
+    assert abs(res["total_interest"][0] - (pay * n - bal)) < pay  # last month is partial
+
+    # Snowball: smallest first, its freed minimum rolls into the next debt.
+    debts = [
+        {"name": "Big", "balance": 1000, "apr": 0, "min_payment": 50},
+        {"name": "Small", "balance": 100, "apr": 0, "min_payment": 50},
+    ]
+    out = snowball.plan(debts, monthly_payment=150, start=date(2026, 1, 31))
+    assert [d["name"] for d in out["debts"]] == ["Small", "Big"]
+    small, big = out["debts"]
+    assert small["months"] == 1 and small["payoff_date"] == "2026-02-28"
+    assert big["months"] == 8 and out["months"] == 8  # 1000 - 100 first month, then 150/month
+    assert out["total_interest"] == 0
+
+    # Avalanche targets the highest APR; interest is lower than snowball.
+    mixed = [{"name": "Low", "balance": 500, "apr": 5}, {"name": "High", "balance": 3000, "apr": 25}]
+    snow = snowball.plan(mixed, 400, "snowball")
+    aval = snowball.plan(mixed, 400, "avalanche")
+    assert aval["debts"][0]["name"] == "High"
+    assert aval["total_interest"] < snow["total_interest"]
+
+    # Minimum below the interest never pays off within the horizon.
+    stuck = snowball.compute([{"name": "Stuck", "balance": 10000, "apr": 30, "min_payment": 100}], 100)
+    assert stuck[0]["payoff_eta_days"] is None
+
+    # Dozens of debts over 30 years, many budgets at once, in milliseconds.
+    rng = np.random.default_rng(0)
+    balances = rng.uniform(500, 50000, 48)
+    aprs = rng.uniform(0, 30, 48)
+    mins = [snowball.default_minimum(b, a) for b, a in zip(balances, aprs)]
+    order = snowball.priority("snowball", balances, aprs)
+    start = time.perf_counter()
+    res = snowball.simulate(balances, aprs, mins, np.linspace(sum(mins), sum(mins) * 2, 20), order)
+    assert time.perf_counter() - start < 0.5
+    assert res["payoff_month"].shape == (20, 48)
+    assert (np.diff(res["total_interest"]) <= 0).all()  # more budget, less interest
+
+
+def test_debt_sweep_grid_matches_single_plans_serial_and_pooled(monkeypatch):
+    import pytest
+    from autobudget_backend.services import debt_sweep, snowball
+
+    debts = [
+        {"name": "Card", "balance": 3000, "apr": 24, "min_payment": 90},
+        {"name": "Car", "balance": 9000, "apr": 6, "min_payment": 250},
+        {"name": "Store", "balance": 400, "apr": 0, "min_payment": 25},
+    ]
+    grid = debt_sweep.payments(400, 1000, 150)
+    assert grid.tolist() == [400, 550, 700, 850, 1000]
+    with pytest.raises(ValueError):
+        debt_sweep.payments(0, 1e9, 1)
+
+    monkeypatch.setattr(debt_sweep, "CHUNK", 2)  # several chunks per strategy
+    serial = debt_sweep.sweep(debts, grid, ["snowball", "avalanche", "custom"], ["Car"], parallel=False)
+    assert serial["strategies"] == ["snowball", "avalanche", "custom"]
+    for i, strategy in enumerate(["snowball", "avalanche"]):
+        for j, pay in enumerate(grid):
+            single = snowball.plan(debts, pay, strategy)
+            assert serial["months"][i][j] == single["months"]
+            assert serial["total_interest"][i][j] == single["total_interest"]
+    car_first = snowball.plan(debts, 700, order=debt_sweep.custom_priority(debts, ["Car"]))
+    assert car_first["debts"][0]["name"] == "Car"
+    assert serial["total_interest"][2][2] == car_first["total_interest"]
+
+    try:
+        pooled = debt_sweep.sweep(debts, grid, ["snowball", "avalanche", "custom"], ["Car"], parallel=True)
+    finally:
+        debt_sweep.shutdown()
+    assert pooled == serial
+    with pytest.raises(ValueError):
+        debt_sweep.sweep(debts, grid, ["custom"])
+
+
+def test_debt_memo_fingerprints_debt_set_and_reloads_after_bill_writes(monkeypatch):
+    from autobudget_backend.services import debt_memo, response_cache
+
+    monkeypatch.setattr(debt_memo, "MAX_ENTRIES", 2)
+    monkeypatch.setattr(debt_memo, "stats", {"hits": 0, "misses": 0, "evictions": 0, "loads": 0})
+    debt_memo.clear()
+    a = {"name": "A", "balance": 100.0, "apr": 10.0, "min_payment": None}
+    b = {"name": "B", "balance": 200.0, "apr": 0.0, "min_payment": 25.0}
+    assert debt_memo.fingerprint([a, b]) == debt_memo.fingerprint([b, a])
+    assert debt_memo.fingerprint([a, b]) != debt_memo.fingerprint([a, {**b, "apr": 1.0}])
+
+    loads = []
+    rows = [a, b]
+
+    def load():
+        loads.append(1)
+        return list(rows)
+
+    debts, fp = debt_memo.debts(load)
+    assert debt_memo.debts(load) == (debts, fp) and len(loads) == 1  # no write, no query
+    calls = []
+    compute = lambda d: calls.append(1) or len(d)
+    assert debt_memo.memoized("k", debts, fp, (300,), compute) == 2
+    assert debt_memo.memoized("k", debts, fp, (300,), compute) == 2 and len(calls) == 1
+
+    response_cache.bump("bills")  # a write that leaves the debts as they were
+    debts, fp2 = debt_memo.debts(load)
+    assert len(loads) == 2 and fp2 == fp
+    debt_memo.memoized("k", debts, fp2, (300,), compute)
+    assert len(calls) == 1
+
+    rows.append({"name": "C", "balance": 50.0, "apr": 0.0, "min_payment": None})
+    response_cache.bump("bills")
+    debts, fp3 = debt_memo.debts(load)
+    assert fp3 != fp and debt_memo.memoized("k", debts, fp3, (300,), compute) == 3
+    debt_memo.memoized("k", debts, fp3, (400,), compute)  # third entry evicts the oldest
+    assert debt_memo.size() == 2
+    assert debt_memo.stats == {"hits": 2, "misses": 3, "evictions": 1, "loads": 3}
+    debt_memo.clear()
+
+
+def test_debt_optimizer_beats_heuristics_and_matches_best_order():
+    import itertools
+    from datetime import date, timedelta
+
+    import numpy as np
+    from autobudget_backend.services import debt_optimizer, snowball
+
+    cash = [900, 100, 900, 900, 100, 900, 100, 0, 300, 900, 300, 100, 900, 100, 100,
+            0, 0, 300, 900, 100, 300, 900, 0, 100, 300, 300, 100, 100, 0]
+    periods = [
+        {"pp": i, "start_date": date(2026, 1, 5) + timedelta(14 * i),
+         "end_date": date(2026, 1, 18) + timedelta(14 * i), "cash": float(c)}
+        for i, c in enumerate(cash)
+    ]
+    debts = [
+        {"name": "A", "balance": 1060, "apr": 19, "min_payment": 35},
+        {"name": "B", "balance": 3760, "apr": 0, "min_payment": 90},
+        {"name": "C", "balance": 4610, "apr": 27, "min_payment": 40},
+        {"name": "D", "balance": 4270, "apr": 19, "min_payment": 145},
+    ]
+    out = debt_optimizer.optimize(debts, periods)
+    compare = out["compare"]
+    assert compare["optimal"]["total_interest"] < compare["avalanche"]["total_interest"] < compare["snowball"]["total_interest"]
+
+    # Exchange search lands on the best of all 24 payoff orders here.
+    cleaned = snowball.normalize(debts)
+    arrays = [np.array([d[k] for d in cleaned], dtype=float) for k in ("balance", "apr", "min_payment")]
+    every = debt_optimizer.simulate_periods(*arrays, periods, np.array(list(itertools.permutations(range(4)))))
+    assert out["total_interest"] == round(every["interest"].sum(axis=1).min(), 2)
+
+    # Same shape as /debts/plan, plus the per-period schedule.
+    assert set(out["debts"][0]) == set(snowball.plan(debts)["debts"][0])
+    assert out["schedule"]["pp"] == list(range(len(cash)))
+    assert len(out["schedule"]["payments"]) == len(cash) and len(out["schedule"]["payments"][0]) == 4
+
+    # Enough cash clears everything; the payoff date is a period end.
+    rich = debt_optimizer.optimize(debts, [{**p, "cash": 5000.0} for p in periods])
+    assert rich["remaining_balance"] == 0 and rich["payoff_date"] in {str(p["end_date"]) for p in periods}
+    assert debt_optimizer.optimize([], periods)["debts"] == []
+
+
+def test_reconcile_aho_corasick_matches_naive_scan_and_caches_until_bill_writes():
+    import random
+    import time
+
+    from autobudget_backend.services import reconcile, response_cache
+
+    rng = random.Random(7)
+    words = ["amex", "van", "loan", "best", "buy", "home", "depot", "nfcu", "jeep", "ex", "an", "e"]
+    bills = [(i, " ".join(rng.sample(words, rng.randint(1, 2))).title()) for i in range(1, 300)]
+    txns = [{"memo": " ".join(rng.choices(words + ["coffee", "zz"], k=4)).upper()} for _ in range(300)]
+    out = reconcile.run(txns, bills)
+
+    def naive(memo):
+        hits = [(len(name), -memo.lower().find(name.lower()), -i, name) for i, name in bills if name.lower() in memo.lower()]
+        return None if not hits else max(hits)
+
+    for t in out["matched"]:
+        expected = naive(t["memo"])
+        assert expected is not None and t["bill_name"].lower() == expected[3].lower()
+        assert len(t["bill_name"]) == expected[0]
+    assert all(naive(t["memo"]) is None for t in out["unmatched"])
+    assert out["matched_count"] + out["unmatched_count"] == len(txns)
+
+    # Shared name -> lowest id; the longest name wins over the one it contains.
+    m = reconcile.Matcher([(5, "Van loan"), (2, "Van loan"), (9, "Van"), (11, "")])
+    assert m.match("PAYMENT VAN LOAN 0423") == (2, "Van loan")
+    assert m.match("vanguard") == (9, "Van") and m.match("unrelated") is None
+
+    # Thousands of bills, a month of card transactions, well under a second.
+    many = [(i, f"Merchant {i:05d}") for i in range(5000)]
+    memos = [{"memo": f"POS PURCHASE MERCHANT {rng.randrange(10000):05d} CITY ST"} for _ in range(2000)]
+    start = time.perf_counter()
+    result = reconcile.run(memos, matcher=reconcile.Matcher(many))
+    assert time.perf_counter() - start < 1.0
+    assert result["matched_count"] == sum(int(t["memo"].split()[3]) < 5000 for t in memos)
+
+    loads = []
+    reconcile.clear()
+    load = lambda: loads.append(1) or bills
+    assert reconcile.cached_matcher(load) is reconcile.cached_matcher(load) and len(loads) == 1
+    response_cache.bump("bills")
+    reconcile.cached_matcher(load)
+    assert len(loads) == 2
+    reconcile.clear()
+
+
+def test_due_schedule_runner_reloads_for_writes_from_other_workers():
+    import asyncio
+    from datetime import date, timedelta
+    from autobudget_backend.services import due_schedule
+
+    today = date.today()
+    sched = due_schedule.DueSchedule(lead_days=3, hour=0)
+    db_rows = [(1, today + timedelta(days=1))]
+    fired = []
+
+    async def scenario():
+        got = asyncio.Event()
+
+        async def fire(ids):
+            fired.append(sorted(ids))
+            got.set()
+
+        async def reload():
+            return list(db_rows)
+
+        task = asyncio.create_task(due_schedule.run(fire, reload, sched, reload_every=0.05))
+        await asyncio.wait_for(got.wait(), 2)
+        got.clear()
+        db_rows.append((2, today))  # committed by another worker: no update() here
+        await asyncio.wait_for(got.wait(), 2)
+        await asyncio.sleep(0.2)  # more reloads: neither bill fires twice
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert fired == [[1], [2]]
+
+
+def test_fired_bills_use_the_lead_time_window_and_unselected_ones_retry():
+    import asyncio
+    from datetime import date, datetime, timedelta
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import delivery, due_schedule, reminders
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    now = datetime(2025, 9, 1, 9, 0)
+    sched = due_schedule.DueSchedule(lead_days=5, hour=9)
+    db.add(models.Bill(id=1, name="Far", amount=1.0, due_day=6, pp=19, paid=False, due_date=now.date() + timedelta(days=5)))
+    db.commit()
+    assert sched.fire_time(now.date() + timedelta(days=5)) == now
+    # The default 3-day window misses a bill fired 5 days ahead; the lead time does not.
+    assert reminders.run_bill_reminders([1], days_ahead=3, db=db, now=now, sinks={"console": delivery.MemorySink()}) == [1]
+    assert reminders.run_bill_reminders([1], days_ahead=sched.lead_days, db=db, now=now,
+                                        sinks={"console": delivery.MemorySink()}) == []
+    assert db.query(models.Reminder.reminder_type).scalar() == "due_soon"  # more than 3 days out
+
+    today = date.today()
+    fired = []
+
+    async def scenario():
+        twice = asyncio.Event()
+
+        async def fire(ids):
+            fired.append(sorted(ids))
+            if len(fired) == 2:
+                twice.set()
+            return ids if len(fired) == 1 else []  # first run selects nothing
+
+        async def reload():
+            return [(1, today)]
+
+        task = asyncio.create_task(due_schedule.run(fire, reload, due_schedule.DueSchedule(lead_days=5, hour=0),
+                                                    reload_every=0.05))
+        await asyncio.wait_for(twice.wait(), 2)
+        await asyncio.sleep(0.2)  # handled now: no third fire
+        task.cancel()
+
+    asyncio.run(scenario())
+    assert fired == [[1], [1]]
+
+def test_batch_set_paid_treats_null_as_unpaid_and_leaves_commit_to_caller():
+    from sqlalchemy import create_engine, update
+    from sqlalchemy.orm import sessionmaker
+    from autobudget_backend import models
+    from autobudget_backend.db import Base
+    from autobudget_backend.services import batch, totals
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([
+        models.Bill(id=1, name="Rent", amount=1000.0, due_day=1, bill_class="Critical", pp=17),
+        models.Bill(id=2, name="Food", amount=150.0, due_day=5, bill_class="Needed", pp=17, paid=True),
+    ])
+    db.flush()
+    db.execute(update(models.Bill).where(models.Bill.id == 1).values(paid=None))  # legacy row
+    totals.rebuild(db)
+    db.commit()
+
+    results, due = batch.set_paid(db, pp=17)
+    assert [(r["id"], r["paid"]) for r in results] == [(1, True), (2, False)]
+    assert [(bill_id, paid) for bill_id, _, paid in due] == [(1, True), (2, False)]
+    assert [b.paid for b in db.query(models.Bill).order_by(models.Bill.id)] == [True, False]
+    assert totals.verify(db) == []
+
+    db.rollback()  # nothing was committed by the service
+    assert [b.paid for b in db.query(models.Bill).order_by(models.Bill.id)] == [None, True]
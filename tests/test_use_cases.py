@@ -1,5 +1,7 @@
+import io
 import os
 import json
+import uuid
 import pytest
 from fastapi.testclient import TestClient
 
@@ -119,3 +121,555 @@ def test_calendar_endpoint():
         else:
             for k in ["id", "title", "start_date", "end_date"]:
                 assert k in ev
+
+
+@pytest.mark.order(12)
+def test_ingest_bills_streaming_reports_throughput():
+    csv_text = "Name,Month,Amount,DueDay,Class,PP\nIngest A,AUG,10,5,Credit,17\nIngest B,AUG,oops,5,Credit,17\n"
+    r = client.post("/ingest/bills", files={"file": ("bills.csv", csv_text, "text/csv")})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["ingested_rows"] == 1
+    assert body["skipped_rows"] == 1
+    assert "rows_per_second" in body
+
+
+@pytest.mark.order(13)
+def test_ingest_bills_upsert_is_idempotent():
+    tag = uuid.uuid4().hex[:8]  # fresh content so the file hash is unseen
+    base = f"Name,Amount,DueDay,Class,PP\nUpsert A {tag},10,5,Credit,30\nUpsert B {tag},20,6,Needed,30\n"
+    changed = base.replace(f"{tag},20", f"{tag},25") + f"Upsert C {tag},5,7,Comfort,30\nbad,row\n"
+
+    def post(text):
+        r = client.post("/ingest/bills?mode=upsert", files={"file": ("b.csv", text, "text/csv")})
+        assert r.status_code == 200
+        return r.json()
+
+    first, again, delta = post(base), post(base), post(changed)
+    assert (first["skipped"], first["inserted"]) == (False, 2)
+    assert again["skipped"] is True
+    assert {k: delta[k] for k in ("inserted", "updated", "unchanged", "rejected")} == {
+        "inserted": 1, "updated": 1, "unchanged": 1, "rejected": 1,
+    }
+
+
+@pytest.mark.order(14)
+def test_ingest_job_runs_in_background_and_reports_progress():
+    csv_text = "Name,Amount,DueDay,Class,PP\nJob A,10,5,Credit,31\nJob B,x,5,Credit,31\nJob C,12,6,Credit,31\n"
+    r = client.post("/ingest/jobs", files={"file": ("jobs.csv", csv_text, "text/csv")})
+    assert r.status_code == 202
+    job_id = r.json()["job_id"]
+    status = client.get(f"/ingest/jobs/{job_id}").json()
+    assert status["status"] == "done"
+    assert (status["rows_done"], status["rows_rejected"]) == (2, 1)
+    assert len(status["errors"]) == 1 and "rows_per_second" in status
+    assert client.get("/ingest/jobs/does-not-exist").status_code == 404
+
+
+@pytest.mark.order(15)
+def test_ingest_job_resumes_from_last_checkpoint():
+    import asyncio
+    from starlette.datastructures import UploadFile
+    from autobudget_backend import models
+    from autobudget_backend.db import SessionLocal
+    from autobudget_backend.services import ingest_jobs, totals
+
+    tag = uuid.uuid4().hex[:8]
+    lines = "".join(f"Resume {tag} {i},{i},5,Credit,32\n" for i in range(5))
+    upload = UploadFile(file=io.BytesIO(f"Name,Amount,DueDay,Class,PP\n{lines}".encode()), filename="r.csv")
+    job_id = asyncio.run(ingest_jobs.create_job(upload))["job_id"]
+
+    # Simulate a restart after the first two-row batch committed.
+    db = SessionLocal()
+    try:
+        committed = [dict(name=f"Resume {tag} {i}", amount=i, due_day=5, bill_class="Credit", pp=32) for i in range(2)]
+        db.add_all(models.Bill(**row) for row in committed)
+        totals.TotalsDelta().add_rows(committed).flush(db)
+        job = db.get(models.IngestJob, job_id)
+        job.status, job.rows_done = "running", 2
+        db.commit()
+    finally:
+        db.close()
+
+    asyncio.run(ingest_jobs.run_job(job_id, batch_size=2))
+    assert ingest_jobs.get_job(job_id)["rows_done"] == 5
+    db = SessionLocal()
+    try:
+        names = [b.name for b in db.query(models.Bill).filter(models.Bill.name.like(f"Resume {tag}%"))]
+    finally:
+        db.close()
+    assert sorted(names) == [f"Resume {tag} {i}" for i in range(5)]
+
+
+@pytest.mark.order(31)
+def test_ingest_job_claimed_by_live_worker_is_not_run_twice():
+    import asyncio
+    from datetime import datetime, timedelta
+    from starlette.datastructures import UploadFile
+    from autobudget_backend import models
+    from autobudget_backend.db import SessionLocal
+    from autobudget_backend.services import ingest_jobs
+
+    tag = uuid.uuid4().hex[:8]
+    lines = "".join(f"Claim {tag} {i},{i},5,Credit,32\n" for i in range(3))
+    upload = UploadFile(file=io.BytesIO(f"Name,Amount,DueDay,Class,PP\n{lines}".encode()), filename="c.csv")
+    job_id = asyncio.run(ingest_jobs.create_job(upload))["job_id"]
+
+    db = SessionLocal()
+    try:
+        assert ingest_jobs.claim(db, job_id, owner="other-worker")
+        assert not ingest_jobs.claim(db, job_id, owner="me")  # live claim: not claimable
+        assert job_id not in ingest_jobs.pending_job_ids()
+        asyncio.run(ingest_jobs.run_job(job_id))  # e.g. a new leader resuming jobs
+        assert db.query(models.Bill).filter(models.Bill.name.like(f"Claim {tag}%")).count() == 0
+
+        # The other worker died: once its heartbeat is stale the job resumes once.
+        job = db.get(models.IngestJob, job_id)
+        job.heartbeat_at = datetime.utcnow() - timedelta(seconds=ingest_jobs.STALE_SECONDS + 1)
+        db.commit()
+        assert job_id in ingest_jobs.pending_job_ids()
+        assert asyncio.run(ingest_jobs.resume_pending_jobs()) >= 1
+        db.expire_all()
+        assert db.query(models.Bill).filter(models.Bill.name.like(f"Claim {tag}%")).count() == 3
+        assert ingest_jobs.get_job(job_id)["status"] == "done"
+    finally:
+        db.close()
+
+
+@pytest.mark.order(16)
+def test_columnar_import_export_roundtrip():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    tag = uuid.uuid4().hex[:8]
+    table = pa.table({
+        "source": [f"Columnar {tag}", f"Columnar {tag}"],
+        "amount": pa.array([1500, 1600], pa.int32()),  # cast to float64 as a batch
+        "player_id": ["player1", "player2"],
+    })
+    buf = io.BytesIO()
+    pq.write_table(table, buf)
+    r = client.post("/ingest/columnar/paychecks", files={"file": ("p.parquet", buf.getvalue())})
+    assert r.status_code == 200
+    assert r.json()["ingested_rows"] == 2
+
+    bad = io.BytesIO()
+    pq.write_table(pa.table({"source": ["x"], "amount": ["not-a-number"], "player_id": ["p"]}), bad)
+    assert client.post("/ingest/columnar/paychecks", files={"file": ("b.parquet", bad.getvalue())}).status_code == 400
+
+    for fmt in ("parquet", "arrow"):
+        r = client.get(f"/export/columnar/paychecks?format={fmt}")
+        assert r.status_code == 200
+        if fmt == "parquet":
+            out = pq.read_table(io.BytesIO(r.content))
+        else:
+            out = pa.ipc.open_stream(r.content).read_all()
+        sources = out.column("source").to_pylist()
+        assert sources.count(f"Columnar {tag}") == 2
+        assert out.schema.field("amount").type == pa.float64()
+    assert client.get("/export/columnar/nope").status_code == 400
+
+    bills = pa.table({
+        "name": [f"Columnar card {tag}", f"Columnar rent {tag}"],
+        "amount": [40.0, 900.0],
+        "due_day": [31, 1],
+        "bill_class": ["Credit", "Needed"],
+        "pp": [17, 17],
+        "paid": [None, True],
+        "apr": [19.99, None],
+        "min_payment": [35.0, None],
+    })
+    buf = io.BytesIO()
+    pq.write_table(bills, buf)
+    r = client.post("/ingest/columnar/bills", files={"file": ("b.parquet", buf.getvalue())})
+    assert r.status_code == 200 and r.json()["ingested_rows"] == 2
+    out = pq.read_table(io.BytesIO(client.get("/export/columnar/bills?format=parquet").content))
+    assert {"apr", "min_payment", "due_date"} <= set(out.schema.names)
+    assert out.schema.field("due_date").type == pa.date32()
+    exported = {r["name"]: r for r in out.to_pylist() if r["name"].endswith(tag)}
+    listed = {b["name"]: b for b in client.get("/bills", params={"limit": 1000}).json() if b["name"].endswith(tag)}
+    for name, row in exported.items():
+        assert row["due_date"].isoformat() == listed[name]["due_date"]
+        assert (row["apr"], row["min_payment"], row["paid"]) == (listed[name]["apr"], listed[name]["min_payment"], listed[name]["paid"])
+    assert (exported[f"Columnar card {tag}"]["apr"], exported[f"Columnar rent {tag}"]["paid"]) == (19.99, True)
+
+
+@pytest.mark.order(17)
+def test_async_read_endpoints_serve_concurrent_requests():
+    import asyncio
+    import httpx
+
+    paths = ["/bills", "/calendar", "/payperiods/17/summary", "/debts/snowball", "/gamification/tasks"]
+
+    async def _run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+            return await asyncio.gather(*(ac.get(p) for p in paths * 10))
+
+    responses = asyncio.run(_run())
+    assert [r.status_code for r in responses] == [200] * len(responses)
+
+
+@pytest.mark.order(18)
+def test_payperiod_range_summary_matches_single_calls():
+    r = client.get("/payperiods/summary", params={"from": 17, "to": 18})
+    assert r.status_code == 200
+    items = r.json()
+    assert [i["pp_id"] for i in items] == [17, 18]
+    assert items[0] == client.get("/payperiods/17/summary").json()
+    assert client.get("/payperiods/summary", params={"from": 5, "to": 1}).status_code == 400
+
+
+@pytest.mark.order(19)
+def test_pay_period_totals_track_writes_and_verify_clean():
+    from autobudget_backend.db import SessionLocal
+    from autobudget_backend.services import totals
+
+    before = client.get("/payperiods/17/summary").json()
+    bill = client.post("/bills", json={"name": "Totals", "amount": 50.0, "due_day": 3, "bill_class": "Critical", "pp": 17}).json()
+    after_create = client.get("/payperiods/17/summary").json()
+    assert after_create["fixed"] == round(before["fixed"] + 50.0, 2)
+    assert after_create["unpaid_count"] == before["unpaid_count"] + 1
+
+    client.put(f"/bills/{bill['id']}", json={"amount": 70.0, "paid": True})
+    after_update = client.get("/payperiods/17/summary").json()
+    assert after_update["fixed"] == round(before["fixed"] + 70.0, 2)
+    assert after_update["paid_count"] == before["paid_count"] + 1
+
+    pay = client.post("/paychecks", json={"source": "Totals", "amount": 100.0, "player_id": "player1"}).json()
+    assert client.get("/payperiods/17/summary").json()["income"] == before["income"] + 100.0
+    client.delete(f"/paychecks/{pay['id']}")
+    client.delete(f"/bills/{bill['id']}")
+    assert client.get("/payperiods/17/summary").json() == before
+
+    db = SessionLocal()
+    try:
+        assert totals.verify(db) == []
+    finally:
+        db.close()
+
+
+@pytest.mark.order(20)
+def test_calendar_window_uses_stored_due_dates():
+    bill = client.post("/bills", json={"name": "Window", "amount": 12.0, "due_day": 31, "bill_class": "Comfort", "pp": 19}).json()
+    assert bill["due_date"] == "2025-09-30"  # PP19 starts 2025-09-01; day 31 clamps
+
+    r = client.get("/calendar", params={"start": "2025-09-01", "end": "2025-09-30"})
+    assert r.status_code == 200
+    events = r.json()
+    dates = [ev["date"] for ev in events if ev["type"] == "bill"]
+    assert dates and dates == sorted(dates)
+    assert all("2025-09-01" <= d <= "2025-09-30" for d in dates)
+    assert f"bill-{bill['id']}" in {ev["id"] for ev in events}
+
+    # Moving the bill to another PP restamps its due date.
+    moved = client.put(f"/bills/{bill['id']}", json={"pp": 21}).json()
+    assert moved["due_date"] == "2025-09-30"  # PP21 starts 2025-09-29, still September
+    moved = client.put(f"/bills/{bill['id']}", json={"pp": 23, "due_day": 5}).json()
+    assert moved["due_date"] == "2025-10-05"
+    r = client.get("/calendar", params={"start": "2025-09-01", "end": "2025-09-30"})
+    assert f"bill-{bill['id']}" not in {ev["id"] for ev in r.json()}
+    client.delete(f"/bills/{bill['id']}")
+
+
+@pytest.mark.order(21)
+def test_list_endpoints_keyset_pages_and_field_projection():
+    full = client.get("/bills").json()
+    assert len(full) > 5
+
+    pages, after_id = [], None
+    while True:
+        params = {"limit": 4, **({"after_id": after_id} if after_id is not None else {})}
+        r = client.get("/bills", params=params)
+        assert r.status_code == 200 and len(r.json()) <= 4
+        pages.extend(r.json())
+        after_id = r.headers.get("X-Next-After-Id")
+        if after_id is None:
+            break
+    assert pages == full
+
+    r = client.get("/bills", params={"fields": "name,amount", "limit": 2})
+    assert [set(row) for row in r.json()] == [{"id", "name", "amount"}] * 2
+    assert client.get("/bills", params={"fields": "name,secret"}).status_code == 400
+    assert client.get("/bills", params={"limit": 0}).status_code == 422
+
+    compat = client.get("/api/pay-periods/17/bills", params={"fields": "Name", "limit": 3})
+    assert compat.status_code == 200 and len(compat.json()) == 3
+    assert set(compat.json()[0]) == {"id", "Name"}
+    rest = client.get("/api/pay-periods/17/bills", params={"after_id": compat.headers["X-Next-After-Id"]}).json()
+    assert [b["id"] for b in compat.json() + rest] == [b["id"] for b in client.get("/api/pay-periods/17/bills").json()]
+
+    tasks = client.get("/gamification/tasks", params={"fields": "task_type", "limit": 1}).json()
+    assert tasks == [{"id": tasks[0]["id"], "task_type": "pay_bill"}]
+    assert client.get("/paychecks", params={"fields": "source", "limit": 1}).status_code == 200
+
+
+@pytest.mark.order(22)
+def test_read_responses_cached_with_etag_and_invalidated_by_writes():
+    first = client.get("/debts/snowball")
+    etag = first.headers["ETag"]
+    again = client.get("/debts/snowball")
+    assert again.headers["X-Cache"] == "HIT" and again.json() == first.json()
+
+    not_modified = client.get("/debts/snowball", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+
+    tag = uuid.uuid4().hex[:8]
+    bill = client.post("/bills", json={"name": f"Cache {tag}", "amount": 5.0, "due_day": 2, "bill_class": "Credit", "pp": 18}).json()
+    fresh = client.get("/debts/snowball", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200 and fresh.headers["X-Cache"] == "MISS"
+    assert fresh.headers["ETag"] != etag
+    assert f"Cache {tag}" in {d["name"] for d in fresh.json()}
+
+    # Paycheck writes invalidate summaries (income) but pages keep their cursor header.
+    summary = client.get("/payperiods/18/summary")
+    pay = client.post("/paychecks", json={"source": f"Cache {tag}", "amount": 1.0, "player_id": "player1"}).json()
+    assert client.get("/payperiods/18/summary").json()["income"] == summary.json()["income"] + 1.0
+    client.delete(f"/paychecks/{pay['id']}")
+    page = client.get("/bills", params={"limit": 1})
+    assert client.get("/bills", params={"limit": 1}).headers["X-Next-After-Id"] == page.headers["X-Next-After-Id"]
+
+    client.delete(f"/bills/{bill['id']}")
+    assert f"Cache {tag}" not in {d["name"] for d in client.get("/debts/snowball").json()}
+
+
+@pytest.mark.order(23)
+def test_core_serialized_endpoints_keep_shape_and_document_models():
+    created = client.post("/bills", json={"name": "Fast", "amount": 9.5, "due_day": 4, "bill_class": "Needed", "pp": 18})
+    assert created.status_code == 201
+    bill = created.json()
+    assert bill == {"id": bill["id"], "name": "Fast", "amount": 9.5, "due_day": 4, "bill_class": "Needed",
+                    "pp": 18, "paid": False, "due_date": "2025-08-04", "apr": None, "min_payment": None}
+    listed = client.get("/bills", params={"after_id": bill["id"] - 1, "limit": 1})
+    assert listed.headers["content-type"].startswith("application/json")
+    assert listed.json() == [bill]
+
+    schemas = client.get("/openapi.json").json()["components"]["schemas"]
+    assert {"BillOut", "PaycheckOut", "TaskOut", "CompatBillOut"} <= set(schemas)
+    client.delete(f"/bills/{bill['id']}")
+
+
+@pytest.mark.order(24)
+def test_batch_bill_and_paycheck_writes_keep_totals():
+    from autobudget_backend.db import SessionLocal
+    from autobudget_backend.services import totals
+
+    tag = uuid.uuid4().hex[:8]
+    before = client.get("/payperiods/33/summary")
+    assert before.status_code == 404
+
+    created = client.post("/bills/batch", json=[
+        {"name": f"Batch {tag} {i}", "amount": 10.0 * (i + 1), "due_day": 3, "bill_class": "Critical", "pp": 33}
+        for i in range(3)
+    ]).json()
+    assert created["ok"] == 3 and created["failed"] == 0
+    ids = [r["id"] for r in created["results"]]
+    assert client.get("/payperiods/33/summary").json()["fixed"] == 60.0
+
+    updated = client.patch("/bills/batch", json=[
+        {"id": ids[0], "amount": 15.0},
+        {"id": ids[1], "bill_class": "Comfort", "due_day": 20},
+        {"id": 10**9, "amount": 1.0},
+    ]).json()
+    assert (updated["ok"], updated["failed"]) == (2, 1)
+    assert updated["results"][2] == {"id": 10**9, "ok": False, "error": "Bill not found"}
+    assert updated["results"][1]["due_date"] != created["results"][1]["due_date"]
+    summary = client.get("/payperiods/33/summary").json()
+    assert (summary["fixed"], summary["variable"]) == (45.0, 20.0)
+
+    toggled = client.post("/bills/toggle-paid", json={"ids": [ids[0], 10**9]}).json()
+    assert toggled["results"] == [{"id": ids[0], "ok": True, "paid": True}, {"id": 10**9, "ok": False, "error": "Bill not found"}]
+    by_pp = client.post("/bills/toggle-paid", json={"pp": 33, "paid": True}).json()
+    assert by_pp["ok"] == 3 and all(r["paid"] for r in by_pp["results"])
+    assert client.get("/payperiods/33/summary").json()["paid_count"] == 3
+    assert client.post("/bills/toggle-paid", json={}).status_code == 400
+
+    pays = client.post("/paychecks/batch", json=[{"source": f"Batch {tag}", "amount": 2.0, "player_id": "player1"}] * 2).json()
+    pay_ids = [r["id"] for r in pays["results"]]
+    client.patch("/paychecks/batch", json=[{"id": pay_ids[0], "amount": 5.0}])
+    assert client.get("/payperiods/33/summary").json()["income"] == summary["income"] + 7.0
+
+    for bill_id in ids:
+        client.delete(f"/bills/{bill_id}")
+    for pay_id in pay_ids:
+        client.delete(f"/paychecks/{pay_id}")
+    db = SessionLocal()
+    try:
+        assert totals.verify(db) == []
+    finally:
+        db.close()
+
+
+@pytest.mark.order(25)
+def test_manual_reminder_run_respects_run_lease():
+    from autobudget_backend.services import leases
+
+    headers = {"X-Job-Token": "autobudget-dev"}
+    assert leases.try_acquire(leases.REMINDERS_LEASE, "scheduled-run", ttl=60)
+    try:
+        assert client.post("/jobs/run-reminders", headers=headers).status_code == 409
+    finally:
+        leases.release(leases.REMINDERS_LEASE, "scheduled-run")
+    r = client.post("/jobs/run-reminders", headers=headers)
+    assert r.status_code == 200 and r.json()["ok"] is True
+
+
+@pytest.mark.order(26)
+def test_debt_plan_uses_stored_apr_and_minimums():
+    bill = client.post("/bills", json={
+        "name": "Card APR", "amount": 2400.0, "due_day": 5, "bill_class": "Credit", "pp": 33,
+        "apr": 24.0, "min_payment": 60.0,
+    }).json()
+    try:
+        assert bill["apr"] == 24.0 and bill["min_payment"] == 60.0
+        debts = client.get("/debts/snowball", params={"monthly_payment": 5000}).json()
+        card = next(d for d in debts if d["name"] == "Card APR")
+        assert card["apr"] == 24.0 and card["interest_paid"] > 0 and card["payoff_date"]
+        assert [d["balance"] for d in debts] == sorted(d["balance"] for d in debts)
+
+        plan = client.get("/debts/plan", params={"monthly_payment": 5000, "strategy": "avalanche"}).json()
+        assert plan["debts"][0]["name"] == "Card APR"  # only debt with an APR
+        assert plan["total_interest"] == pytest.approx(sum(d["interest_paid"] for d in plan["debts"]), abs=0.05)
+        assert client.get("/debts/plan", params={"strategy": "bogus"}).status_code == 422
+    finally:
+        client.delete(f"/bills/{bill['id']}")
+
+
+@pytest.mark.order(27)
+def test_debt_sweep_returns_compact_arrays():
+    r = client.post("/debts/sweep", json={"min_payment": 500, "max_payment": 3000, "step": 500,
+                                          "strategies": ["snowball", "avalanche", "custom"], "order": ["Jeep loan"]})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["payments"] == [500, 1000, 1500, 2000, 2500, 3000]
+    assert [len(m) for m in body["months"]] == [6, 6, 6]
+    assert [len(t) for t in body["total_interest"]] == [6, 6, 6]
+    assert body["months"][0] == sorted(body["months"][0], reverse=True)  # more money, sooner payoff
+    assert client.post("/debts/sweep", json={"min_payment": 100, "max_payment": 50}).status_code == 400
+    assert client.post("/debts/sweep", json={"min_payment": 1, "max_payment": 5, "strategies": ["x"]}).status_code == 400
+
+
+@pytest.mark.order(28)
+def test_snowball_routes_share_memoized_results():
+    before = client.get("/debts/memo-stats").json()
+    first = client.get("/debts/snowball", params={"monthly_payment": 777})
+    compat = client.get("/api/debts/snowball", params={"monthly_payment": 777})
+    assert compat.json() == first.json()
+    after = client.get("/debts/memo-stats").json()
+    assert after["misses"] == before["misses"] + 1 and after["hits"] == before["hits"] + 1
+
+    bill = client.post("/bills", json={"name": "Memo Card", "amount": 42.0, "due_day": 2, "bill_class": "Credit", "pp": 33}).json()
+    try:
+        names = {d["name"] for d in client.get("/api/debts/snowball", params={"monthly_payment": 777}).json()}
+        assert "Memo Card" in names  # the write invalidated the debt set
+    finally:
+        client.delete(f"/bills/{bill['id']}")
+    assert "Memo Card" not in {d["name"] for d in client.get("/api/debts/snowball", params={"monthly_payment": 777}).json()}
+
+
+@pytest.mark.order(29)
+def test_debt_optimizer_endpoint_compares_with_snowball():
+    r = client.get("/debts/optimize", params={"pp_from": 17, "pp_to": 30})
+    assert r.status_code == 200
+    body = r.json()
+    assert body["strategy"] == "optimal"
+    assert {"debts", "months", "payoff_date", "total_interest", "schedule", "compare"} <= set(body)
+    assert body["schedule"]["pp"] == sorted(body["schedule"]["pp"]) and all(17 <= pp <= 30 for pp in body["schedule"]["pp"])
+    best = min(v["total_interest"] for v in body["compare"].values())
+    assert body["total_interest"] == best
+
+
+@pytest.mark.order(30)
+def test_reconcile_reports_matched_bill_and_sees_new_bills():
+    txns = {"transactions": [{"amount": -152.0, "memo": "AMEX EPAYMENT ACH PMT"}, {"amount": -4.5, "memo": "Coffee"}]}
+    data = client.post("/reconcile", json=txns).json()
+    assert data["matched_count"] == 1 and data["matched"][0]["bill_name"] == "Amex"
+    assert data["matched"][0]["bill_id"] and data["unmatched"] == [txns["transactions"][1]]
+
+    bill = client.post("/bills", json={"name": "Coffee", "amount": 4.5, "due_day": 1, "bill_class": "Comfort", "pp": 33}).json()
+    try:
+        data = client.post("/api/reconcile", json=txns).json()
+        assert data["matched_count"] == 2 and data["matched"][1]["bill_id"] == bill["id"]
+    finally:
+        client.delete(f"/bills/{bill['id']}")
+
+
+@pytest.mark.order(32)
+def test_deleting_an_ingested_bill_drops_its_fingerprint():
+    from autobudget_backend import models
+    from autobudget_backend.db import SessionLocal
+
+    tag = uuid.uuid4().hex[:8]
+    text = f"Name,Amount,DueDay,Class,PP\nGone {tag},10,5,Credit,30\n"
+    r = client.post("/ingest/bills?mode=upsert", files={"file": ("g.csv", text, "text/csv")})
+    assert r.json()["inserted"] == 1
+    db = SessionLocal()
+    try:
+        bill_id = db.query(models.Bill.id).filter(models.Bill.name == f"Gone {tag}").scalar()
+        assert client.delete(f"/bills/{bill_id}").status_code == 204
+        assert db.query(models.BillFingerprint).filter(models.BillFingerprint.bill_id == bill_id).count() == 0
+    finally:
+        db.close()
+    again = text + f"Other {tag},1,6,Credit,30\n"  # new content, so the file hash is unseen
+    r = client.post("/ingest/bills?mode=upsert", files={"file": ("g.csv", again, "text/csv")})
+    assert r.json()["inserted"] == 2
+
+
+@pytest.mark.order(33)
+def test_debts_never_paid_off_report_null_payoff_fields():
+    tag = uuid.uuid4().hex[:8]
+    name = f"Underwater {tag}"
+    # The minimum does not cover the monthly interest, so the balance only grows.
+    bill = client.post("/bills", json={"name": name, "amount": 50000.0, "due_day": 1, "bill_class": "Credit",
+                                       "pp": 17, "apr": 30.0, "min_payment": 1.0}).json()
+    try:
+        params = {"monthly_payment": 0}
+        debt = next(d for d in client.get("/debts/snowball", params=params).json() if d["name"] == name)
+        assert (debt["months"], debt["payoff_date"], debt["payoff_eta_days"]) == (None, None, None)
+        assert debt["interest_paid"] > 0
+        plan = client.get("/debts/plan", params=params).json()
+        assert (plan["months"], plan["payoff_date"]) == (None, None)
+
+        schemas = client.get("/openapi.json").json()["components"]["schemas"]
+        eta = schemas["DebtPayoffOut"]["properties"]["payoff_eta_days"]
+        assert {"type": "null"} in eta["anyOf"]
+    finally:
+        client.delete(f"/bills/{bill['id']}")
+
+
+@pytest.mark.order(34)
+def test_debt_optimizer_skips_pay_periods_emptied_by_deletes():
+    bill = client.post("/bills", json={"name": "Lonely", "amount": 5.0, "due_day": 2, "bill_class": "Needed", "pp": 41}).json()
+    params = {"pp_from": 41, "pp_to": 41}
+    assert client.get("/debts/optimize", params=params).json()["schedule"]["pp"] == [41]
+    client.delete(f"/bills/{bill['id']}")
+    assert client.get("/payperiods/41/summary").status_code == 404
+    assert client.get("/debts/optimize", params=params).json()["schedule"] == {"pp": [], "cash": [], "payments": []}
+
+
+@pytest.mark.order(35)
+def test_debts_snowball_handles_null_names_and_programmatic_calls(monkeypatch):
+    import asyncio
+    from autobudget_backend import app as app_module
+    from autobudget_backend import models
+    from autobudget_backend.db import SessionLocal
+    from autobudget_backend.services import response_cache
+
+    db = SessionLocal()
+    try:
+        bill = models.Bill(name=None, amount=12.0, due_day=3, bill_class="Credit", pp=17, paid=False)
+        db.add(bill)
+        db.commit()
+        response_cache.bump("bills")
+        r = client.get("/debts/snowball")
+        assert r.status_code == 200
+        assert any(d["name"] is None and d["balance"] == 12.0 for d in r.json())
+
+        # Called directly, without a session and without the async driver.
+        monkeypatch.setattr(app_module, "AsyncSessionLocal", None)
+        direct = asyncio.run(app_module.debts_snowball(object()))
+        assert [(d["name"], d["balance"]) for d in direct] == [(d["name"], d["balance"]) for d in r.json()]
+    finally:
+        db.delete(bill)
+        db.commit()
+        db.close()
+        response_cache.bump("bills")